@@ -2,7 +2,10 @@
 
 from typing import Optional, Dict, Tuple, List
 from game_engine import Hand, Card
-from settings import settings
+from hand_state import (
+    NUM_RANKS, NUM_STATES, NO_PAIR, STATE_PAIR, STATE_SOFT, STATE_VALUE
+)
+from settings import RuleSet, settings
 
 # Basic Strategy Actions
 HIT = 'H'
@@ -11,6 +14,30 @@ DOUBLE = 'D'  # Double if allowed, else hit
 DOUBLE_STAND = 'Ds'  # Double if allowed, else stand
 SPLIT = 'P'
 
+# Pair table row for each rank index
+PAIR_KEYS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A']
+
+class CompiledStrategy:
+    """Flat, immutable decision table compiled from the charts and game rules
+    
+    Indexed by (can_split, can_double, hand state, dealer upcard index), so a
+    decision is a single tuple lookup.
+    """
+    
+    def __init__(self, table: Tuple[str, ...], rules_key: Tuple):
+        self.table = table
+        self.rules_key = rules_key
+    
+    @staticmethod
+    def index(state: int, upcard_index: int, can_double: bool, can_split: bool) -> int:
+        """Get the flat table index for a decision"""
+        return (((can_split << 1) | can_double) * NUM_STATES + state) * NUM_RANKS + upcard_index
+    
+    def lookup(self, state: int, upcard_index: int, can_double: bool, can_split: bool) -> str:
+        """Get the action for an encoded hand state against a dealer upcard"""
+        return self.table[(((can_split << 1) | can_double) * NUM_STATES + state) * NUM_RANKS
+                          + upcard_index]
+
 class BasicStrategy:
     """Implements basic strategy for blackjack"""
     
@@ -81,43 +108,125 @@ class BasicStrategy:
             '2': 0, '3': 1, '4': 2, '5': 3, '6': 4,
             '7': 5, '8': 6, '9': 7, '10': 8, 'J': 8, 'Q': 8, 'K': 8, 'A': 9
         }
+        
+        # Hand-typed charts, restored by use_charts(None)
+        self._typed_charts = (self.hard_table, self.soft_table, self.pair_table)
+        # Rule hash of generated charts in use (strategy_generator), None for the typed ones
+        self.charts_key: Optional[str] = None
+        
+        self._compiled: Optional[CompiledStrategy] = None
+        self._tables: Dict[Tuple, CompiledStrategy] = {}
+        
+        # Count-based deviations (index_plays.IndexTable), used when a true count is given
+        self.index_table = None
+    
+    @staticmethod
+    def rules_key(rules: RuleSet) -> Tuple:
+        """The subset of the rules that changes basic strategy decisions"""
+        return (rules.double_after_split, rules.max_splits, rules.double_on_any_two)
     
     def get_optimal_action(self, player_hand: Hand, dealer_upcard: Card, 
                           can_double: bool = True, can_split: bool = True,
-                          game_state=None) -> str:
-        """Get the optimal action based on basic strategy"""
+                          game_state=None, true_count: Optional[float] = None) -> str:
+        """
+        Get the optimal action based on basic strategy
+        With a true count and an index table loaded, count-based deviations apply.
+        """
+        # A game state carries its own rule snapshot; otherwise use live settings
+        rules = game_state.rules if game_state is not None else settings.game_rules
+        rules_key = self.rules_key(rules)
+        compiled = self._compiled
+        if compiled is None or compiled.rules_key != rules_key:
+            compiled = self._tables.get(rules_key) or self.compile(rules)
+            self._compiled = compiled
+        
+        # Splitting needs an exact rank pair and room under the split limits
+        if can_split:
+            can_split = player_hand.can_split() and (
+                game_state is None or game_state.can_split_current_hand())
+        
+        action = compiled.table[(((can_split << 1) | bool(can_double)) * NUM_STATES
+                                 + player_hand.state) * NUM_RANKS + dealer_upcard.rank_index]
+        if true_count is not None and self.index_table is not None:
+            action = self.index_table.lookup(player_hand.state, dealer_upcard.rank_index,
+                                             true_count, can_double, can_split, action)
+        return action
+    
+    def compile(self, rules: Optional[RuleSet] = None) -> CompiledStrategy:
+        """Compile the charts and game rules (default: current settings) into one decision table"""
+        if rules is None:
+            rules = settings.rule_set()
+        rules_key = self.rules_key(rules)
         
-        # Get dealer upcard index
-        dealer_idx = self.dealer_upcard_index.get(dealer_upcard.rank, 8)
+        table = [STAND] * (4 * NUM_STATES * NUM_RANKS)
+        for can_split in (False, True):
+            for can_double in (False, True):
+                for state in range(NUM_STATES):
+                    for upcard_index in range(NUM_RANKS):
+                        index = CompiledStrategy.index(state, upcard_index, can_double, can_split)
+                        table[index] = self._chart_action(
+                            state, upcard_index, can_double, can_split and rules.max_splits > 0,
+                            rules
+                        )
+        
+        self._compiled = CompiledStrategy(tuple(table), rules_key)
+        self._tables[rules_key] = self._compiled
+        return self._compiled
+    
+    def use_charts(self, charts=None):
+        """Play generated charts (strategy_generator.StrategyCharts), or None for the typed ones"""
+        if charts is None:
+            self.hard_table, self.soft_table, self.pair_table = self._typed_charts
+            self.charts_key = None
+        else:
+            self.hard_table = charts.hard
+            self.soft_table = charts.soft
+            self.pair_table = charts.pairs
+            self.charts_key = charts.rules_key
+        self.invalidate()
+    
+    def invalidate(self):
+        """Force the decision tables to be rebuilt (e.g. after editing the charts)"""
+        self._compiled = None
+        self._tables.clear()
+    
+    def _chart_action(self, state: int, dealer_idx: int, can_double: bool, can_split: bool,
+                      rules: RuleSet) -> str:
+        """Look up the charts for one decision, applying the given rules"""
+        value = STATE_VALUE[state]
+        
+        # Without doubling on any two cards, only 9-11 may be doubled
+        if not rules.double_on_any_two and value not in [9, 10, 11]:
+            can_double = False
         
         # Check for pairs first (if splitting is allowed)
-        if can_split and player_hand.can_split():
-            pair_rank = player_hand.cards[0].rank
-            split_action = self._get_split_action(pair_rank, dealer_idx, game_state)
-            
-            # Return the split action (could be 'P' for split or alternative action)
-            if split_action:
-                return split_action
+        pair = STATE_PAIR[state]
+        if can_split and pair != NO_PAIR:
+            action = self.pair_table[PAIR_KEYS[pair]][dealer_idx]
+            if action == SPLIT:
+                # Without DAS, some pairs become less favorable to split
+                # (generated charts were solved for the rules already)
+                if not rules.double_after_split and self.charts_key is None:
+                    if pair == 2 and dealer_idx in [3, 4]:  # 4-4 vs 5-6
+                        return HIT
+                    if pair == 4 and dealer_idx in [1]:     # 6-6 vs 3
+                        return HIT
+                return SPLIT
+            return self._convert_action(action, can_double)
         
-        # Check for soft hands
-        if player_hand.is_soft and player_hand.value <= 21:
-            # Soft hands are only in the table for totals 13-21
-            if player_hand.value >= 13:
-                action = self.soft_table[player_hand.value][dealer_idx]
-                return self._convert_action(action, can_double)
+        if value > 21:
+            return STAND  # Already bust
         
-        # Hard hands
-        if player_hand.value <= 21:
-            # For hard hands less than 5, always hit
-            if player_hand.value < 5:
-                return HIT
-            elif player_hand.value > 21:
-                return STAND  # Already bust
-            else:
-                action = self.hard_table[player_hand.value][dealer_idx]
-                return self._convert_action(action, can_double)
+        # Soft hands (A,A that can't be split plays as soft 12)
+        if STATE_SOFT[state] and value >= 12:
+            action = self.soft_table[value][dealer_idx]
+            return self._convert_action(action, can_double)
         
-        return STAND  # Default for bust hands
+        # For hard hands less than 5, always hit
+        if value < 5:
+            return HIT
+        action = self.hard_table[value][dealer_idx]
+        return self._convert_action(action, can_double)
     
     def _convert_action(self, action: str, can_double: bool) -> str:
         """Convert strategy action based on what's allowed"""
@@ -137,66 +246,6 @@ class BasicStrategy:
             'P': 'split'
         }
         return action_map.get(action, 'stand')
-    
-    def _get_split_action(self, pair_rank: str, dealer_idx: int, game_state=None) -> str:
-        """Get split action considering game rules and current state"""
-        # Get base strategy action
-        base_action = self.pair_table[pair_rank][dealer_idx]
-        
-        # Strategy recommends split - check if game allows it
-        if base_action == 'P':
-            if game_state:
-                # Check split limits
-                if hasattr(game_state, 'player_hands') and hasattr(game_state, 'can_split_current_hand'):
-                    if not game_state.can_split_current_hand():
-                        # Can't split due to limits/bankroll, treat as regular hand
-                        return self._get_non_split_action(pair_rank, dealer_idx)
-                
-                # Check rule variations that affect strategy
-                if hasattr(game_state, 'settings') or 'settings' in globals():
-                    from settings import settings
-                    
-                    # Double after split (DAS) rule affects some pairs
-                    if not settings.game_rules.double_after_split:
-                        # Without DAS, some pairs become less favorable to split
-                        if pair_rank == '4' and dealer_idx in [3, 4]:  # 4-4 vs 5-6
-                            return 'H'  # Hit instead of split without DAS
-                        if pair_rank == '6' and dealer_idx in [1]:     # 6-6 vs 3  
-                            return 'H'  # Hit instead of split without DAS
-            
-            # Default: return the recommended split
-            return 'P'
-        
-        # Strategy doesn't recommend split, return the base action
-        return base_action
-    
-    def _get_non_split_action(self, pair_rank: str, dealer_idx: int) -> str:
-        """Get action for pair when splitting is not allowed/recommended"""
-        # Convert pair to hand value and get regular strategy
-        pair_value = self._get_pair_value(pair_rank)
-        
-        if pair_rank == 'A':
-            # A-A treated as soft 12 when can't split
-            if 12 in self.soft_table:
-                action = self.soft_table[12][dealer_idx]
-                return self._convert_action(action, True)  # Assume can double
-            else:
-                return 'H'
-        elif pair_value <= 21 and pair_value in self.hard_table:
-            # Most pairs are hard hands when can't split
-            action = self.hard_table[pair_value][dealer_idx]
-            return self._convert_action(action, True)  # Assume can double
-        else:
-            return 'S'  # Default for high values or missing entries
-    
-    def _get_pair_value(self, pair_rank: str) -> int:
-        """Get the total value of a pair"""
-        if pair_rank == 'A':
-            return 12  # A-A = 2 or 12, treat as soft 12
-        elif pair_rank in ['J', 'Q', 'K']:
-            return 20  # 10-value pairs
-        else:
-            return int(pair_rank) * 2
 
 
 class StrategyTracker:
@@ -0,0 +1,331 @@
+"""Bet ramp optimizer - chooses a bet per true count to maximize SCORE or minimize risk of ruin
+
+Works from a per-true-count table of frequency, mean and second moment of
+the flat-bet round result. For bets b_i the per-round win rate is
+sum(f_i * b_i * m_i) and the second moment sum(f_i * b_i^2 * s_i), so every
+candidate ramp costs two dot products. Tables are simulated once per rule
+set and shoe cut and cached on disk.
+
+    python -m bet_optimizer --objective score --apply
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the optimizer is unavailable without it
+    np = None
+
+from config import CACHE_DIR
+from counting_systems import CountingSystem, get_counting_system
+from risk_of_ruin import OutcomeModel, analytic_risk_of_ruin
+from settings import BettingLimits, RuleSet, settings
+
+DEFAULT_TABLE_ROUNDS = 5000000
+OBJECTIVES = ("score", "ror")
+
+
+def count_table_path(rules: RuleSet, cache_dir: str = CACHE_DIR,
+                     system: Optional[CountingSystem] = None) -> str:
+    """Cache file for a rule set and system; penetration and burn change count frequencies"""
+    system = system if system is not None else get_counting_system()
+    cut = f"p{rules.penetration:.3f}{'b' if rules.burn_card else ''}"
+    return os.path.join(cache_dir, f"count_table_{system.key}_{rules.cache_key()}_"
+                                   f"{rules.num_decks}d_{cut}.json")
+
+
+@dataclass
+class CountTable:
+    """Flat-bet result statistics per floor(true count) bucket, in initial-bet units"""
+    true_counts: 'np.ndarray'
+    frequency: 'np.ndarray'
+    mean: 'np.ndarray'
+    second_moment: 'np.ndarray'  # E[result^2]
+    rounds: int
+
+    @classmethod
+    def from_outcome_model(cls, model: OutcomeModel) -> 'CountTable':
+        keys = sorted(model.histograms)
+        total = model.rounds
+        frequency, mean, second = [], [], []
+        for key in keys:
+            histogram = model.histograms[key]
+            count = sum(histogram.values())
+            frequency.append(count / total)
+            mean.append(sum(units * n for units, n in histogram.items()) / count)
+            second.append(sum(units * units * n for units, n in histogram.items()) / count)
+        return cls(np.array(keys, dtype=float), np.array(frequency), np.array(mean),
+                   np.array(second), total)
+
+    def smoothed(self, min_rounds: int = 20000) -> 'CountTable':
+        """
+        Pool sparse tail buckets into their neighbours, then force the mean to
+        rise with the count (weighted isotonic regression) so sampling noise
+        at rare counts can't drive the ramp
+        """
+        counts = list(self.true_counts)
+        frequency = list(self.frequency)
+        mean = list(self.mean)
+        second = list(self.second_moment)
+        min_share = min_rounds / self.rounds
+
+        def pool(into: int, source: int):
+            total = frequency[into] + frequency[source]
+            mean[into] = (mean[into] * frequency[into] + mean[source] * frequency[source]) / total
+            second[into] = (second[into] * frequency[into] + second[source] * frequency[source]) / total
+            frequency[into] = total
+            for column in (counts, frequency, mean, second):
+                del column[source]
+
+        while len(frequency) > 1 and frequency[0] < min_share:
+            pool(1, 0)
+        while len(frequency) > 1 and frequency[-1] < min_share:
+            pool(len(frequency) - 2, len(frequency) - 1)
+
+        # Pool adjacent violators: blocks of [weight, mean, first index]
+        blocks: List[List[float]] = []
+        for i, (weight, value) in enumerate(zip(frequency, mean)):
+            blocks.append([weight, value, i])
+            while len(blocks) > 1 and blocks[-2][1] > blocks[-1][1]:
+                weight_b, value_b, _ = blocks.pop()
+                weight_a, value_a, start = blocks[-1]
+                blocks[-1] = [weight_a + weight_b,
+                              (weight_a * value_a + weight_b * value_b) / (weight_a + weight_b), start]
+        fitted = list(mean)
+        for index, (_, value, start) in enumerate(blocks):
+            end = blocks[index + 1][2] if index + 1 < len(blocks) else len(fitted)
+            for i in range(int(start), int(end)):
+                fitted[i] = value
+
+        return CountTable(np.array(counts), np.array(frequency), np.array(fitted),
+                          np.array(second), self.rounds)
+
+    @classmethod
+    def load_or_simulate(cls, rules: Optional[RuleSet] = None, rounds: int = DEFAULT_TABLE_ROUNDS,
+                         cache_dir: Optional[str] = CACHE_DIR, rng=None,
+                         system: Optional[CountingSystem] = None) -> 'CountTable':
+        """Load the cached table for these rules and system, simulating and saving it if missing"""
+        rules = rules if rules is not None else settings.rule_set()
+        system = system if system is not None else get_counting_system()
+        path = count_table_path(rules, cache_dir, system) if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                table = cls.load(path)
+                if table.rounds >= rounds:
+                    return table
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Ignoring unreadable count table {path}: {e}")
+
+        table = cls.from_outcome_model(OutcomeModel.simulate(rounds, rules, rng=rng,
+                                                             system=system))
+        if path:
+            table.save(path)
+        return table
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            'rounds': self.rounds,
+            'true_counts': self.true_counts.tolist(),
+            'frequency': self.frequency.tolist(),
+            'mean': self.mean.tolist(),
+            'second_moment': self.second_moment.tolist()
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'CountTable':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return cls(np.array(data['true_counts']), np.array(data['frequency']),
+                   np.array(data['mean']), np.array(data['second_moment']), data['rounds'])
+
+    def win_rate(self, bets: 'np.ndarray') -> float:
+        """Expected result per round for a bet in each bucket"""
+        return float(self.frequency @ (bets * self.mean))
+
+    def variance(self, bets: 'np.ndarray') -> float:
+        """Variance of the per-round result for a bet in each bucket"""
+        win_rate = self.win_rate(bets)
+        return float(self.frequency @ (bets * bets * self.second_moment)) - win_rate * win_rate
+
+
+@dataclass
+class RampResult:
+    """Chosen bet per true count and how it performs"""
+    true_counts: List[float]
+    bets: List[float]
+    win_rate: float
+    std_dev: float
+    score: float
+    risk_of_ruin: float
+    objective: str
+
+    def steps(self) -> List[List[float]]:
+        """Compact [true count, bet] steps, keeping only where the bet changes"""
+        steps: List[List[float]] = []
+        for true_count, bet in zip(self.true_counts, self.bets):
+            if not steps or bet != steps[-1][1]:
+                steps.append([true_count, bet])
+        return steps
+
+
+class BetOptimizer:
+    """Searches monotone bet ramps on the table's bet grid"""
+
+    def __init__(self, table: CountTable, limits: Optional[BettingLimits] = None,
+                 max_spread: Optional[float] = None, bankroll: Optional[float] = None):
+        if np is None:
+            raise ImportError("BetOptimizer requires numpy (pip install numpy)")
+        limits = limits if limits is not None else settings.betting_limits
+        self.table = table.smoothed()
+        self.bankroll = float(bankroll if bankroll is not None else limits.default_bankroll)
+        if max_spread is None:
+            max_spread = limits.optimal_max_spread
+        self.min_bet = float(limits.min_bet)
+        self.max_bet = float(min(limits.max_bet, limits.min_bet * max_spread))
+        increment = max(limits.bet_increment, 1)
+        self.levels = np.unique(np.append(
+            np.arange(self.min_bet, self.max_bet, increment), self.max_bet))
+
+    def score(self, bets: 'np.ndarray') -> float:
+        """SCORE: 10^6 * (win rate / SD)^2, zero without an edge"""
+        win_rate = self.table.win_rate(bets)
+        variance = self.table.variance(bets)
+        if win_rate <= 0 or variance <= 0:
+            return 0.0
+        return 1e6 * win_rate * win_rate / variance
+
+    def risk_of_ruin(self, bets: 'np.ndarray') -> float:
+        """Lifetime risk of ruin for the bankroll"""
+        return analytic_risk_of_ruin(self.table.win_rate(bets),
+                                     math.sqrt(max(self.table.variance(bets), 0.0)),
+                                     self.bankroll)
+
+    def _objective(self, bets: 'np.ndarray', objective: str) -> float:
+        """Value to maximize"""
+        win_rate = self.table.win_rate(bets)
+        variance = self.table.variance(bets)
+        if objective == "score":
+            # SCORE ranks like win_rate / SD; keeps losing ramps comparable
+            return win_rate / math.sqrt(variance) if variance > 0 else 0.0
+        # Lower risk of ruin means a larger win_rate / variance
+        return win_rate / variance if variance > 0 else 0.0
+
+    def _snap(self, bets: 'np.ndarray') -> 'np.ndarray':
+        """Round to the nearest bet level and make the ramp non-decreasing"""
+        index = np.clip(np.searchsorted(self.levels, bets), 1, len(self.levels) - 1)
+        lower = self.levels[index - 1]
+        upper = self.levels[index]
+        snapped = np.where(bets - lower < upper - bets, lower, upper)
+        snapped = np.clip(snapped, self.min_bet, self.max_bet)
+        return np.maximum.accumulate(snapped)
+
+    def optimize(self, objective: str = "score") -> RampResult:
+        """Best monotone ramp for the objective"""
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}, got {objective!r}")
+        table = self.table
+
+        # Start from bets proportional to edge / second moment over a range of scales
+        ratio = np.maximum(table.mean, 0.0) / table.second_moment
+        best = np.full(len(ratio), self.min_bet)
+        best_value = self._objective(best, objective)
+        if ratio.max() > 0:
+            for scale in np.geomspace(self.min_bet / ratio.max(), 1e4 * self.max_bet / ratio.max(), 200):
+                candidate = self._snap(scale * ratio)
+                value = self._objective(candidate, objective)
+                if value > best_value:
+                    best, best_value = candidate, value
+
+        # Polish one bucket at a time, staying between its neighbours' bets
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(best)):
+                low = best[i - 1] if i > 0 else self.min_bet
+                high = best[i + 1] if i + 1 < len(best) else self.max_bet
+                for level in self.levels[(self.levels >= low) & (self.levels <= high)]:
+                    if level == best[i]:
+                        continue
+                    candidate = best.copy()
+                    candidate[i] = level
+                    value = self._objective(candidate, objective)
+                    if value > best_value + 1e-15:
+                        best, best_value = candidate, value
+                        improved = True
+
+        return RampResult(
+            true_counts=table.true_counts.tolist(),
+            bets=best.tolist(),
+            win_rate=table.win_rate(best),
+            std_dev=math.sqrt(max(table.variance(best), 0.0)),
+            score=self.score(best),
+            risk_of_ruin=self.risk_of_ruin(best),
+            objective=objective
+        )
+
+
+def apply_to_settings(result: RampResult, limits: Optional[BettingLimits] = None):
+    """Store the ramp as the "optimal" betting strategy"""
+    limits = limits if limits is not None else settings.betting_limits
+    limits.optimal_ramp = result.steps()
+    limits.betting_strategy = "optimal"
+
+
+def format_ramp(result: RampResult) -> str:
+    """Format a ramp for console output"""
+    lines = [f"=== Optimal Ramp ({result.objective}) ==="]
+    for true_count, bet in result.steps():
+        lines.append(f"  TC {true_count:+5.0f}+  ${bet:,.0f}")
+    lines.extend([
+        f"Win rate:        ${result.win_rate * 100:+.2f} per 100 rounds",
+        f"SD:              ${result.std_dev:.2f} per round",
+        f"SCORE:           {result.score:.2f}",
+        f"Risk of ruin:    {result.risk_of_ruin * 100:.2f}%",
+    ])
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Optimize the bet ramp by true count")
+    parser.add_argument('--objective', choices=OBJECTIVES, default="score",
+                        help="Maximize SCORE or minimize risk of ruin")
+    parser.add_argument('--max-spread', type=float, default=None,
+                        help="Largest bet as a multiple of the minimum bet")
+    parser.add_argument('--bankroll', type=float, default=None,
+                        help="Bankroll for risk of ruin (default: settings default bankroll)")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_TABLE_ROUNDS,
+                        help="Rounds simulated to build the count table")
+    parser.add_argument('--apply', action='store_true',
+                        help="Save the ramp to settings as the optimal strategy")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("bet_optimizer requires numpy (pip install numpy)")
+        return 1
+
+    table = CountTable.load_or_simulate(rounds=args.rounds)
+    optimizer = BetOptimizer(table, max_spread=args.max_spread, bankroll=args.bankroll)
+    result = optimizer.optimize(args.objective)
+    print(format_ramp(result))
+
+    if args.apply:
+        if args.max_spread is not None:
+            settings.betting_limits.optimal_max_spread = args.max_spread
+        apply_to_settings(result)
+        settings.save()
+        print("Saved as the optimal betting strategy")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
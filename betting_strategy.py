@@ -21,6 +21,8 @@ class BettingStrategyCalculator:
             return self._spread_betting(bankroll, true_count, current_bet)
         elif strategy == "kelly":
             return self._kelly_betting(bankroll, true_count)
+        elif strategy == "optimal":
+            return self._optimal_betting(true_count, current_bet)
         else:
             return current_bet
     
@@ -65,15 +67,14 @@ class BettingStrategyCalculator:
         max_bet = settings.betting_limits.max_bet
         kelly_fraction = settings.betting_limits.kelly_fraction
         
-        # Calculate player edge
-        edge = self.ev_calculator.get_player_edge(true_count) / 100.0
+        # Growth-optimal share of the bankroll (a table lookup when simulated)
+        fraction = self.ev_calculator.full_kelly_fraction(true_count)
         
         # Only bet when we have an edge
-        if edge <= 0:
+        if fraction <= 0:
             return min_bet
         
-        # Kelly formula: edge / odds (for even money bets, odds = 1)
-        kelly_bet = bankroll * edge * kelly_fraction
+        kelly_bet = bankroll * fraction * kelly_fraction
         
         # Ensure bet is within limits
         kelly_bet = max(min_bet, min(max_bet, kelly_bet))
@@ -81,6 +82,14 @@ class BettingStrategyCalculator:
         
         return int(kelly_bet)
     
+    def _optimal_betting(self, true_count: float, current_bet: float) -> float:
+        """Bet from the ramp chosen by bet_optimizer"""
+        limits = settings.betting_limits
+        bet = limits.optimal_bet(true_count)
+        if bet is None:
+            return current_bet
+        return int(max(limits.min_bet, min(limits.max_bet, bet)))
+    
     def get_strategy_description(self) -> str:
         """Get description of current betting strategy"""
         strategy = settings.betting_limits.betting_strategy
@@ -95,6 +104,11 @@ class BettingStrategyCalculator:
         elif strategy == "kelly":
             fraction = settings.betting_limits.kelly_fraction
             return f"Kelly Criterion betting ({fraction*100:.0f}% Kelly)"
+        elif strategy == "optimal":
+            ramp = settings.betting_limits.optimal_ramp
+            if not ramp:
+                return "Optimized ramp (not computed yet)"
+            return f"Optimized ramp ${ramp[0][1]:.0f}-${ramp[-1][1]:.0f}"
         else:
             return "Unknown betting strategy"
     
@@ -117,6 +131,8 @@ class BettingStrategyCalculator:
             return f"Count +{true_count:.1f}: Suggest ${suggested_bet:.0f}"
         elif strategy == "kelly":
             return f"Kelly suggests: ${suggested_bet:.0f}"
+        elif strategy == "optimal":
+            return f"Count {true_count:+.1f}: Optimal ${suggested_bet:.0f}"
         else:
             return f"Suggested bet: ${suggested_bet:.0f}"
 
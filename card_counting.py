@@ -1,64 +1,95 @@
 """Card counting logic and calculations"""
 
-from typing import List
-from game_engine import Card, Shoe
-from config import HI_LO_VALUES
+from typing import List, Optional, Sequence, Union
+from game_engine import Card
+from settings import settings
+from counting_systems import ACE_INDEX, CountingSystem, get_counting_system
 
 class CardCounter:
-    """Implements Hi-Lo card counting system"""
+    """Keeps the running count for a counting system (the one in settings by default)"""
     
-    def __init__(self):
-        self.running_count = 0
-        self.cards_seen = 0
-        self.starting_decks = 6
+    def __init__(self, system: Optional[Union[str, CountingSystem]] = None,
+                 num_decks: Optional[int] = None):
+        self.system = system if isinstance(system, CountingSystem) else get_counting_system(system)
+        self.starting_decks = num_decks or settings.shoe_config.num_decks
+        self.reset()
         
+    def set_system(self, system: Union[str, CountingSystem], num_decks: Optional[int] = None):
+        """Switch counting system (and shoe size); the count starts over"""
+        self.system = system if isinstance(system, CountingSystem) else get_counting_system(system)
+        if num_decks:
+            self.starting_decks = num_decks
+        self.reset()
+    
     def reset(self):
         """Reset count for new shoe"""
-        self.running_count = 0
+        self.running_count = self.system.initial_running_count(self.starting_decks)
         self.cards_seen = 0
+        self.aces_seen = 0
     
     def update_count(self, card: Card):
         """Update running count based on card seen"""
-        self.running_count += card.count_value
+        self.running_count += self.system.get_count_value(card)
         self.cards_seen += 1
+        if card.rank_index == ACE_INDEX:
+            self.aces_seen += 1
     
     def update_count_multiple(self, cards: List[Card]):
         """Update count for multiple cards at once"""
         for card in cards:
             self.update_count(card)
     
+    def update_count_codes(self, codes: Sequence[int]):
+        """Update count for a block of card codes (a list or NumPy array)"""
+        self.running_count += self.system.count_codes(codes)
+        self.cards_seen += len(codes)
+        self.aces_seen += sum(1 for code in codes if code % 13 == 12)
+    
     def get_true_count(self, cards_remaining: int) -> float:
-        """Calculate true count based on decks remaining"""
+        """
+        Calculate true count based on decks remaining
+        Unbalanced systems first subtract the drift expected from the cards seen
+        so far, putting them on the same scale as a balanced true count.
+        """
         if cards_remaining <= 0:
             return 0.0
             
         decks_remaining = cards_remaining / 52
         if decks_remaining < 0.5:  # Avoid division by very small numbers
             decks_remaining = 0.5
-            
-        return self.running_count / decks_remaining
+        
+        count = self.running_count
+        if not self.system.balanced:
+            count -= (self.system.initial_running_count(self.starting_decks)
+                      + self.system.deck_sum * self.cards_seen / 52)
+        return count / decks_remaining
     
-    def get_running_count(self) -> int:
-        """Get current running count"""
-        return self.running_count
-
-class CountingSystem:
-    """Base class for different counting systems (for future expansion)"""
+    def get_true_count_with(self, cards: List[Card], cards_remaining: int) -> float:
+        """True count as if the given (visible but not yet counted) cards were counted too"""
+        saved = (self.running_count, self.cards_seen, self.aces_seen)
+        self.update_count_multiple(cards)
+        try:
+            return self.get_true_count(cards_remaining)
+        finally:
+            self.running_count, self.cards_seen, self.aces_seen = saved
     
-    def __init__(self, name: str):
-        self.name = name
-        self.card_values = {}
+    def get_ace_surplus(self, cards_remaining: int) -> float:
+        """Aces left beyond the normal four per remaining deck (side count)"""
+        aces_remaining = 4 * self.starting_decks - self.aces_seen
+        return aces_remaining - 4 * cards_remaining / 52
     
-    def get_count_value(self, card: Card) -> int:
-        """Get count value for a card"""
-        return self.card_values.get(card.rank, 0)
-
-class HiLoSystem(CountingSystem):
-    """Standard Hi-Lo counting system"""
+    def get_betting_true_count(self, cards_remaining: int) -> float:
+        """True count for bet sizing, adjusted by the ace side count where the system uses one"""
+        true_count = self.get_true_count(cards_remaining)
+        if not self.system.ace_side_count or cards_remaining <= 0:
+            return true_count
+        decks_remaining = max(cards_remaining / 52, 0.5)
+        surplus = self.get_ace_surplus(cards_remaining)
+        return true_count + self.system.ace_adjustment * surplus / decks_remaining
     
-    def __init__(self):
-        super().__init__("Hi-Lo")
-        self.card_values = HI_LO_VALUES
+    def get_running_count(self) -> Union[int, float]:
+        """Get current running count"""
+        return self.running_count
 
 class CountingStats:
     """Track counting accuracy and performance"""
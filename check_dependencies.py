@@ -23,6 +23,16 @@ def check_pillow():
         print("❌ Pillow is NOT installed (game will use text-based cards)")
         return False
 
+def check_numpy():
+    """Check if NumPy is installed"""
+    try:
+        import numpy
+        print("✅ NumPy is installed")
+        return True
+    except ImportError:
+        print("❌ NumPy is NOT installed (bulk shuffling and vectorized simulation unavailable)")
+        return False
+
 def install_instructions():
     """Provide installation instructions"""
     print("\n📦 Installation Instructions:")
@@ -46,6 +56,7 @@ def main():
     # Check dependencies
     has_tkinter = check_tkinter()
     has_pillow = check_pillow()
+    check_numpy()
     
     if not has_tkinter:
         print("\n⚠️  Tkinter is REQUIRED to run the game!")
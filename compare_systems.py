@@ -0,0 +1,414 @@
+"""Compare counting systems on identical shoes in a single vectorized run
+
+Every lane keeps cumulative counts of dealt cards per tag class (cards that
+every compared system tags alike, with aces kept separate for side counts).
+Multiplying those counts by the class-by-system tag matrix gives all running
+counts at once, so each system bets from its own true count on exactly the
+same cards, and the per-round differences against the baseline system have
+far lower variance than separate runs.
+
+Level-2 and level-3 counts run on a wider true count scale, so by default
+each system bets the shared ramp at its true count divided by its largest
+tag (its level in the units the tags are stored in: Wong Halves is level 3
+in half points, 1.5 here).
+Diff/100 still mixes bet sizing with count quality; DI (1000 * EV / SD, and
+dDI, its difference from the baseline) and SCORE (DI squared, zero without
+an edge) don't change with the bet size.
+
+Play is basic strategy unless index tables are given. Then every decision
+on the shared path is checked against each system's deviations at its
+playing true count, and a system that could deviate replays that round
+(and any split) in the scalar engine with its own index table. The shoe
+carries on from where the baseline's round ended.
+
+    python -m compare_systems --systems hi-lo,ko,zen,wong-halves --rounds 5000000
+"""
+
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from counting_systems import ACE_INDEX, COUNTING_SYSTEMS, CountingSystem, get_counting_system
+from ev_calculator import RunningMoments
+from game_engine import CODE_RANK_INDEX, shuffled_shoes
+from hand_state import NUM_RANKS, NUM_STATES
+from index_plays import STATE_KEYS, IndexTable
+from settings import RuleSet, settings
+from simulate import SimulationResult, Simulator
+from strategy_generator import StrategyCharts
+from vector_sim import (
+    BetRamp, VectorSimulator, _LaneShoe, _batch_moments, flat_ramp, np, ramp_for_limits
+)
+
+# Slack on the deviation check; the scalar replay makes the exact call
+INDEX_SLACK = 1e-6
+
+
+def tag_scale(system: CountingSystem) -> float:
+    """Largest tag of a system, the level of its tags as stored"""
+    return float(max(abs(tag) for tag in system.code_tags))
+
+
+def scaled_ramp(ramp: BetRamp, scale: float) -> BetRamp:
+    """Bet a ramp written for level-1 true counts from a count with the given tag scale"""
+    if scale == 1:
+        return ramp
+    return lambda true_counts: ramp(true_counts / scale)
+
+
+def index_bounds(table: IndexTable) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Lowest "at or above" and highest "at or below" index per [state, upcard]
+    A true count outside (below, above) may change the decision; inside it can't.
+    """
+    above = np.full((NUM_STATES, NUM_RANKS), np.inf)
+    below = np.full((NUM_STATES, NUM_RANKS), -np.inf)
+    for state, keys in enumerate(STATE_KEYS):
+        for key in keys:
+            if key is None:
+                continue
+            for upcard in range(NUM_RANKS):
+                for play in table.find(key, upcard):
+                    if play.above:
+                        above[state, upcard] = min(above[state, upcard], play.index)
+                    else:
+                        below[state, upcard] = max(below[state, upcard], play.index)
+    return above, below
+
+
+@dataclass
+class SystemComparison:
+    """Per-system results from one run, plus paired differences against the baseline"""
+    baseline: str
+    results: Dict[str, SimulationResult] = field(default_factory=dict)
+    # Per-round dollar result minus the baseline system's result on the same round
+    differences: Dict[str, RunningMoments] = field(default_factory=dict)
+
+    def difference_per_100(self, key: str) -> float:
+        """Extra win per 100 rounds over the baseline"""
+        return self.differences[key].mean * 100
+
+    def di_difference(self, key: str) -> float:
+        """DI over the baseline's; unlike Diff/100 it doesn't grow with the bet size"""
+        return (self.results[key].desirability_index()
+                - self.results[self.baseline].desirability_index())
+
+    def difference_std_error(self, key: str) -> float:
+        """Standard error of difference_per_100"""
+        moments = self.differences[key]
+        if moments.count < 2:
+            return 0.0
+        return moments.std_dev() / math.sqrt(moments.count) * 100
+
+    def independent_std_error(self, key: str) -> float:
+        """What the standard error would be if the two systems were run separately"""
+        first = self.results[key].moments
+        second = self.results[self.baseline].moments
+        if first.count < 2 or second.count < 2:
+            return 0.0
+        return math.sqrt(first.variance() / first.count + second.variance() / second.count) * 100
+
+    def get_summary(self) -> Dict:
+        summary = {}
+        for key, result in self.results.items():
+            summary[key] = {
+                'win_rate_per_100': result.win_rate_per_100(),
+                'ev_percentage': result.ev_percentage(),
+                'std_dev': result.std_dev_per_round(),
+                'score': result.score(),
+                'desirability_index': result.desirability_index(),
+                'di_difference': self.di_difference(key),
+                'difference_per_100': self.difference_per_100(key),
+                'difference_std_error': self.difference_std_error(key)
+            }
+        return summary
+
+
+class MultiSystemSimulator(VectorSimulator):
+    """VectorSimulator that tracks several counting systems over the same cards"""
+
+    def __init__(self, systems: Sequence[Union[str, CountingSystem]], lanes: int = 10000,
+                 rules: Optional[RuleSet] = None, rng=None,
+                 bet_ramp: Optional[BetRamp] = None,
+                 bet_ramps: Optional[Dict[str, BetRamp]] = None,
+                 index_tables: Optional[Dict[str, IndexTable]] = None,
+                 charts: Optional[StrategyCharts] = None):
+        systems = [system if isinstance(system, CountingSystem) else get_counting_system(system)
+                   for system in systems]
+        if not systems:
+            raise ValueError("Need at least one counting system to compare")
+        if len({system.key for system in systems}) != len(systems):
+            raise ValueError("Counting systems to compare must be distinct")
+        super().__init__(lanes=lanes, rules=rules, rng=rng, bet_ramp=bet_ramp, system=systems[0],
+                         charts=charts)
+        self.systems = systems
+        # One ramp per system; level-2 and level-3 true counts run on a wider scale
+        bet_ramps = bet_ramps or {}
+        self.bet_ramps = [bet_ramps.get(system.key) or scaled_ramp(self.bet_ramp,
+                                                                    tag_scale(system))
+                          for system in systems]
+
+        # Tag classes: codes every system tags identically, aces always on their own
+        classes: Dict[tuple, int] = {}
+        code_class = []
+        for code in range(52):
+            key = (tuple(system.code_tags[code] for system in systems),
+                   CODE_RANK_INDEX[code] == ACE_INDEX)
+            code_class.append(classes.setdefault(key, len(classes)))
+        self._code_class = np.array(code_class, dtype=np.int8)
+        # [class, system] -> tag
+        self._tag_matrix = np.array([tags for tags, _ in classes], dtype=np.float64)
+        self._ace_classes = np.array([is_ace for _, is_ace in classes])
+        self._deck_sums = np.array([system.deck_sum for system in systems], dtype=np.float64)
+        self._ace_adjustments = np.array([system.ace_adjustment if system.ace_side_count else 0
+                                          for system in systems], dtype=np.float64)
+        self._class_counts = None
+
+        # Per-system index plays: deviation bounds for the vector check and a scalar
+        # engine, with its own counter and table, to replay rounds that may deviate
+        index_tables = index_tables or {}
+        self.index_tables = [index_tables.get(system.key) for system in systems]
+        self._indexed = np.array([table is not None for table in self.index_tables])
+        self._replayers: List[Optional[Simulator]] = []
+        if self._indexed.any():
+            bounds = [index_bounds(table) if table is not None else
+                      (np.full((NUM_STATES, NUM_RANKS), np.inf),
+                       np.full((NUM_STATES, NUM_RANKS), -np.inf))
+                      for table in self.index_tables]
+            # [system, state, upcard]
+            self._above = np.stack([above for above, _ in bounds])
+            self._below = np.stack([below for _, below in bounds])
+            for system, table in zip(systems, self.index_tables):
+                replayer = None
+                if table is not None:
+                    replayer = Simulator(bankroll=0, rules=self.rules, index_table=table,
+                                         system=system, charts=charts)
+                    replayer.game_state.shoe = _LaneShoe(self.rules, self._fresh_order)
+                self._replayers.append(replayer)
+        self._round_start = None
+        self._deviating = None
+        self._reloaded = None
+
+    def _load_shoes(self, lanes: 'np.ndarray'):
+        """Deal fresh shuffled shoes and their cumulative tag-class counts into the lanes"""
+        codes = shuffled_shoes(len(lanes), self.rules.num_decks, self.rng)
+        self._codes[lanes] = codes
+        self._ranks[lanes] = self._code_rank[codes]
+        classes = self._code_class[codes]
+        one_hot = classes[:, :, None] == np.arange(len(self._tag_matrix), dtype=np.int8)
+        one_hot[:, :self.start] = False  # The burn card is never seen
+        self._class_counts[lanes, 1:] = np.cumsum(one_hot, axis=1, dtype=np.int16)
+        self._cursor[lanes] = self.start
+        self._reloaded[lanes] = True
+
+    def _fresh_order(self) -> 'np.ndarray':
+        """Shuffled shoe for a replay that runs out of cards"""
+        return shuffled_shoes(1, self.rules.num_decks, self.rng)[0]
+
+    def _reset(self):
+        """Allocate lane storage and shuffle every lane"""
+        size = self.shoe_size
+        self._codes = np.zeros((self.lanes, size), dtype=np.uint8)
+        self._ranks = np.zeros((self.lanes, size), dtype=np.int8)
+        self._class_counts = np.zeros((self.lanes, size + 1, len(self._tag_matrix)), dtype=np.int16)
+        self._cursor = np.zeros(self.lanes, dtype=np.int64)
+        self._round_start = np.zeros(self.lanes, dtype=np.int64)
+        self._deviating = np.zeros((self.lanes, len(self.systems)), dtype=bool)
+        self._reloaded = np.zeros(self.lanes, dtype=bool)
+        self._load_shoes(np.arange(self.lanes))
+
+    def _system_true_counts(self, lanes: 'np.ndarray') -> 'np.ndarray':
+        """Betting true count of every system in every lane, shape (lanes, systems)"""
+        cursor = self._cursor[lanes]
+        counts = self._class_counts[lanes, cursor]
+        running = counts @ self._tag_matrix
+        # Balanced systems have a zero deck sum, so this only corrects unbalanced ones
+        seen = (cursor - self.start)[:, None]
+        running -= self._deck_sums * seen / 52
+        remaining = self.shoe_size - cursor
+        decks = np.maximum(remaining / 52, 0.5)[:, None]
+        true_counts = running / decks
+        if self._ace_adjustments.any():
+            aces_seen = counts[:, self._ace_classes].sum(axis=1)
+            surplus = (4 * self.rules.num_decks - aces_seen - remaining / 13)[:, None]
+            true_counts += self._ace_adjustments * surplus / decks
+        return true_counts
+
+    def _true_counts(self, lanes: 'np.ndarray') -> 'np.ndarray':
+        return self._system_true_counts(lanes)[:, 0]
+
+    def _playing_true_counts(self, lanes: 'np.ndarray') -> 'np.ndarray':
+        """
+        Every system's playing true count, shape (lanes, systems): every card dealt
+        so far except the hole card, as Simulator._playing_true_count sees it
+        """
+        cursor = self._cursor[lanes]
+        hole = self._code_class[self._codes[lanes, self._round_start[lanes] + 3]]
+        running = self._class_counts[lanes, cursor] @ self._tag_matrix - self._tag_matrix[hole]
+        seen = (cursor - self.start - 1)[:, None]
+        running -= self._deck_sums * seen / 52
+        remaining = self.shoe_size - cursor
+        decks = np.maximum(remaining / 52, 0.5)[:, None]
+        return np.where(remaining[:, None] > 0, running / decks, 0.0)
+
+    def _on_decisions(self, lanes: 'np.ndarray', states: 'np.ndarray', upcards: 'np.ndarray'):
+        """Flag systems whose deviations may apply at a decision on the shared path"""
+        if not len(self._replayers) or not len(lanes):
+            return
+        true_counts = self._playing_true_counts(lanes)
+        above = self._above[:, states, upcards].T
+        below = self._below[:, states, upcards].T
+        self._deviating[lanes] |= ((true_counts >= above - INDEX_SLACK)
+                                   | (true_counts <= below + INDEX_SLACK))
+
+    def run(self, rounds: int) -> SystemComparison:
+        """Play the given number of rounds and return every system's results"""
+        comparison = SystemComparison(baseline=self.systems[0].key)
+        for system in self.systems:
+            comparison.results[system.key] = SimulationResult()
+            comparison.differences[system.key] = RunningMoments()
+        self._reset()
+        start = time.perf_counter()
+
+        remaining = rounds
+        while remaining > 0:
+            active = min(self.lanes, remaining)
+            self._play_comparison_step(np.arange(active), comparison)
+            remaining -= active
+
+        elapsed = time.perf_counter() - start
+        for result in comparison.results.values():
+            result.elapsed = elapsed
+        return comparison
+
+    def _play_comparison_step(self, lanes: 'np.ndarray', comparison: SystemComparison):
+        """Play one round in each lane and settle it for every system"""
+        self._reshuffle_spent(lanes)
+        true_counts = self._system_true_counts(lanes)
+        bets = np.column_stack([ramp(true_counts[:, i]) for i, ramp in enumerate(self.bet_ramps)])
+        self._round_start[lanes] = self._cursor[lanes]
+        self._deviating[lanes] = False
+        self._reloaded[lanes] = False
+
+        units, hands, wagered = self._play_round(lanes)
+        # [lane, system]; every system shares the round unless it replays it
+        shape = (len(lanes), len(self.systems))
+        units = np.broadcast_to(units[:, None], shape).copy()
+        wagered = np.broadcast_to(wagered[:, None], shape).copy()
+        split = hands > 1
+        hands = np.broadcast_to(hands[:, None], shape).copy()
+        if len(self._replayers):
+            self._replay_deviations(lanes, split, units, hands, wagered)
+
+        profits = units * bets
+        for i, system in enumerate(self.systems):
+            self._record(comparison.results[system.key], bets[:, i], units[:, i], hands[:, i],
+                         wagered[:, i], true_counts[:, i])
+            comparison.differences[system.key].merge(_batch_moments(profits[:, i] - profits[:, 0]))
+
+    def _replay_deviations(self, lanes: 'np.ndarray', split: 'np.ndarray', units: 'np.ndarray',
+                           hands: 'np.ndarray', wagered: 'np.ndarray'):
+        """Replay flagged rounds per system in the scalar engine, updating the arrays in place"""
+        replay = (self._deviating[lanes] | split[:, None]) & self._indexed
+        # A lane that ran dry mid-round has lost its order; it keeps the shared result
+        replay &= ~self._reloaded[lanes][:, None]
+        for row in np.flatnonzero(replay.any(axis=1)):
+            lane = int(lanes[row])
+            for column in np.flatnonzero(replay[row]).tolist():
+                units[row, column], hands[row, column], wagered[row, column], end, ran_dry = \
+                    self._replay(lane, column)
+                if column == 0:
+                    self._cursor[lane] = end
+                    if ran_dry:
+                        self._load_shoes(np.array([lane]))
+
+    def _replay(self, lane: int, column: int):
+        """
+        Replay a lane's round for one system from its first four cards, with the
+        system's counter and index table; returns (units, hands, wagered units,
+        end cursor, whether the shoe ran dry)
+        """
+        simulator = self._replayers[column]
+        system = self.systems[column]
+        start = int(self._round_start[lane])
+        codes = self._codes[lane]
+        shoe = simulator.game_state.shoe
+        shoe.load_order(codes, start + 4)
+        shoe.ran_dry = False
+
+        # The count as it stood when the round was dealt
+        counts = self._class_counts[lane, start]
+        counter = simulator.counter
+        counter.running_count = (float(counts @ self._tag_matrix[:, column])
+                                 + system.initial_running_count(self.rules.num_decks))
+        counter.cards_seen = start - self.start
+        counter.aces_seen = int(counts[self._ace_classes].sum())
+
+        units, hands, wagered = self._play_scalar(simulator, codes, start + 4)
+        return units, hands, wagered, shoe._cursor, shoe.ran_dry
+
+
+def format_comparison(comparison: SystemComparison) -> str:
+    """Format a system comparison for console output"""
+    lines = [f"=== Counting Systems (paired against {COUNTING_SYSTEMS[comparison.baseline].name}) ===",
+             f"{'System':<14} {'Win/100':>9} {'EV %':>7} {'SD $':>8} {'SCORE':>8} "
+             f"{'DI':>7} {'dDI':>7} {'Diff/100':>9} {'± SE':>7}"]
+    for key, row in comparison.get_summary().items():
+        lines.append(f"{COUNTING_SYSTEMS[key].name:<14} {row['win_rate_per_100']:>+9.2f} "
+                     f"{row['ev_percentage']:>+7.3f} {row['std_dev']:>8.2f} {row['score']:>8.2f} "
+                     f"{row['desirability_index']:>+7.2f} {row['di_difference']:>+7.2f} "
+                     f"{row['difference_per_100']:>+9.2f} "
+                     f"{row['difference_std_error']:>7.2f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compare counting systems on the same shoes")
+    parser.add_argument('--systems', default=",".join(COUNTING_SYSTEMS),
+                        help="Comma-separated system keys; the first is the baseline")
+    parser.add_argument('--rounds', type=int, default=1000000,
+                        help="Number of rounds to simulate")
+    parser.add_argument('--lanes', type=int, default=10000,
+                        help="Shoes played side by side")
+    parser.add_argument('--betting', choices=['flat', 'spread', 'optimal'], default=None,
+                        help="Override the betting strategy from settings")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed for a reproducible run")
+    parser.add_argument('--index-plays', action='store_true',
+                        help="Let each system deviate with its own index table (see index_plays)")
+    parser.add_argument('--typed-charts', action='store_true',
+                        help="Play the typed charts instead of ones generated for the rules")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("compare_systems requires numpy (pip install numpy)")
+        return 1
+    if args.betting:
+        settings.betting_limits.betting_strategy = args.betting
+    try:
+        systems = [get_counting_system(key.strip()) for key in args.systems.split(",")]
+        strategy = settings.betting_limits.betting_strategy
+        bet_ramp = flat_ramp() if strategy == "kelly" else ramp_for_limits()
+        charts = None if args.typed_charts else StrategyCharts.load_or_generate()
+        index_tables = None
+        if args.index_plays:
+            index_tables = {system.key: IndexTable.load_or_generate(system, charts=charts)
+                            for system in systems}
+        simulator = MultiSystemSimulator(systems, lanes=args.lanes, bet_ramp=bet_ramp,
+                                         rng=np.random.default_rng(args.seed),
+                                         index_tables=index_tables, charts=charts)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    comparison = simulator.run(args.rounds)
+    print(format_comparison(comparison))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 """Game configuration and constants"""
 
+import os
+
 # Window settings
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 1050
@@ -35,7 +37,10 @@ HI_LO_VALUES = {
     '10': -1, 'J': -1, 'Q': -1, 'K': -1, 'A': -1
 }
 
-# EV calculation settings
+# Simulated and solved tables, keyed by rule set (see RuleSet.cache_key)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# EV calculation defaults, until house_edge solves them for the active rules
 BASE_HOUSE_EDGE = -0.005  # -0.5%
 TRUE_COUNT_ADVANTAGE = 0.005  # 0.5% per true count
 
@@ -0,0 +1,154 @@
+"""Registry of card counting systems with array-based tag lookup
+
+Each system stores its tags twice: by rank index (0-9 for 2..9, ten, ace, as
+in hand_state) for composition maths, and by card code (0-51, as in
+game_engine.CARD_POOL) so suit-dependent tags like Red 7 work and a block of
+dealt codes can be counted with one gather-and-sum.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; counts fall back to Python sums
+    np = None
+
+from game_engine import RANKS, RANK_INDEX, SUITS
+from settings import settings
+
+Tag = Union[int, float]
+RED_SUITS = ('hearts', 'diamonds')
+ACE_INDEX = 9
+
+
+@dataclass(frozen=True, eq=False)
+class CountingSystem:
+    """A point-count system: per-rank tags plus optional ace side count"""
+    key: str
+    name: str
+    rank_tags: Tuple[Tag, ...]  # By rank index 2..9, ten, ace (before code_overrides)
+    level: int = 1
+    ace_side_count: bool = False
+    # Points added to the running count per surplus ace remaining (side count)
+    ace_adjustment: int = 0
+    # Per-card-code overrides, e.g. red sevens in Red 7
+    code_overrides: Dict[int, Tag] = field(default_factory=dict)
+    # Initial running count per deck beyond the first (unbalanced systems)
+    irc_per_deck: Tag = 0
+    # Count the IRC over every deck instead (Red 7 starts at -2 per deck)
+    irc_uses_full_decks: bool = False
+
+    def __post_init__(self):
+        if len(self.rank_tags) != 10:
+            raise ValueError(f"{self.name}: expected 10 rank tags, got {len(self.rank_tags)}")
+        code_tags = []
+        for code in range(52):
+            tag = self.code_overrides.get(code, self.rank_tags[RANK_INDEX[RANKS[code % 13]]])
+            code_tags.append(tag)
+        object.__setattr__(self, 'code_tags', tuple(code_tags))
+        object.__setattr__(self, '_arrays', {})
+
+    @property
+    def deck_sum(self) -> Tag:
+        """Sum of tags over one 52-card deck (0 for balanced systems)"""
+        return sum(self.code_tags)
+
+    @property
+    def balanced(self) -> bool:
+        return self.deck_sum == 0
+
+    @property
+    def fractional(self) -> bool:
+        return any(isinstance(tag, float) and not tag.is_integer() for tag in self.code_tags)
+
+    def initial_running_count(self, num_decks: int) -> Tag:
+        """Running count at the start of a shoe"""
+        decks = num_decks if self.irc_uses_full_decks else num_decks - 1
+        return self.irc_per_deck * decks
+
+    def tag(self, rank: str, suit: Optional[str] = None) -> Tag:
+        """Tag for a card by rank and (optionally) suit"""
+        if suit is not None and suit.lower() in SUITS and rank in RANKS:
+            return self.code_tags[SUITS.index(suit.lower()) * 13 + RANKS.index(rank)]
+        return self.rank_tags[RANK_INDEX.get(rank, 8)]
+
+    def tag_array(self, by: str = "code") -> 'np.ndarray':
+        """Tags as a NumPy array indexed by card code ("code") or rank index ("rank")"""
+        if np is None:
+            raise ImportError("Tag arrays require numpy (pip install numpy)")
+        array = self._arrays.get(by)
+        if array is None:
+            tags = self.code_tags if by == "code" else self.rank_tags
+            dtype = np.float64 if self.fractional else np.int16
+            array = np.array(tags, dtype=dtype)
+            array.flags.writeable = False
+            self._arrays[by] = array
+        return array
+
+    def average_rank_tags(self) -> Tuple[float, ...]:
+        """Mean tag of each rank index over its four suits (differs from rank_tags for Red 7)"""
+        totals = [0.0] * 10
+        for code, tag in enumerate(self.code_tags):
+            totals[RANK_INDEX[RANKS[code % 13]]] += tag
+        return tuple(total / (16 if index == 8 else 4) for index, total in enumerate(totals))
+
+    def get_count_value(self, card) -> Tag:
+        """Tag for a dealt Card"""
+        if card.code >= 0:
+            return self.code_tags[card.code]
+        return self.tag(card.rank, card.suit)
+
+    def count_codes(self, codes: Union[Sequence[int], 'np.ndarray']) -> Tag:
+        """Running count contribution of a block of dealt card codes"""
+        if np is not None and isinstance(codes, np.ndarray):
+            return self.tag_array("code")[codes].sum().item()
+        code_tags = self.code_tags
+        return sum(code_tags[code] for code in codes)
+
+    def count_composition(self, counts: Sequence[int]) -> Tag:
+        """Sum of tags over cards given as counts per rank index"""
+        return sum(tag * n for tag, n in zip(self.rank_tags, counts))
+
+
+def _red(rank: str) -> Dict[int, int]:
+    """Card codes for the red cards of a rank"""
+    return {SUITS.index(suit) * 13 + RANKS.index(rank): 1 for suit in RED_SUITS}
+
+
+#                                2    3    4    5    6    7    8    9   10    A
+COUNTING_SYSTEMS: Dict[str, CountingSystem] = {system.key: system for system in [
+    CountingSystem("hi-lo", "Hi-Lo",           (1,   1,   1,   1,   1,   0,   0,   0,  -1,  -1)),
+    CountingSystem("ko", "KO",                 (1,   1,   1,   1,   1,   1,   0,   0,  -1,  -1),
+                   irc_per_deck=-4),
+    CountingSystem("hi-opt-1", "Hi-Opt I",     (0,   1,   1,   1,   1,   0,   0,   0,  -1,   0),
+                   ace_side_count=True, ace_adjustment=1),
+    CountingSystem("hi-opt-2", "Hi-Opt II",    (1,   1,   2,   2,   1,   1,   0,   0,  -2,   0),
+                   level=2, ace_side_count=True, ace_adjustment=2),
+    CountingSystem("omega-2", "Omega II",      (1,   1,   2,   2,   2,   1,   0,  -1,  -2,   0),
+                   level=2, ace_side_count=True, ace_adjustment=2),
+    CountingSystem("zen", "Zen Count",         (1,   1,   2,   2,   2,   1,   0,   0,  -2,  -1),
+                   level=2),
+    CountingSystem("wong-halves", "Wong Halves", (0.5, 1, 1, 1.5, 1, 0.5, 0, -0.5, -1, -1),
+                   level=3),
+    CountingSystem("red-7", "Red 7",           (1,   1,   1,   1,   1,   0,   0,   0,  -1,  -1),
+                   code_overrides=_red('7'), irc_per_deck=-2, irc_uses_full_decks=True),
+]}
+
+DEFAULT_SYSTEM = "hi-lo"
+
+
+def get_counting_system(key: Optional[str] = None) -> CountingSystem:
+    """Look up a system by key; None means the one selected in settings"""
+    if key is None:
+        return COUNTING_SYSTEMS.get(settings.counting_system.system, COUNTING_SYSTEMS[DEFAULT_SYSTEM])
+    system = COUNTING_SYSTEMS.get(key)
+    if system is None:
+        raise ValueError(f"Unknown counting system '{key}'; "
+                         f"choose from {', '.join(COUNTING_SYSTEMS)}")
+    return system
+
+
+def system_choices() -> List[Tuple[str, str]]:
+    """(key, display name) pairs for the settings UI"""
+    return [(system.key, system.name) for system in COUNTING_SYSTEMS.values()]
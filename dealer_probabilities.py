@@ -0,0 +1,163 @@
+"""Exact dealer final-total distribution for a given shoe composition
+
+The dealer's result is enumerated card by card through the hand_state
+transition table, drawing without replacement from the remaining shoe.
+Within one enumeration, subtrees are shared by the multiset of cards drawn
+so far; across calls, finished distributions are kept in a bounded LRU cache
+keyed by (composition, upcard, soft 17 rule, peek). The cache is locked, so
+the EV worker and the background chart solvers can share the module-wide
+instance.
+
+A composition is a tuple of 10 unseen-card counts by rank index
+(2-9, ten-value, ace), e.g. ArrayShoe.composition(), and excludes the upcard.
+Counts may also be fractional (an average composition, as index_plays
+builds); a rank stops being drawn once its count runs out.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from hand_state import (
+    ACE_INDEX, EMPTY_STATE, NUM_RANKS, STATE_BUST, STATE_CARDS, STATE_NATURAL,
+    STATE_VALUE, TEN_INDEX, TRANSITIONS, dealer_hits_table
+)
+from settings import settings
+
+# Indices into a distribution tuple
+RESULT_LABELS = ('17', '18', '19', '20', '21', 'bust', 'blackjack')
+BUST = 5
+BLACKJACK = 6
+NUM_RESULTS = len(RESULT_LABELS)
+
+Composition = Tuple[int, ...]
+Distribution = Tuple[float, ...]
+
+
+def shoe_composition(num_decks: int) -> Composition:
+    """Get the rank composition of a full shoe"""
+    per_deck = 4 * num_decks
+    counts = [per_deck] * NUM_RANKS
+    counts[TEN_INDEX] = 4 * per_deck
+    return tuple(counts)
+
+
+def _enumerate(upcard_index: int, composition: Sequence[int],
+               hits: Tuple[bool, ...], no_blackjack: bool) -> Distribution:
+    """Enumerate every dealer draw sequence from the upcard"""
+    counts = list(composition)
+    memo: Dict[Composition, List[float]] = {}
+
+    # Under peek, the hole card cannot complete a natural
+    hole_excluded = -1
+    if no_blackjack:
+        if upcard_index == ACE_INDEX:
+            hole_excluded = TEN_INDEX
+        elif upcard_index == TEN_INDEX:
+            hole_excluded = ACE_INDEX
+
+    def draw(state: int, total: int) -> List[float]:
+        # The drawn multiset determines the dealer's state for a fixed upcard
+        key = tuple(counts)
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+
+        result = [0.0] * NUM_RESULTS
+        excluded = hole_excluded if STATE_CARDS[state] == 1 else -1
+        denominator = total - (counts[excluded] if excluded >= 0 else 0)
+        if denominator <= 0:
+            memo[key] = result
+            return result
+
+        base = state * NUM_RANKS
+        for rank_index in range(NUM_RANKS):
+            n = counts[rank_index]
+            if n <= 0 or rank_index == excluded:
+                continue
+            p = n / denominator
+            next_state = TRANSITIONS[base + rank_index]
+            if STATE_NATURAL[next_state]:
+                result[BLACKJACK] += p
+            elif STATE_BUST[next_state]:
+                result[BUST] += p
+            elif hits[next_state]:
+                counts[rank_index] = n - 1
+                sub = draw(next_state, total - 1)
+                counts[rank_index] = n
+                for i in range(NUM_RESULTS):
+                    result[i] += p * sub[i]
+            else:
+                result[STATE_VALUE[next_state] - 17] += p
+
+        memo[key] = result
+        return result
+
+    start = TRANSITIONS[EMPTY_STATE * NUM_RANKS + upcard_index]
+    return tuple(draw(start, sum(counts)))
+
+
+class DealerProbabilities:
+    """Memoized exact dealer outcome distributions"""
+
+    def __init__(self, cache_size: int = 4096):
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[Tuple, Distribution]' = OrderedDict()
+        # Guards the cache and counters; enumeration runs outside it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def distribution(self, upcard_index: int, composition: Sequence[int],
+                     stand_soft_17: Optional[bool] = None,
+                     no_blackjack: bool = False) -> Distribution:
+        """
+        Get the probability of each final dealer result (see RESULT_LABELS)
+        no_blackjack: condition on the dealer having peeked and found no blackjack
+        """
+        if stand_soft_17 is None:
+            stand_soft_17 = settings.game_rules.dealer_stand_soft_17
+        key = (tuple(composition), upcard_index, stand_soft_17, no_blackjack)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return cached
+            self.misses += 1
+
+        result = _enumerate(upcard_index, key[0], dealer_hits_table(stand_soft_17), no_blackjack)
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)  # Another thread may have stored it meanwhile
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def all_upcards(self, composition: Sequence[int], stand_soft_17: Optional[bool] = None,
+                    no_blackjack: bool = False) -> Tuple[Distribution, ...]:
+        """Get the distribution for every upcard, removing each upcard from the composition"""
+        results = []
+        for upcard_index in range(NUM_RANKS):
+            counts = list(composition)
+            if counts[upcard_index] == 0:
+                results.append((0.0,) * NUM_RESULTS)
+                continue
+            counts[upcard_index] -= 1
+            results.append(self.distribution(upcard_index, counts, stand_soft_17, no_blackjack))
+        return tuple(results)
+
+    def clear(self):
+        """Drop all cached distributions"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+# Shared instance for callers that don't need their own cache
+dealer_probabilities = DealerProbabilities()
@@ -0,0 +1,331 @@
+"""Effects of removal - change in basic-strategy EV when one card leaves a full shoe
+
+The basic-strategy EV of a composition is summed exactly over every
+two-card hand and upcard: the first decision comes from the compiled basic
+strategy and its EV from exact_ev (later hit/stand choices are
+composition-dependent, as in exact_ev). Removing one card of each rank and
+re-solving gives the EOR for that rank. Index-play decisions get the same
+treatment, so each counting system's tags can be correlated against them:
+
+    betting correlation (BC)    tags vs. the EORs of the overall EV
+    playing efficiency (PE)     tags vs. the EORs of the playing decisions,
+                                averaged over the Illustrious 18 plays
+    insurance correlation (IC)  tags vs. the EORs of the insurance bet
+
+The first decisions come from the charts the engine plays (generated for the
+rules, or the typed ones). The eleven solves (full shoe plus one removal per
+rank) are independent and run on a process pool; results are cached on disk
+per rule set and charts.
+
+    python -m eor --workers 4
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from basic_strategy import BasicStrategy, CompiledStrategy
+from config import CACHE_DIR
+from counting_systems import COUNTING_SYSTEMS, CountingSystem
+from dealer_probabilities import shoe_composition
+from exact_ev import ExactEVCalculator, remove_cards
+from hand_state import ACE_INDEX, NUM_RANKS, TEN_INDEX, state_from_ranks
+from settings import RuleSet, settings
+from strategy_generator import StrategyCharts, charts_tag
+
+RANK_LABELS = ('2', '3', '4', '5', '6', '7', '8', '9', 'T', 'A')
+# Cards of each rank per deck, the weights for every correlation
+RANK_WEIGHTS = (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)
+ACTION_NAMES = {'H': 'hit', 'S': 'stand', 'D': 'double', 'Ds': 'double', 'P': 'split'}
+# Bump when the solver changes, so tables cached by an older one are solved again
+EOR_FORMAT = 2
+
+# The Illustrious 18 playing decisions (insurance is scored separately):
+# (label, player rank indices, upcard index, action at high counts, alternative)
+PLAY_DECISIONS: Tuple[Tuple[str, Tuple[int, int], int, str, str], ...] = (
+    ("16 v T", (8, 4), 8, 'stand', 'hit'),
+    ("15 v T", (8, 3), 8, 'stand', 'hit'),
+    ("TT v 5", (8, 8), 3, 'split', 'stand'),
+    ("TT v 6", (8, 8), 4, 'split', 'stand'),
+    ("10 v T", (4, 2), 8, 'double', 'hit'),
+    ("12 v 3", (8, 0), 1, 'stand', 'hit'),
+    ("12 v 2", (8, 0), 0, 'stand', 'hit'),
+    ("11 v A", (4, 3), 9, 'double', 'hit'),
+    ("9 v 2", (3, 2), 0, 'double', 'hit'),
+    ("10 v A", (4, 2), 9, 'double', 'hit'),
+    ("9 v 7", (3, 2), 5, 'double', 'hit'),
+    ("16 v 9", (8, 4), 7, 'stand', 'hit'),
+    ("13 v 2", (8, 1), 0, 'stand', 'hit'),
+    ("12 v 4", (8, 0), 2, 'stand', 'hit'),
+    ("12 v 5", (8, 0), 3, 'stand', 'hit'),
+    ("12 v 6", (8, 0), 4, 'stand', 'hit'),
+    ("13 v 3", (8, 1), 1, 'stand', 'hit'),
+)
+
+
+def eor_path(rules: RuleSet, cache_dir: str = CACHE_DIR,
+             charts: Optional[StrategyCharts] = None) -> str:
+    """Cache file for a rule set and charts; the shoe cut does not affect a full-shoe solve"""
+    return os.path.join(cache_dir, f"eor_{rules.cache_key()}_{rules.num_decks}d_"
+                                   f"{charts_tag(charts)}_v{EOR_FORMAT}.json")
+
+
+def weighted_correlation(x: Sequence[float], y: Sequence[float],
+                         weights: Sequence[float] = RANK_WEIGHTS) -> float:
+    """Pearson correlation of two per-rank vectors, weighting ranks by card count"""
+    total = sum(weights)
+    mean_x = sum(w * a for w, a in zip(weights, x)) / total
+    mean_y = sum(w * b for w, b in zip(weights, y)) / total
+    covariance = sum(w * (a - mean_x) * (b - mean_y) for w, a, b in zip(weights, x, y))
+    var_x = sum(w * (a - mean_x) ** 2 for w, a in zip(weights, x))
+    var_y = sum(w * (b - mean_y) ** 2 for w, b in zip(weights, y))
+    if var_x <= 0 or var_y <= 0:
+        return 0.0
+    return covariance / math.sqrt(var_x * var_y)
+
+
+def basic_strategy_ev(composition: Sequence[int], rules: RuleSet,
+                      compiled: Optional[CompiledStrategy] = None,
+                      calculator: Optional[ExactEVCalculator] = None) -> float:
+    """EV per initial bet of one round of basic strategy dealt from a composition"""
+    compiled = compiled if compiled is not None else BasicStrategy().compile(rules)
+    calculator = calculator if calculator is not None else ExactEVCalculator(cache_size=8)
+    total = sum(composition)
+    ev = 0.0
+    for first in range(NUM_RANKS):
+        for second in range(first, NUM_RANKS):
+            for upcard in range(NUM_RANKS):
+                # Player, upcard, player without replacement; either order of a non-pair
+                counts = list(composition)
+                probability = 1.0 if first == second else 2.0
+                remaining = total
+                for rank_index in (first, upcard, second):
+                    if counts[rank_index] <= 0:
+                        probability = 0.0
+                        break
+                    probability *= counts[rank_index] / remaining
+                    counts[rank_index] -= 1
+                    remaining -= 1
+                if probability == 0.0:
+                    continue
+
+                # Chance the dealer peeks a natural from the rest of the shoe
+                dealer_natural = 0.0
+                if upcard == ACE_INDEX:
+                    dealer_natural = counts[TEN_INDEX] / remaining
+                elif upcard == TEN_INDEX:
+                    dealer_natural = counts[ACE_INDEX] / remaining
+
+                if (first, second) == (TEN_INDEX, ACE_INDEX):
+                    ev += probability * (1 - dealer_natural) * rules.blackjack_payout
+                    continue
+
+                state = state_from_ranks((first, second))
+                action = ACTION_NAMES[compiled.lookup(state, upcard, True, True)]
+                evs = calculator.action_evs((first, second), upcard, counts, rules=rules)
+                played = evs.get(action, evs['hit'] if action == 'double' else evs['stand'])
+                ev += probability * ((1 - dealer_natural) * played - dealer_natural)
+    return ev
+
+
+def decision_gain(composition: Sequence[int], decision: Tuple, rules: RuleSet,
+                  calculator: Optional[ExactEVCalculator] = None) -> Optional[float]:
+    """EV of a decision's high-count action minus its alternative (None if not allowed)"""
+    _, player, upcard, action, alternative = decision
+    calculator = calculator if calculator is not None else ExactEVCalculator(cache_size=8)
+    counts = remove_cards(composition, tuple(player) + (upcard,))
+    evs = calculator.action_evs(player, upcard, counts, rules=rules)
+    if action not in evs or alternative not in evs:
+        return None
+    return evs[action] - evs[alternative]
+
+
+def insurance_ev(composition: Sequence[int]) -> float:
+    """EV per unit of an insurance bet against an ace upcard"""
+    counts = remove_cards(composition, (ACE_INDEX,))
+    tens = counts[TEN_INDEX] / sum(counts)
+    return 2 * tens - (1 - tens)
+
+
+def _solve(job: Tuple[RuleSet, Optional[int], Optional[StrategyCharts]]) -> Dict:
+    """Worker entry point: solve the full shoe, or the shoe less one card of a rank"""
+    rules, removed, charts = job
+    composition = shoe_composition(rules.num_decks)
+    if removed is not None:
+        composition = remove_cards(composition, (removed,))
+    strategy = BasicStrategy()
+    strategy.use_charts(charts)
+    compiled = strategy.compile(rules)
+    calculator = ExactEVCalculator(cache_size=8)
+    return {
+        'ev': basic_strategy_ev(composition, rules, compiled, calculator),
+        'decisions': [decision_gain(composition, decision, rules, calculator)
+                      for decision in PLAY_DECISIONS],
+        'insurance': insurance_ev(composition)
+    }
+
+
+@dataclass
+class EORTable:
+    """Effects of removal for a rule set, in EV per initial bet per card removed"""
+    num_decks: int
+    base_ev: float
+    eor: List[float]  # By rank index
+    # Decision label -> EOR of its gain, for decisions the rules allow
+    decisions: Dict[str, List[float]] = field(default_factory=dict)
+    insurance: List[float] = field(default_factory=list)
+
+    @classmethod
+    def compute(cls, rules: Optional[RuleSet] = None, workers: Optional[int] = None,
+                charts: Optional[StrategyCharts] = None) -> 'EORTable':
+        """
+        Solve the full shoe and each single-card removal, in parallel when workers > 1
+        charts: the basic strategy played (None for the typed charts)
+        """
+        rules = rules if rules is not None else settings.rule_set()
+        workers = workers or os.cpu_count() or 1
+        jobs = [(rules, None, charts)] + [(rules, rank_index, charts)
+                                          for rank_index in range(NUM_RANKS)]
+        if workers == 1:
+            solved = [_solve(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                solved = list(pool.map(_solve, jobs))
+
+        base, removals = solved[0], solved[1:]
+        decisions = {}
+        for i, decision in enumerate(PLAY_DECISIONS):
+            if base['decisions'][i] is None:
+                continue
+            decisions[decision[0]] = [removal['decisions'][i] - base['decisions'][i]
+                                      for removal in removals]
+        return cls(
+            num_decks=rules.num_decks,
+            base_ev=base['ev'],
+            eor=[removal['ev'] - base['ev'] for removal in removals],
+            decisions=decisions,
+            insurance=[removal['insurance'] - base['insurance'] for removal in removals]
+        )
+
+    @classmethod
+    def load_or_compute(cls, rules: Optional[RuleSet] = None, workers: Optional[int] = None,
+                        cache_dir: Optional[str] = CACHE_DIR,
+                        charts: Optional[StrategyCharts] = None) -> 'EORTable':
+        """Load the cached table for these rules and charts, solving and saving it if missing"""
+        rules = rules if rules is not None else settings.rule_set()
+        path = eor_path(rules, cache_dir, charts) if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                return cls.load(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable EOR table {path}: {e}")
+
+        table = cls.compute(rules, workers, charts)
+        if path:
+            table.save(path)
+        return table
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            'format': EOR_FORMAT,
+            'num_decks': self.num_decks,
+            'base_ev': self.base_ev,
+            'eor': self.eor,
+            'decisions': self.decisions,
+            'insurance': self.insurance
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'EORTable':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('format') != EOR_FORMAT:
+            raise ValueError(f"solved by an older EOR solver (format {data.get('format')})")
+        return cls(data['num_decks'], data['base_ev'], data['eor'], data['decisions'],
+                   data['insurance'])
+
+    def betting_correlation(self, system: CountingSystem) -> float:
+        """Correlation of the system's tags with the EORs of the overall EV"""
+        return weighted_correlation(system.average_rank_tags(), self.eor)
+
+    def playing_efficiency(self, system: CountingSystem) -> float:
+        """Mean correlation magnitude of the tags with each playing decision's EORs"""
+        if not self.decisions:
+            return 0.0
+        tags = system.average_rank_tags()
+        # A negative correlation still makes a usable (negative) index
+        correlations = [abs(weighted_correlation(tags, eor)) for eor in self.decisions.values()]
+        return sum(correlations) / len(correlations)
+
+    def insurance_correlation(self, system: CountingSystem) -> float:
+        """Correlation of the tags with the EORs of the insurance bet"""
+        return weighted_correlation(system.average_rank_tags(), self.insurance)
+
+    def system_summary(self, system: CountingSystem) -> Dict:
+        return {
+            'betting_correlation': self.betting_correlation(system),
+            'playing_efficiency': self.playing_efficiency(system),
+            'insurance_correlation': self.insurance_correlation(system)
+        }
+
+    def get_summary(self) -> Dict:
+        return {
+            'num_decks': self.num_decks,
+            'base_ev': self.base_ev,
+            'eor': dict(zip(RANK_LABELS, self.eor)),
+            'systems': {key: self.system_summary(system)
+                        for key, system in COUNTING_SYSTEMS.items()}
+        }
+
+
+def format_eor(table: EORTable) -> str:
+    """Format EORs and per-system correlations for console output"""
+    lines = [f"=== Effects of Removal ({table.num_decks} decks) ===",
+             f"Basic strategy EV: {table.base_ev * 100:+.3f}%",
+             f"{'Rank':>6} {'EOR %':>9} {'x decks':>9}"]
+    for label, eor in zip(RANK_LABELS, table.eor):
+        lines.append(f"{label:>6} {eor * 100:>+9.4f} {eor * table.num_decks * 100:>+9.3f}")
+    lines.extend(["", f"{'System':<14} {'BC':>6} {'PE':>6} {'IC':>6}"])
+    for system in COUNTING_SYSTEMS.values():
+        summary = table.system_summary(system)
+        lines.append(f"{system.name:<14} {summary['betting_correlation']:>6.3f} "
+                     f"{summary['playing_efficiency']:>6.3f} "
+                     f"{summary['insurance_correlation']:>6.3f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Effects of removal and counting system correlations")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Solve again even if a cached table exists")
+    parser.add_argument('--typed-charts', action='store_true',
+                        help="Play the typed charts instead of ones generated for the rules")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rules = settings.rule_set()
+    charts = None if args.typed_charts else StrategyCharts.load_or_generate(rules)
+    if args.no_cache:
+        table = EORTable.compute(rules, args.workers, charts)
+        table.save(eor_path(rules, charts=charts))
+    else:
+        table = EORTable.load_or_compute(rules, args.workers, charts=charts)
+    print(format_eor(table))
+    print(f"\nSolved in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,88 @@
 """Expected Value (EV) calculation engine"""
 
-from typing import Dict, List, Tuple
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
 from config import BASE_HOUSE_EDGE, TRUE_COUNT_ADVANTAGE
 
+@dataclass(frozen=True)
+class HouseEdgeModel:
+    """
+    Player edge (EV per initial bet) as a linear function of the true count
+    Solved per counting system and rule set by house_edge
+    """
+    base_house_edge: float  # Off the top; negative when the house has the edge
+    true_count_advantage: float  # Edge gained per true count point
+    system: Optional[str] = None  # None for the config defaults
+    rules_key: Optional[str] = None
+    
+    def player_edge(self, true_count: float) -> float:
+        return self.base_house_edge + true_count * self.true_count_advantage
+    
+    @classmethod
+    def default(cls) -> 'HouseEdgeModel':
+        """The fixed estimates from config"""
+        return cls(BASE_HOUSE_EDGE, TRUE_COUNT_ADVANTAGE)
+    
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(asdict(self), f)
+    
+    @classmethod
+    def load(cls, path: str) -> 'HouseEdgeModel':
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
 class EVCalculator:
     """Calculates expected value based on count and game conditions"""
     
-    def __init__(self):
-        self.base_house_edge = BASE_HOUSE_EDGE
-        self.true_count_advantage = TRUE_COUNT_ADVANTAGE
+    def __init__(self, model: Optional[HouseEdgeModel] = None):
         self.session_stats = SessionStats()
+        self.set_model(model if model is not None else HouseEdgeModel.default())
+        # Simulated EV by true count (ev_table.EVTable); the linear model is the fallback
+        self.ev_table = None
+    
+    def set_model(self, model: HouseEdgeModel):
+        """Use a house edge model (e.g. one solved for the current rules)"""
+        self.model = model
+        self.base_house_edge = model.base_house_edge
+        self.true_count_advantage = model.true_count_advantage
+    
+    def set_ev_table(self, ev_table):
+        """Use a simulated per-true-count EV table, or None for the linear model"""
+        self.ev_table = ev_table
+    
+    def edge(self, true_count: float) -> float:
+        """Player edge per initial bet at a true count"""
+        if self.ev_table is not None:
+            return self.ev_table.edge(true_count)
+        return self.base_house_edge + true_count * self.true_count_advantage
+    
+    def full_kelly_fraction(self, true_count: float) -> float:
+        """
+        Growth-optimal share of the bankroll to bet at a true count
+        From the EV table's outcome distributions when one is loaded; otherwise
+        the even-money approximation (edge over unit variance)
+        """
+        if self.ev_table is not None:
+            return self.ev_table.kelly_fraction(true_count)
+        return max(0.0, self.edge(true_count))
     
     def calculate_ev(self, true_count: float, bet_size: float) -> float:
         """
         Calculate expected value for a bet
-        Each true count point adds approximately 0.5% to player advantage
+        From the EV table when one is loaded; otherwise each true count point
+        adds true_count_advantage (about 0.5%) to player advantage
         """
-        # Calculate player edge
-        count_advantage = true_count * self.true_count_advantage
-        total_edge = self.base_house_edge + count_advantage
-        
         # EV = bet_size * edge
-        return bet_size * total_edge
+        return bet_size * self.edge(true_count)
     
     def get_player_edge(self, true_count: float) -> float:
         """Get player edge as a percentage"""
-        count_advantage = true_count * self.true_count_advantage
-        return (self.base_house_edge + count_advantage) * 100
+        return self.edge(true_count) * 100
     
     def calculate_kelly_bet(self, bankroll: float, true_count: float, 
                           kelly_fraction: float = 0.25) -> float:
@@ -34,15 +90,13 @@ class EVCalculator:
         Calculate optimal bet size using Kelly Criterion
         Using fractional Kelly (default 25%) for variance reduction
         """
-        edge = self.base_house_edge + (true_count * self.true_count_advantage)
+        fraction = self.full_kelly_fraction(true_count)
         
         # Only bet when we have an edge
-        if edge <= 0:
+        if fraction <= 0:
             return 0
         
-        # Kelly formula: edge / odds
-        # For even money bets, odds = 1
-        kelly_bet = bankroll * edge * kelly_fraction
+        kelly_bet = bankroll * fraction * kelly_fraction
         
         return max(0, kelly_bet)
     
@@ -50,25 +104,245 @@ class EVCalculator:
                          outcome: float):
         """Update session EV tracking"""
         expected = self.calculate_ev(true_count, bet_size)
-        self.session_stats.add_hand(bet_size, expected, outcome)
+        self.session_stats.add_hand(bet_size, expected, outcome, true_count)
+
+class TrueCountAggregator:
+    """
+    Streaming per-true-count totals
+    Each bucket keeps [count, wagered, net result, sum of squared results], so
+    memory stays constant per bucket however many hands are added. Bucket keys
+    are integers: a key k covers true counts from k * bucket_width up to the
+    next bucket, rounded down ("floor") or toward zero ("truncate").
+    """
+    
+    ROUNDING_MODES = ("floor", "truncate")
+    
+    def __init__(self, bucket_width: float = 1.0, rounding: str = "floor"):
+        if bucket_width <= 0:
+            raise ValueError(f"bucket_width must be positive, got {bucket_width}")
+        if rounding not in self.ROUNDING_MODES:
+            raise ValueError(f"rounding must be one of {self.ROUNDING_MODES}, got {rounding!r}")
+        self.bucket_width = bucket_width
+        self.rounding = rounding
+        self._buckets: Dict[int, List[float]] = {}
+    
+    def bucket_key(self, true_count: float) -> int:
+        """Bucket a true count falls in"""
+        scaled = true_count / self.bucket_width
+        if self.rounding == "floor":
+            return math.floor(scaled)
+        return int(scaled)
+    
+    def bucket_start(self, key: int) -> float:
+        """Lowest true count (in magnitude for truncate) covered by a bucket"""
+        return key * self.bucket_width
+    
+    def add(self, true_count: float, wagered: float, result: float):
+        """Record one hand or round"""
+        self.add_bucket(self.bucket_key(true_count), 1, wagered, result, result * result)
+    
+    def add_bucket(self, key: int, count: int, wagered: float, net: float,
+                   sum_squares: float):
+        """Fold pre-summed totals into a bucket (e.g. from a batch of hands)"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [0, 0.0, 0.0, 0.0]
+        bucket[0] += count
+        bucket[1] += wagered
+        bucket[2] += net
+        bucket[3] += sum_squares
+    
+    def merge(self, other: 'TrueCountAggregator') -> 'TrueCountAggregator':
+        """Add another aggregator's buckets to this one"""
+        if (other.bucket_width, other.rounding) != (self.bucket_width, self.rounding):
+            raise ValueError("Cannot merge aggregators with different bucketing")
+        for key, bucket in other._buckets.items():
+            self.add_bucket(key, *bucket)
+        return self
+    
+    def ev_percentage(self, key: int) -> float:
+        """Net result as a percentage of the amount wagered in a bucket"""
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket[1] == 0:
+            return 0.0
+        return bucket[2] / bucket[1] * 100
+    
+    def variance(self, key: int) -> float:
+        """Sample variance of the per-hand result in a bucket"""
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket[0] < 2:
+            return 0.0
+        count, _, net, sum_squares = bucket
+        mean = net / count
+        return max(0.0, (sum_squares - count * mean * mean) / (count - 1))
+    
+    def get_summary(self) -> List[Dict]:
+        """Per-bucket rows sorted by true count"""
+        rows = []
+        for key in sorted(self._buckets):
+            count, wagered, net, _ = self._buckets[key]
+            rows.append({
+                'true_count': self.bucket_start(key),
+                'hands': count,
+                'wagered': wagered,
+                'net_result': net,
+                'ev_percentage': self.ev_percentage(key),
+                'std_dev': math.sqrt(self.variance(key))
+            })
+        return rows
+    
+    def total_count(self) -> int:
+        """Hands recorded across all buckets"""
+        return sum(bucket[0] for bucket in self._buckets.values())
+    
+    def clear(self):
+        """Drop all buckets"""
+        self._buckets.clear()
+    
+    def get(self, key: int, default=None) -> Optional[List[float]]:
+        return self._buckets.get(key, default)
+    
+    def keys(self):
+        return self._buckets.keys()
+    
+    def values(self):
+        return self._buckets.values()
+    
+    def items(self):
+        return self._buckets.items()
+    
+    def __getitem__(self, key: int) -> List[float]:
+        return self._buckets[key]
+    
+    def __contains__(self, key) -> bool:
+        return key in self._buckets
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._buckets)
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TrueCountAggregator):
+            return NotImplemented
+        return ((self.bucket_width, self.rounding, self._buckets)
+                == (other.bucket_width, other.rounding, other._buckets))
+
+class RunningMoments:
+    """
+    Online mean and variance of per-round results (Welford's algorithm)
+    Updates and merges stay numerically stable over very long runs, unlike
+    accumulating a sum of squares. Merging uses the pairwise update from
+    Chan et al., so shards from parallel workers combine exactly.
+    """
+    
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2  # Sum of squared deviations from the mean
+    
+    def add(self, value: float):
+        """Record one result"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """Combine another set of moments into this one"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        return self
+    
+    @property
+    def total(self) -> float:
+        return self.mean * self.count
+    
+    def variance(self) -> float:
+        """Sample variance per round"""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+    
+    def std_dev(self) -> float:
+        """Standard deviation per round"""
+        return math.sqrt(self.variance())
+    
+    def win_rate_per_100(self) -> float:
+        """Expected result per 100 rounds"""
+        return self.mean * 100
+    
+    def n0(self) -> float:
+        """Rounds needed for the expected result to equal one standard deviation"""
+        if self.mean <= 0:
+            return math.inf
+        return self.variance() / (self.mean * self.mean)
+    
+    def desirability_index(self) -> float:
+        """DI: 1000 * mean / standard deviation (negative when losing)"""
+        std_dev = self.std_dev()
+        if std_dev == 0:
+            return 0.0
+        return 1000 * self.mean / std_dev
+    
+    def score(self) -> float:
+        """
+        SCORE: win rate per 100 rounds for a Kelly bettor with a $10,000 bankroll
+        Equals DI squared; zero when there's no edge.
+        """
+        if self.mean <= 0:
+            return 0.0
+        return self.desirability_index() ** 2
+    
+    def get_summary(self) -> Dict:
+        return {
+            'rounds': self.count,
+            'mean': self.mean,
+            'std_dev': self.std_dev(),
+            'win_rate_per_100': self.win_rate_per_100(),
+            'n0': self.n0(),
+            'score': self.score(),
+            'desirability_index': self.desirability_index()
+        }
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RunningMoments):
+            return NotImplemented
+        return (self.count, self.mean, self.m2) == (other.count, other.mean, other.m2)
+    
+    def __repr__(self) -> str:
+        return f"RunningMoments(count={self.count}, mean={self.mean!r}, m2={self.m2!r})"
 
 class SessionStats:
     """Track session statistics for EV analysis"""
     
-    def __init__(self):
+    def __init__(self, bucket_width: float = 1.0, rounding: str = "floor"):
         self.hands_played = 0
         self.total_wagered = 0.0
         self.total_expected_ev = 0.0
         self.total_actual_result = 0.0
-        self.results_by_count: Dict[int, List[float]] = {}
+        self.results_by_count = TrueCountAggregator(bucket_width, rounding)
+        self.result_moments = RunningMoments()
     
     def add_hand(self, bet_size: float, expected_ev: float, 
-                 actual_result: float):
-        """Record a hand's results"""
+                 actual_result: float, true_count: Optional[float] = None):
+        """Record a hand's results, bucketed by true count when one is given"""
         self.hands_played += 1
         self.total_wagered += bet_size
         self.total_expected_ev += expected_ev
         self.total_actual_result += actual_result
+        self.result_moments.add(actual_result)
+        if true_count is not None:
+            self.results_by_count.add(true_count, bet_size, actual_result)
     
     def get_expected_ev_percentage(self) -> float:
         """Get expected EV as percentage of total wagered"""
@@ -91,13 +365,24 @@ class SessionStats:
             'actual_result': self.total_actual_result,
             'expected_ev_percentage': self.get_expected_ev_percentage(),
             'actual_ev_percentage': self.get_actual_ev_percentage(),
-            'variance': self.get_variance()
+            'ev_difference': self.get_ev_difference(),
+            'variance': self.get_variance(),
+            'std_dev': self.result_moments.std_dev(),
+            'win_rate_per_100': self.result_moments.win_rate_per_100(),
+            'n0': self.result_moments.n0(),
+            'score': self.result_moments.score(),
+            'desirability_index': self.result_moments.desirability_index(),
+            'by_count': self.results_by_count.get_summary()
         }
     
-    def get_variance(self) -> float:
-        """Calculate variance from expected value"""
+    def get_ev_difference(self) -> float:
+        """Actual result minus expected value (how far luck has moved the session)"""
         return self.total_actual_result - self.total_expected_ev
     
+    def get_variance(self) -> float:
+        """Sample variance of the per-hand result"""
+        return self.result_moments.variance()
+    
     def reset(self):
         """Reset session statistics"""
         self.hands_played = 0
@@ -105,6 +390,7 @@ class SessionStats:
         self.total_expected_ev = 0.0
         self.total_actual_result = 0.0
         self.results_by_count.clear()
+        self.result_moments = RunningMoments()
 
 class BettingStrategy:
     """Different betting strategies based on count"""
@@ -0,0 +1,236 @@
+"""Empirical EV per true count, simulated once per counting system and rule set
+
+A flat-bet vectorized run (risk_of_ruin.OutcomeModel), played with the
+charts strategy_generator solves for the same rules, gives the frequency,
+mean and variance of the round result in each floor(true count) bucket.
+Sparse tails are pooled and the means made monotone (bet_optimizer's
+CountTable.smoothed), and each bucket is placed at the frequency-weighted
+centre of the true counts it covers. EVTable.edge() interpolates linearly
+between those centres and holds the end values beyond them.
+
+Each bucket also keeps its outcome distribution (blackjacks, doubles,
+splits and losses) and the growth-optimal Kelly fraction solved from it,
+shifted to the smoothed mean, so a Kelly bet is an interpolated lookup too.
+
+Only per-bucket results are stored, so the cache file is a few kilobytes
+and loading it does not need NumPy (simulating it does).
+
+    python -m ev_table --rounds 5000000
+"""
+
+import argparse
+import bisect
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; cached tables load without it
+    np = None
+
+from bet_optimizer import CountTable
+from config import CACHE_DIR
+from counting_systems import CountingSystem, get_counting_system
+from kelly import optimal_fraction
+from risk_of_ruin import OutcomeModel
+from settings import RuleSet, settings
+from strategy_generator import StrategyCharts
+
+DEFAULT_EV_TABLE_ROUNDS = 2000000
+# Rounds a tail bucket needs before it stands on its own
+MIN_BUCKET_ROUNDS = 20000
+
+
+def available() -> bool:
+    """Whether a missing table can be simulated (it needs NumPy)"""
+    return np is not None
+
+
+def ev_table_path(system: CountingSystem, rules: RuleSet, cache_dir: str = CACHE_DIR) -> str:
+    """Cache file for a counting system and rule set; the shoe cut changes count frequencies"""
+    cut = f"p{rules.penetration:.3f}{'b' if rules.burn_card else ''}"
+    return os.path.join(cache_dir, f"ev_table_{system.key}_{rules.cache_key()}_{cut}.json")
+
+
+@dataclass
+class EVTable:
+    """Per-round EV, variance, frequency and Kelly fraction by true count, in initial-bet units"""
+    system: str
+    rules_key: str
+    centres: List[float]  # True count each bucket's statistics are placed at
+    frequency: List[float]
+    mean: List[float]
+    variance: List[float]
+    # Outcome distribution per bucket: results in initial-bet units and their probabilities
+    results: List[List[float]]
+    probabilities: List[List[float]]
+    kelly: List[float]  # Full-Kelly share of the bankroll per bucket
+    rounds: int
+
+    def _interpolate(self, values: List[float], true_count: float) -> float:
+        centres = self.centres
+        if true_count <= centres[0]:
+            return values[0]
+        if true_count >= centres[-1]:
+            return values[-1]
+        i = bisect.bisect_right(centres, true_count)
+        share = (true_count - centres[i - 1]) / (centres[i] - centres[i - 1])
+        return values[i - 1] + share * (values[i] - values[i - 1])
+
+    def edge(self, true_count: float) -> float:
+        """Expected result per initial bet at a true count"""
+        return self._interpolate(self.mean, true_count)
+
+    def variance_at(self, true_count: float) -> float:
+        """Variance of the round result per initial bet squared at a true count"""
+        return self._interpolate(self.variance, true_count)
+
+    def kelly_fraction(self, true_count: float) -> float:
+        """Full-Kelly share of the bankroll to bet at a true count"""
+        return self._interpolate(self.kelly, true_count)
+
+    @classmethod
+    def from_outcome_model(cls, model: OutcomeModel, system: CountingSystem,
+                           rules: RuleSet) -> 'EVTable':
+        """Smooth the model's count table and centre each pooled bucket on the counts it covers"""
+        table = CountTable.from_outcome_model(model)
+        smoothed = table.smoothed(MIN_BUCKET_ROUNDS)
+        keys = list(smoothed.true_counts)
+        centres = []
+        results: List[List[float]] = []
+        probabilities: List[List[float]] = []
+        kelly = []
+        for i, key in enumerate(keys):
+            # Low tail buckets are pooled upwards and high ones downwards
+            if len(keys) == 1:
+                members = np.ones(len(table.true_counts), dtype=bool)
+            elif i == 0:
+                members = table.true_counts <= key
+            elif i == len(keys) - 1:
+                members = table.true_counts >= key
+            else:
+                members = table.true_counts == key
+            weights = table.frequency[members]
+            centres.append(float((table.true_counts[members] + 0.5) @ weights / weights.sum()))
+
+            # Pool the member buckets' outcomes the same way
+            histogram: Dict[float, int] = {}
+            for member in table.true_counts[members]:
+                for units, count in model.histograms[int(member)].items():
+                    histogram[units] = histogram.get(units, 0) + count
+            total = sum(histogram.values())
+            values = sorted(histogram)
+            shares = [histogram[units] / total for units in values]
+            raw_mean = sum(units * share for units, share in zip(values, shares))
+            results.append(values)
+            probabilities.append(shares)
+            kelly.append(optimal_fraction(values, shares, float(smoothed.mean[i]) - raw_mean))
+        variance = smoothed.second_moment - smoothed.mean * smoothed.mean
+        return cls(system.key, rules.cache_key(), centres, smoothed.frequency.tolist(),
+                   smoothed.mean.tolist(), variance.tolist(), results, probabilities, kelly,
+                   table.rounds)
+
+    @classmethod
+    def simulate(cls, system: Optional[CountingSystem] = None, rules: Optional[RuleSet] = None,
+                 rounds: int = DEFAULT_EV_TABLE_ROUNDS, rng=None,
+                 charts: Optional[StrategyCharts] = None) -> 'EVTable':
+        """Simulate flat-bet rounds and tabulate them by true count"""
+        system = system if system is not None else get_counting_system()
+        rules = rules if rules is not None else settings.rule_set()
+        if charts is None:
+            charts = StrategyCharts.load_or_generate(rules)
+        model = OutcomeModel.simulate(rounds, rules, rng=rng, system=system, charts=charts)
+        return cls.from_outcome_model(model, system, rules)
+
+    @classmethod
+    def load_or_simulate(cls, system: Optional[CountingSystem] = None,
+                         rules: Optional[RuleSet] = None, rounds: int = DEFAULT_EV_TABLE_ROUNDS,
+                         cache_dir: Optional[str] = CACHE_DIR, rng=None,
+                         charts: Optional[StrategyCharts] = None) -> 'EVTable':
+        """Load the cached table for this system and rules, simulating and saving it if missing"""
+        system = system if system is not None else get_counting_system()
+        rules = rules if rules is not None else settings.rule_set()
+        path = ev_table_path(system, rules, cache_dir) if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                table = cls.load(path)
+                if table.rounds >= rounds:
+                    return table
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable EV table {path}: {e}")
+
+        if charts is None:
+            charts = StrategyCharts.load_or_generate(rules, cache_dir=cache_dir)
+        table = cls.simulate(system, rules, rounds, rng, charts)
+        if path:
+            table.save(path)
+        return table
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = asdict(self)
+        # Six significant digits is far inside the sampling error
+        for name in ('centres', 'frequency', 'mean', 'variance', 'kelly'):
+            data[name] = [float(f"{value:.6g}") for value in data[name]]
+        data['probabilities'] = [[float(f"{value:.6g}") for value in bucket]
+                                 for bucket in data['probabilities']]
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'EVTable':
+        with open(path, 'r') as f:
+            return cls(**json.load(f))
+
+
+def format_ev_table(table: EVTable) -> str:
+    """Format an EV table for console output"""
+    system = get_counting_system(table.system)
+    lines = [f"=== EV by True Count ({system.name}, {table.rounds:,} rounds) ===",
+             f"{'TC':>6} {'Freq':>7} {'EV':>8} {'SD':>6} {'Kelly':>7}"]
+    for centre, frequency, mean, variance, kelly in zip(table.centres, table.frequency,
+                                                        table.mean, table.variance, table.kelly):
+        lines.append(f"{centre:>+6.2f} {frequency * 100:>6.2f}% {mean * 100:>+7.3f}% "
+                     f"{variance ** 0.5:>6.3f} {kelly * 100:>6.3f}%")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Simulate EV per true count for the "
+                                                 "current rules")
+    parser.add_argument('--system', default=None,
+                        help="Counting system key (default: the one in settings)")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_EV_TABLE_ROUNDS,
+                        help=f"Rounds to simulate (default: {DEFAULT_EV_TABLE_ROUNDS:,})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Simulate again even if a cached table exists")
+    args = parser.parse_args(argv)
+
+    if not available():
+        print("ev_table requires numpy (pip install numpy)")
+        return 1
+    try:
+        system = get_counting_system(args.system)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    start = time.perf_counter()
+    rules = settings.rule_set()
+    if args.no_cache:
+        table = EVTable.simulate(system, rules, args.rounds)
+        table.save(ev_table_path(system, rules))
+    else:
+        table = EVTable.load_or_simulate(system, rules, args.rounds)
+    print(format_ev_table(table))
+    print(f"\nReady in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Background worker that computes per-action EVs off the UI thread
+
+Each submit() starts a new generation; anything queued or computed for an
+older generation is dropped, so only the latest hand's numbers are shown.
+Results are handed to a post function (main.py uses root.after) so the
+callback runs on the Tk main thread. A failed calculation delivers an empty
+dict, so the display clears instead of showing "calculating..." forever.
+"""
+
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from exact_ev import ExactEVCalculator
+from settings import RuleSet
+
+EVCallback = Callable[[Dict[str, float]], None]
+
+
+@dataclass(frozen=True)
+class EVRequest:
+    """Everything the solver needs for one decision"""
+    player_ranks: Tuple[int, ...]
+    upcard_index: int
+    composition: Tuple[int, ...]
+    can_double: bool
+    can_split: bool
+    hands_in_play: int
+    rules: RuleSet
+
+    @classmethod
+    def from_game_state(cls, game_state) -> Optional['EVRequest']:
+        """Build a request for the active hand, or None if there's no decision to make"""
+        if game_state.phase != "playing" or game_state.player_hand is None:
+            return None
+        hand = game_state.player_hand
+        rules = game_state.rules
+
+        # From the player's seat the dealer's hole card is still unseen
+        counts = list(game_state.shoe.composition())
+        hole_card = game_state.dealer_hand.cards[1]
+        counts[hole_card.rank_index] += 1
+
+        split_hands = len(game_state.player_hands) > 1
+        can_double = hand.can_double() and (rules.double_after_split or not split_hands)
+        can_split = game_state.can_split_current_hand() and not (
+            split_hands and hand.cards[0].rank == 'A' and not rules.resplit_aces)
+
+        return cls(
+            player_ranks=tuple(card.rank_index for card in hand.cards),
+            upcard_index=game_state.dealer_hand.cards[0].rank_index,
+            composition=tuple(counts),
+            can_double=can_double,
+            can_split=can_split,
+            hands_in_play=len(game_state.player_hands),
+            rules=rules
+        )
+
+
+class EVWorker:
+    """Single daemon thread running the exact EV solver with cancellation"""
+
+    def __init__(self, post: Callable[[Callable[[], None]], None],
+                 calculator: Optional[ExactEVCalculator] = None):
+        self._post = post
+        # Only touched from the worker thread
+        self.calculator = calculator if calculator is not None else ExactEVCalculator()
+        self._jobs: queue.Queue = queue.Queue()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="ev-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, request: EVRequest, callback: EVCallback) -> int:
+        """Queue a calculation, superseding any pending one; returns its generation"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._jobs.put((generation, request, callback))
+        return generation
+
+    def cancel(self):
+        """Drop any pending or in-flight result"""
+        with self._lock:
+            self._generation += 1
+
+    def is_current(self, generation: int) -> bool:
+        """Check if a generation is still the latest"""
+        with self._lock:
+            return generation == self._generation
+
+    def stop(self, timeout: Optional[float] = None):
+        """Cancel outstanding work and end the worker thread"""
+        self.cancel()
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            generation, request, callback = job
+            if not self.is_current(generation):
+                continue
+
+            try:
+                evs = self.calculator.action_evs(
+                    request.player_ranks, request.upcard_index, request.composition,
+                    request.can_double, request.can_split, request.hands_in_play,
+                    request.rules
+                )
+            except Exception:
+                # Nothing to show; an empty result clears the panel
+                evs = {}
+
+            if self.is_current(generation):
+                self._post(lambda: self._deliver(generation, callback, evs))
+
+    def _deliver(self, generation: int, callback: EVCallback, evs: Dict[str, float]):
+        """Runs on the posting thread; re-checks in case the hand changed meanwhile"""
+        if self.is_current(generation):
+            callback(evs)
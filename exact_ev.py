@@ -0,0 +1,248 @@
+"""Composition-dependent EV of stand, hit, double and split
+
+EVs are in units of the initial bet and conditioned on the dealer not
+having blackjack (the engine settles dealer naturals before any decision).
+The dealer's final distribution is taken from the composition at the
+decision point; the player's own draws are exact without replacement.
+Hit subtrees are memoized by (hand state, remaining composition) and shared
+by every action evaluated against the same composition and upcard, including
+the hands played after a split.
+
+Splits follow the usual independent-hand model: each split hand draws its
+second card from the post-split composition, and the number of resplits is
+a small Markov chain limited by max_splits and resplit_aces.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dealer_probabilities import BUST, DealerProbabilities, dealer_probabilities
+from game_engine import Card, Hand
+from hand_state import (
+    ACE_INDEX, NUM_RANKS, STATE_BUST, STATE_PAIR, STATE_VALUE, TRANSITIONS,
+    state_from_ranks
+)
+from settings import RuleSet, settings
+
+
+def remove_cards(composition: Sequence[int], rank_indices: Sequence[int]) -> Tuple[int, ...]:
+    """Remove cards from a rank composition"""
+    counts = list(composition)
+    for rank_index in rank_indices:
+        if counts[rank_index] <= 0:
+            raise ValueError(f"No cards of rank index {rank_index} left to remove")
+        counts[rank_index] -= 1
+    return tuple(counts)
+
+
+class _Context:
+    """Stand EVs and hit memo for one (composition, upcard, rules)"""
+
+    __slots__ = ('stand_ev', 'hit_memo')
+
+    def __init__(self, dealer: Sequence[float]):
+        # Stand EV by player total; anything under 17 only wins on a dealer bust
+        bust = dealer[BUST]
+        stand_ev = [2 * bust - 1] * 22
+        for value in range(17, 22):
+            below = sum(dealer[:value - 17])
+            above = sum(dealer[value - 16:BUST])
+            stand_ev[value] = bust + below - above
+        self.stand_ev: List[float] = stand_ev
+        self.hit_memo: Dict[Tuple, float] = {}
+
+
+class ExactEVCalculator:
+    """Exact per-action EV for a hand against the remaining shoe"""
+
+    def __init__(self, dealer: Optional[DealerProbabilities] = None, cache_size: int = 64):
+        self.dealer = dealer if dealer is not None else dealer_probabilities
+        self.cache_size = cache_size
+        self._contexts: 'OrderedDict[Tuple, _Context]' = OrderedDict()
+
+    def action_evs(self, player_ranks: Sequence[int], upcard_index: int,
+                   composition: Sequence[int], can_double: bool = True,
+                   can_split: bool = True, hands_in_play: int = 1,
+                   rules: Optional[RuleSet] = None) -> Dict[str, float]:
+        """
+        Get the EV of each legal action
+        composition: unseen rank counts, excluding the player's cards and the upcard
+        hands_in_play: hands the player already has (limits further splits)
+        Returns a dict keyed by 'stand', 'hit', 'double' and 'split'
+        """
+        if rules is None:
+            rules = settings.rule_set()
+        composition = tuple(composition)
+        ctx = self._context(composition, upcard_index, rules)
+        counts = list(composition)
+        total = sum(counts)
+        state = state_from_ranks(player_ranks)
+        value = STATE_VALUE[state]
+
+        if STATE_BUST[state]:
+            return {'stand': -1.0}
+
+        evs = {'stand': ctx.stand_ev[value]}
+        if total <= 0:
+            return evs
+        evs['hit'] = self._hit(ctx, state, counts, total)
+
+        if can_double and len(player_ranks) == 2 and self._double_allowed(value, rules):
+            evs['double'] = self._double(ctx, state, counts, total)
+
+        pair = STATE_PAIR[state]
+        if (can_split and pair >= 0 and rules.max_splits > 0
+                and hands_in_play < rules.max_splits + 1):
+            evs['split'] = self._split(ctx, pair, counts, total, hands_in_play, rules)
+        return evs
+
+    def hand_evs(self, hand: Hand, upcard: Card, composition: Sequence[int],
+                 can_double: bool = True, can_split: bool = True, hands_in_play: int = 1,
+                 rules: Optional[RuleSet] = None) -> Dict[str, float]:
+        """Get action EVs for a game Hand and dealer upcard"""
+        return self.action_evs([card.rank_index for card in hand.cards], upcard.rank_index,
+                               composition, can_double, can_split, hands_in_play, rules)
+
+    def best_action(self, evs: Dict[str, float]) -> str:
+        """Get the action with the highest EV"""
+        return max(evs, key=evs.get)
+
+    def clear(self):
+        """Drop all cached contexts"""
+        self._contexts.clear()
+
+    def _context(self, composition: Tuple[int, ...], upcard_index: int,
+                 rules: RuleSet) -> _Context:
+        """Get the memoized context for a decision point (LRU)"""
+        key = (composition, upcard_index, rules.dealer_stand_soft_17)
+        ctx = self._contexts.get(key)
+        if ctx is not None:
+            self._contexts.move_to_end(key)
+            return ctx
+
+        dealer = self.dealer.distribution(upcard_index, composition,
+                                          rules.dealer_stand_soft_17, no_blackjack=True)
+        ctx = _Context(dealer)
+        self._contexts[key] = ctx
+        if len(self._contexts) > self.cache_size:
+            self._contexts.popitem(last=False)
+        return ctx
+
+    @staticmethod
+    def _double_allowed(value: int, rules: RuleSet) -> bool:
+        return rules.double_on_any_two or value in (9, 10, 11)
+
+    def _hit(self, ctx: _Context, state: int, counts: List[int], total: int) -> float:
+        """EV of taking a card and then playing optimally (hit or stand)"""
+        key = (state, tuple(counts))
+        cached = ctx.hit_memo.get(key)
+        if cached is not None:
+            return cached
+
+        stand_ev = ctx.stand_ev
+        ev = 0.0
+        base = state * NUM_RANKS
+        for rank_index in range(NUM_RANKS):
+            n = counts[rank_index]
+            if n <= 0:
+                continue
+            p = n / total
+            next_state = TRANSITIONS[base + rank_index]
+            if STATE_BUST[next_state]:
+                ev -= p
+                continue
+            stand = stand_ev[STATE_VALUE[next_state]]
+            if STATE_VALUE[next_state] == 21 or total == 1:
+                ev += p * stand
+                continue
+            counts[rank_index] = n - 1
+            hit = self._hit(ctx, next_state, counts, total - 1)
+            counts[rank_index] = n
+            ev += p * (stand if stand > hit else hit)
+
+        ctx.hit_memo[key] = ev
+        return ev
+
+    def _double(self, ctx: _Context, state: int, counts: Sequence[int], total: int) -> float:
+        """EV of doubling: one card, then stand, for twice the bet"""
+        ev = 0.0
+        base = state * NUM_RANKS
+        for rank_index in range(NUM_RANKS):
+            n = counts[rank_index]
+            if n > 0:
+                next_state = TRANSITIONS[base + rank_index]
+                outcome = -1.0 if STATE_BUST[next_state] else ctx.stand_ev[STATE_VALUE[next_state]]
+                ev += n / total * outcome
+        return 2 * ev
+
+    def _split_hand(self, ctx: _Context, state: int, counts: List[int], total: int,
+                    rules: RuleSet, one_card: bool) -> float:
+        """EV of a completed two-card split hand played without further splitting"""
+        stand = ctx.stand_ev[STATE_VALUE[state]]
+        if one_card or total <= 0:
+            return stand
+        best = max(stand, self._hit(ctx, state, counts, total))
+        if rules.double_after_split and self._double_allowed(STATE_VALUE[state], rules):
+            best = max(best, self._double(ctx, state, counts, total))
+        return best
+
+    def _split(self, ctx: _Context, pair: int, counts: List[int], total: int,
+               hands_in_play: int, rules: RuleSet) -> float:
+        """EV of splitting a pair, summed over every resulting hand"""
+        # The second pair card goes back to being the first card of a new hand
+        one_card = pair == ACE_INDEX and rules.split_aces_one_card
+        limit = rules.max_splits + 1
+        if pair == ACE_INDEX and not rules.resplit_aces:
+            limit = min(limit, hands_in_play + 1)
+
+        q = counts[pair] / total
+
+        # Average EV of a split hand whose second card is not another pair card
+        non_pair_ev = 0.0
+        for rank_index in range(NUM_RANKS):
+            n = counts[rank_index]
+            if n <= 0 or rank_index == pair:
+                continue
+            counts[rank_index] = n - 1
+            state = state_from_ranks((pair, rank_index))
+            non_pair_ev += n * self._split_hand(ctx, state, counts, total - 1, rules, one_card)
+            counts[rank_index] = n
+        non_pair_draws = total - counts[pair]
+        if non_pair_draws:
+            non_pair_ev /= non_pair_draws
+
+        # A pair that can't be resplit is played as an ordinary hand
+        pair_ev = 0.0
+        if counts[pair] > 0:
+            counts[pair] -= 1
+            pair_ev = self._split_hand(ctx, state_from_ranks((pair, pair)), counts,
+                                       total - 1, rules, one_card)
+            counts[pair] += 1
+
+        # Expected number of finished hands of each kind
+        memo: Dict[Tuple[int, int], Tuple[float, float]] = {}
+
+        def finish(pending: int, hands: int) -> Tuple[float, float]:
+            if pending == 0:
+                return (0.0, 0.0)
+            key = (pending, hands)
+            if key not in memo:
+                no_pair = finish(pending - 1, hands)
+                if hands < limit:
+                    paired = finish(pending + 1, hands + 1)
+                    pairs = q * paired[1]
+                    non_pairs = q * paired[0]
+                else:
+                    paired = finish(pending - 1, hands)
+                    pairs = q * (1 + paired[1])
+                    non_pairs = q * paired[0]
+                memo[key] = (non_pairs + (1 - q) * (1 + no_pair[0]),
+                             pairs + (1 - q) * no_pair[1])
+            return memo[key]
+
+        non_pairs, pairs = finish(2, hands_in_play + 1)
+        return non_pairs * non_pair_ev + pairs * pair_ev
+
+
+# Shared instance for callers that don't need their own cache
+exact_ev_calculator = ExactEVCalculator()
@@ -1,18 +1,77 @@
 """Core game engine - handles all game logic without UI dependencies"""
 
 import random
-from typing import List, Tuple, Optional, Dict
+from array import array
+from typing import Any, List, Tuple, Optional, Dict
 from config import *
-from settings import settings
+from settings import RuleSet, settings
+from hand_state import (
+    EMPTY_STATE, NUM_RANKS, TRANSITIONS, STATE_VALUE, STATE_SOFT, STATE_BUST,
+    dealer_hits_table, state_from_ranks
+)
+
+SUITS = ['hearts', 'diamonds', 'clubs', 'spades']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+# Rank index used for compositions and strategy columns: 2-9, ten-value, ace
+RANK_INDEX = {
+    '2': 0, '3': 1, '4': 2, '5': 3, '6': 4, '7': 5, '8': 6, '9': 7,
+    '10': 8, 'J': 8, 'Q': 8, 'K': 8, 'A': 9
+}
+NUM_RANK_INDICES = 10
+
+# Card codes are suit position * 13 + rank position
+CODE_RANK_INDEX = [RANK_INDEX[RANKS[code % 13]] for code in range(52)]
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only bulk shuffling needs it
+    np = None
+
+# A shoe RNG is a random.Random (or the random module) or a numpy.random.Generator
+ShoeRNG = Any
+
+
+def is_numpy_generator(rng: ShoeRNG) -> bool:
+    """Check if rng is a NumPy Generator rather than a random.Random"""
+    return np is not None and isinstance(rng, np.random.Generator)
+
+
+def shuffled_shoes(count: int, num_decks: int, rng: ShoeRNG = None) -> 'np.ndarray':
+    """
+    Generate many shuffled shoes in one vectorized call
+    Returns a (count, num_decks * 52) uint8 array of card codes; each row can be
+    dealt by ArrayShoe.load_order() or indexed directly (see CODE_RANK_INDEX).
+    """
+    if np is None:
+        raise ImportError("Bulk shuffling requires numpy (pip install numpy)")
+    if rng is None:
+        rng = np.random.default_rng()
+    elif not is_numpy_generator(rng):
+        # Derive a PCG64 stream from a random.Random so seeded runs stay reproducible
+        rng = np.random.default_rng(rng.getrandbits(128))
+    ordered = np.tile(np.arange(52, dtype=np.uint8), num_decks)
+    return rng.permuted(np.broadcast_to(ordered, (count, ordered.size)), axis=1)
 
 class Card:
-    """Represents a single playing card"""
+    """Represents a single playing card
+    
+    Cards are immutable in practice and shoes share the 52 canonical
+    instances in CARD_POOL rather than allocating new ones per shuffle.
+    """
+    
+    __slots__ = ('rank', 'suit', '_value', 'rank_index', 'code')
     
     def __init__(self, rank: str, suit: str):
         self.rank = rank
         self.suit = suit
         self._value = self._calculate_value()
-        self.count_value = HI_LO_VALUES.get(rank, 0)
+        self.rank_index = RANK_INDEX.get(rank, 8)
+        suit_key = suit.lower()
+        if suit_key in SUITS and rank in RANKS:
+            self.code = SUITS.index(suit_key) * 13 + RANKS.index(rank)
+        else:
+            self.code = -1
     
     def _calculate_value(self) -> int:
         """Calculate blackjack value of the card"""
@@ -23,6 +82,11 @@ class Card:
         else:
             return int(self.rank)
     
+    @classmethod
+    def interned(cls, rank: str, suit: str) -> 'Card':
+        """Get the shared canonical instance for a rank and suit"""
+        return CARD_POOL[SUITS.index(suit.lower()) * 13 + RANKS.index(rank)]
+    
     @property
     def value(self) -> int:
         return self._value
@@ -33,35 +97,45 @@ class Card:
     def __repr__(self) -> str:
         return f"Card({self.rank}, {self.suit})"
 
+# The 52 canonical cards, indexed by card code
+CARD_POOL: Tuple[Card, ...] = tuple(Card(rank, suit) for suit in SUITS for rank in RANKS)
+
 class Shoe:
     """Manages a multi-deck shoe with penetration tracking"""
     
-    def __init__(self, num_decks: int = None):
-        self.num_decks = num_decks or settings.shoe_config.num_decks
+    def __init__(self, num_decks: int = None, rules: Optional[RuleSet] = None,
+                 rng: ShoeRNG = None):
+        self.rules = rules if rules is not None else settings.rule_set()
+        self.num_decks = num_decks or self.rules.num_decks
+        # Shuffle source: random.Random or numpy.random.Generator (e.g. PCG64).
+        # A seeded generator makes shoes reproducible and independent per table.
+        self.rng = rng if rng is not None else random
         self.cards: List[Card] = []
         self.dealt_count = 0
-        self.penetration_cards = int(self.num_decks * 52 * (1 - settings.shoe_config.penetration))
+        self.penetration_cards = 0
         self.needs_shuffle = False
         self._create_and_shuffle()
     
+    def _set_penetration(self):
+        """Recompute the cut card position from the current rules"""
+        self.penetration_cards = int(self.num_decks * 52 * (1 - self.rules.penetration))
+    
     def _create_and_shuffle(self):
         """Create a new shoe and shuffle it"""
-        suits = ['hearts', 'diamonds', 'clubs', 'spades']
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        
-        self.cards = []
-        for _ in range(self.num_decks):
-            for suit in suits:
-                for rank in ranks:
-                    self.cards.append(Card(rank, suit))
-        
-        random.shuffle(self.cards)
+        cards = list(CARD_POOL) * self.num_decks
+        if is_numpy_generator(self.rng):
+            cards = [cards[i] for i in self.rng.permutation(len(cards))]
+        else:
+            self.rng.shuffle(cards)
+        self.cards = cards
         self.dealt_count = 0
         self.needs_shuffle = False
+        self._set_penetration()
         
         # Burn first card if enabled
-        if settings.shoe_config.burn_card and self.cards:
-            self.cards.pop(0)
+        self.burned: Optional[Card] = None
+        if self.rules.burn_card and self.cards:
+            self.burned = self.cards.pop(0)
     
     def deal_card(self) -> Optional[Card]:
         """Deal a card from the shoe"""
@@ -85,61 +159,174 @@ class Shoe:
         """Calculate approximate decks remaining"""
         return self.cards_remaining() / 52
     
+    def composition(self) -> Tuple[int, ...]:
+        """Get the unseen rank counts (undealt cards plus the face-down burn card)"""
+        counts = [0] * NUM_RANK_INDICES
+        for card in self.cards:
+            counts[card.rank_index] += 1
+        if self.burned is not None:
+            counts[self.burned.rank_index] += 1
+        return tuple(counts)
+    
     def shuffle(self):
         """Shuffle the shoe (typically called between hands)"""
         self._create_and_shuffle()
 
+class ArrayShoe(Shoe):
+    """Shoe backed by a preallocated integer array with a read cursor
+    
+    Cards are stored as integer codes and dealt by advancing a cursor, so
+    dealing is O(1) and shuffling never reallocates. rank_counts holds the
+    number of unseen cards of each rank index (2-9, ten, ace) and is updated
+    on every deal. The face-down burn card stays in rank_counts because its
+    rank is never revealed.
+    """
+    
+    def __init__(self, num_decks: int = None, rules: Optional[RuleSet] = None,
+                 rng: ShoeRNG = None):
+        self.rules = rules if rules is not None else settings.rule_set()
+        self.num_decks = num_decks or self.rules.num_decks
+        self.rng = rng if rng is not None else random
+        self.penetration_cards = 0
+        self.dealt_count = 0
+        self.needs_shuffle = False
+        self._codes = array('B', range(52)) * self.num_decks
+        self._cursor = 0
+        self.rank_counts = [0] * NUM_RANK_INDICES
+        self._create_and_shuffle()
+    
+    def _create_and_shuffle(self):
+        """Shuffle the code array in place and reset the cursor"""
+        if is_numpy_generator(self.rng):
+            codes = np.frombuffer(self._codes, dtype=np.uint8)
+            self._codes[:] = array('B', self.rng.permutation(codes).tobytes())
+        else:
+            self.rng.shuffle(self._codes)
+        self._reset()
+    
+    def load_order(self, codes, position: Optional[int] = None):
+        """
+        Deal from a pre-shuffled order of card codes, e.g. one row of shuffled_shoes()
+        The order must contain num_decks full decks. position resumes dealing
+        part way through the order (counting earlier cards as dealt).
+        """
+        if len(codes) != len(self._codes):
+            raise ValueError(f"Expected {len(self._codes)} card codes, got {len(codes)}")
+        if np is not None and isinstance(codes, np.ndarray):
+            codes = codes.astype(np.uint8).tobytes()
+        self._codes[:] = array('B', codes)
+        self._reset()
+        
+        if position is not None and position > self._cursor:
+            for code in self._codes[self._cursor:position]:
+                self.rank_counts[CODE_RANK_INDEX[code]] -= 1
+            self.dealt_count = position - self._cursor
+            self._cursor = position
+            self.needs_shuffle = self.dealt_count >= self.penetration_cards
+    
+    def _reset(self):
+        """Reset the cursor and unseen counts for a freshly ordered shoe"""
+        self._cursor = 0
+        self.dealt_count = 0
+        self.needs_shuffle = False
+        self._set_penetration()
+        
+        per_deck = 4 * self.num_decks
+        self.rank_counts[:] = [per_deck] * NUM_RANK_INDICES
+        self.rank_counts[RANK_INDEX['10']] = 4 * per_deck
+        
+        # Burn first card if enabled
+        if self.rules.burn_card:
+            self._cursor = 1
+    
+    def deal_card(self) -> Optional[Card]:
+        """Deal a card from the shoe"""
+        if self._cursor >= len(self._codes):
+            return None
+        
+        code = self._codes[self._cursor]
+        self._cursor += 1
+        self.rank_counts[CODE_RANK_INDEX[code]] -= 1
+        self.dealt_count += 1
+        
+        # Check if we've reached penetration point
+        if self.dealt_count >= self.penetration_cards:
+            self.needs_shuffle = True
+        
+        return CARD_POOL[code]
+    
+    def cards_remaining(self) -> int:
+        """Get number of cards remaining in shoe"""
+        return len(self._codes) - self._cursor
+    
+    def composition(self) -> Tuple[int, ...]:
+        """Get the unseen rank counts as a hashable tuple"""
+        return tuple(self.rank_counts)
+    
+    @property
+    def cards(self) -> List[Card]:
+        """Remaining cards in dealing order (builds a list; avoid in hot loops)"""
+        return [CARD_POOL[code] for code in self._codes[self._cursor:]]
+
 class Hand:
-    """Represents a blackjack hand with value calculation"""
+    """Represents a blackjack hand with value calculation
+    
+    Tracks an encoded hand state (see hand_state.py) that advances by one
+    table lookup per card; value, softness and bust are read from per-state
+    tables instead of rescanning the cards.
+    """
+    
+    __slots__ = ('_cards', 'is_dealer', '_state',
+                 'stood', 'doubled', 'is_blackjack', 'is_split')
     
     def __init__(self, is_dealer: bool = False):
-        self.cards: List[Card] = []
+        self._cards: List[Card] = []
         self.is_dealer = is_dealer
-        self._value = 0
-        self._soft = False
+        self._state = EMPTY_STATE
         self.stood = False
         self.doubled = False
         self.is_blackjack = False
+        self.is_split = False  # Split hands can't be blackjack
     
-    def add_card(self, card: Card):
-        """Add a card to the hand and recalculate value"""
-        self.cards.append(card)
+    @property
+    def cards(self) -> List[Card]:
+        return self._cards
+    
+    @cards.setter
+    def cards(self, cards: List[Card]):
+        """Replace the cards (e.g. when splitting) and resync the hand state"""
+        self._cards = cards
         self._calculate_value()
+    
+    def add_card(self, card: Card):
+        """Add a card to the hand and advance the hand state"""
+        self._cards.append(card)
+        self._state = TRANSITIONS[self._state * NUM_RANKS + card.rank_index]
         
         # Check for blackjack (only on initial 2 cards)
-        if len(self.cards) == 2 and self._value == 21:
+        if len(self._cards) == 2 and STATE_VALUE[self._state] == 21 and not self.is_split:
             self.is_blackjack = True
     
     def _calculate_value(self):
-        """Calculate hand value, handling soft/hard aces"""
-        total = 0
-        aces = 0
-        
-        # Count all cards and track aces
-        for card in self.cards:
-            if card.rank == 'A':
-                aces += 1
-            total += card.value
-        
-        # Adjust for aces if busted
-        while total > 21 and aces > 0:
-            total -= 10
-            aces -= 1
-        
-        self._value = total
-        self._soft = (aces > 0 and total <= 21)
+        """Recalculate the hand state from scratch after cards were replaced"""
+        self._state = state_from_ranks(card.rank_index for card in self._cards)
+    
+    @property
+    def state(self) -> int:
+        """Encoded hand state for table lookups"""
+        return self._state
     
     @property
     def value(self) -> int:
-        return self._value
+        return STATE_VALUE[self._state]
     
     @property
     def is_soft(self) -> bool:
-        return self._soft
+        return STATE_SOFT[self._state]
     
     @property
     def is_bust(self) -> bool:
-        return self._value > 21
+        return STATE_BUST[self._state]
     
     def can_split(self) -> bool:
         """Check if hand can be split (only for initial 2 cards of same rank)"""
@@ -155,12 +342,15 @@ class GameRules:
     """Enforces blackjack game rules and determines outcomes"""
     
     @staticmethod
-    def dealer_must_hit(hand: Hand) -> bool:
+    def dealer_must_hit(hand: Hand, rules: Optional[RuleSet] = None) -> bool:
         """Determine if dealer must hit based on game rules"""
-        return settings.dealer_must_hit(hand.value, hand.is_soft)
+        if rules is None:
+            rules = settings.game_rules
+        return dealer_hits_table(rules.dealer_stand_soft_17)[hand.state]
     
     @staticmethod
-    def get_hand_outcome(player_hand: Hand, dealer_hand: Hand) -> Tuple[str, float]:
+    def get_hand_outcome(player_hand: Hand, dealer_hand: Hand,
+                         rules: Optional[RuleSet] = None) -> Tuple[str, float]:
         """
         Determine outcome of a hand
         Returns: (outcome_string, payout_multiplier)
@@ -174,7 +364,9 @@ class GameRules:
         elif dealer_bj:
             return ("Dealer Blackjack", 0.0)  # Lose bet
         elif player_bj:
-            return ("Blackjack!", 1.0 + settings.game_rules.blackjack_payout)  # Configurable payout
+            if rules is None:
+                rules = settings.game_rules
+            return ("Blackjack!", 1.0 + rules.blackjack_payout)  # Configurable payout
         
         # Check for busts
         if player_hand.is_bust:
@@ -193,8 +385,10 @@ class GameRules:
 class GameState:
     """Manages the complete state of a blackjack game"""
     
-    def __init__(self):
-        self.shoe = Shoe()
+    def __init__(self, shoe: Optional[Shoe] = None, rules: Optional[RuleSet] = None):
+        # Rules are captured once; refresh with set_rules() after settings change
+        self.rules = rules if rules is not None else settings.rule_set()
+        self.shoe = shoe if shoe is not None else Shoe(rules=self.rules)
         self.player_hands: List[Hand] = []  # List of player hands (for splits)
         self.dealer_hand: Optional[Hand] = None
         self.hand_bets: List[int] = []  # Bet amount for each hand
@@ -211,6 +405,14 @@ class GameState:
         self.blackjacks = 0
         self.total_wagered = 0.0
     
+    def set_rules(self, rules: RuleSet):
+        """Switch to a new rule set, rebuilding the shoe if the deck count changed"""
+        self.rules = rules
+        if self.shoe.num_decks != rules.num_decks:
+            self.shoe = self.shoe.__class__(rules=rules, rng=self.shoe.rng)
+        else:
+            self.shoe.rules = rules
+    
     @property
     def player_hand(self) -> Optional[Hand]:
         """Backwards compatibility - returns current active hand"""
@@ -323,7 +525,7 @@ class GameState:
             return False
         
         # Check max splits limit
-        if len(self.player_hands) >= settings.game_rules.max_splits + 1:
+        if len(self.player_hands) >= self.rules.max_splits + 1:
             return False
         
         # Check bankroll for additional bet
@@ -335,11 +537,12 @@ class GameState:
         
         # Create new hand with second card
         new_hand = Hand()
+        new_hand.is_split = True
         new_hand.add_card(card2)
         
         # Original hand keeps first card
         hand.cards = [card1]
-        hand._calculate_value()
+        hand.is_split = True
         hand.is_blackjack = False  # Split hands can't be blackjack
         
         # Insert new hand after current one
@@ -351,7 +554,7 @@ class GameState:
         new_hand.add_card(self.shoe.deal_card())
         
         # Special rule for split aces - only get one card each
-        if card1.rank == 'A' and settings.game_rules.split_aces_one_card:
+        if card1.rank == 'A' and self.rules.split_aces_one_card:
             # Both hands are complete, move to next non-ace hand or dealer
             self._advance_to_next_hand()
         
@@ -382,7 +585,7 @@ class GameState:
             return False
         
         # Max splits limit
-        if len(self.player_hands) >= settings.game_rules.max_splits + 1:
+        if len(self.player_hands) >= self.rules.max_splits + 1:
             return False
         
         # Bankroll check
@@ -394,8 +597,10 @@ class GameState:
     
     def play_dealer_hand(self):
         """Play out the dealer's hand according to house rules"""
-        while GameRules.dealer_must_hit(self.dealer_hand):
-            self.dealer_hand.add_card(self.shoe.deal_card())
+        hits = dealer_hits_table(self.rules.dealer_stand_soft_17)
+        dealer_hand = self.dealer_hand
+        while hits[dealer_hand.state]:
+            dealer_hand.add_card(self.shoe.deal_card())
         
         self.phase = "complete"
     
@@ -416,7 +621,7 @@ class GameState:
         hand = self.player_hands[hand_index]
         bet = self.hand_bets[hand_index]
         
-        outcome, payout_mult = GameRules.get_hand_outcome(hand, self.dealer_hand)
+        outcome, payout_mult = GameRules.get_hand_outcome(hand, self.dealer_hand, self.rules)
         
         # Update bankroll
         winnings = bet * payout_mult
@@ -446,7 +651,7 @@ class GameState:
         hand_results = []
         
         for i, (hand, bet) in enumerate(zip(self.player_hands, self.hand_bets)):
-            outcome, payout_mult = GameRules.get_hand_outcome(hand, self.dealer_hand)
+            outcome, payout_mult = GameRules.get_hand_outcome(hand, self.dealer_hand, self.rules)
             
             # Calculate winnings for this hand
             winnings = bet * payout_mult
@@ -491,7 +696,7 @@ class GameState:
         """Get detailed results for each hand"""
         results = []
         for i, (hand, bet) in enumerate(zip(self.player_hands, self.hand_bets)):
-            outcome, payout_mult = GameRules.get_hand_outcome(hand, self.dealer_hand)
+            outcome, payout_mult = GameRules.get_hand_outcome(hand, self.dealer_hand, self.rules)
             winnings = bet * payout_mult
             profit = winnings - bet
             results.append((outcome, profit))
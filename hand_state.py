@@ -0,0 +1,130 @@
+"""Compact integer encoding of hand states and a precomputed transition table
+
+A hand state captures everything play decisions need from a hand:
+    hard total (aces counted as 1), soft flag, card count bucket (0, 1, 2, 3+)
+    and pair rank for two-card pairs.
+Every reachable state gets a small integer id, so advancing a hand by one
+card is a single lookup: TRANSITIONS[state * NUM_RANKS + rank_index].
+
+Rank indices follow the strategy table columns: 0-7 = 2-9, 8 = ten-value, 9 = ace.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+NUM_RANKS = 10
+TEN_INDEX = 8
+ACE_INDEX = 9
+NO_PAIR = -1
+
+# Hard value of each rank index (ace counted as 1)
+RANK_HARD_VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 1)
+
+# Hard totals above this only arise when drawing to a busted hand and saturate
+MAX_HARD_TOTAL = 31
+
+EMPTY_STATE = 0
+
+StateKey = Tuple[int, bool, int, int]  # (hard total, soft, card bucket, pair rank)
+
+
+def _first_card_rank(hard: int, soft: bool) -> int:
+    """Rank index of the only card in a one-card hand"""
+    if soft:
+        return ACE_INDEX
+    return hard - 2
+
+
+def _next_key(key: StateKey, rank_index: int) -> StateKey:
+    """Compute the state reached by adding one card of the given rank"""
+    hard, soft, cards, _ = key
+    if hard > 21:
+        # Busted hands only ever grow; keep them out of the live states
+        return (min(hard + RANK_HARD_VALUES[rank_index], MAX_HARD_TOTAL), False, 3, NO_PAIR)
+
+    new_hard = min(hard + RANK_HARD_VALUES[rank_index], MAX_HARD_TOTAL)
+    new_soft = (soft or rank_index == ACE_INDEX) and new_hard <= 11
+    new_cards = min(cards + 1, 3)
+
+    pair = NO_PAIR
+    if cards == 1 and _first_card_rank(hard, soft) == rank_index:
+        pair = rank_index
+    return (new_hard, new_soft, new_cards, pair)
+
+
+def _build_tables():
+    """Enumerate every reachable state from the empty hand"""
+    keys: List[StateKey] = [(0, False, 0, NO_PAIR)]
+    ids: Dict[StateKey, int] = {keys[0]: EMPTY_STATE}
+    transitions: List[int] = []
+
+    state = 0
+    while state < len(keys):
+        for rank_index in range(NUM_RANKS):
+            key = _next_key(keys[state], rank_index)
+            if key not in ids:
+                ids[key] = len(keys)
+                keys.append(key)
+            transitions.append(ids[key])
+        state += 1
+    return keys, ids, transitions
+
+
+_STATE_KEYS, _STATE_IDS, _TRANSITIONS = _build_tables()
+
+NUM_STATES = len(_STATE_KEYS)
+TRANSITIONS: Tuple[int, ...] = tuple(_TRANSITIONS)
+
+STATE_HARD: Tuple[int, ...] = tuple(key[0] for key in _STATE_KEYS)
+STATE_SOFT: Tuple[bool, ...] = tuple(key[1] for key in _STATE_KEYS)
+STATE_CARDS: Tuple[int, ...] = tuple(key[2] for key in _STATE_KEYS)
+STATE_PAIR: Tuple[int, ...] = tuple(key[3] for key in _STATE_KEYS)
+STATE_VALUE: Tuple[int, ...] = tuple(hard + 10 if soft else hard
+                                     for hard, soft, _, _ in _STATE_KEYS)
+STATE_BUST: Tuple[bool, ...] = tuple(hard > 21 for hard, _, _, _ in _STATE_KEYS)
+STATE_NATURAL: Tuple[bool, ...] = tuple(cards == 2 and soft and hard == 11
+                                        for hard, soft, cards, _ in _STATE_KEYS)
+
+
+def _dealer_hits(stand_soft_17: bool) -> Tuple[bool, ...]:
+    hits = []
+    for state in range(NUM_STATES):
+        value = STATE_VALUE[state]
+        if STATE_BUST[state]:
+            hits.append(False)
+        elif value < 17:
+            hits.append(True)
+        else:
+            hits.append(value == 17 and STATE_SOFT[state] and not stand_soft_17)
+    return tuple(hits)
+
+
+DEALER_HITS_S17 = _dealer_hits(True)
+DEALER_HITS_H17 = _dealer_hits(False)
+
+
+def dealer_hits_table(stand_soft_17: bool) -> Tuple[bool, ...]:
+    """Get the per-state dealer hit flags for the soft 17 rule"""
+    return DEALER_HITS_S17 if stand_soft_17 else DEALER_HITS_H17
+
+
+def encode(hard: int, soft: bool, cards: int, pair: int = NO_PAIR) -> int:
+    """Get the state id for a hand description; raises KeyError if unreachable"""
+    return _STATE_IDS[(hard, soft and hard <= 11, min(cards, 3), pair)]
+
+
+def decode(state: int) -> StateKey:
+    """Get (hard total, soft, card bucket, pair rank) for a state id"""
+    return _STATE_KEYS[state]
+
+
+def advance(state: int, rank_index: int) -> int:
+    """Get the state after adding one card"""
+    return TRANSITIONS[state * NUM_RANKS + rank_index]
+
+
+def state_from_ranks(rank_indices: Iterable[int]) -> int:
+    """Build a state by adding cards of the given rank indices to an empty hand"""
+    state = EMPTY_STATE
+    for rank_index in rank_indices:
+        state = TRANSITIONS[state * NUM_RANKS + rank_index]
+    return state
@@ -0,0 +1,119 @@
+"""Rule-derived house edge and per-true-count advantage
+
+The off-the-top edge is the exact basic-strategy EV of a full shoe (see
+eor.basic_strategy_ev), played with the charts strategy_generator solves
+for the same rules, so payouts, H17, deck count and DAS all show up in it.
+The advantage per true count point is the central difference of the same
+EV on the counting system's average shoe (index_plays.count_composition)
+at +/- SLOPE_STEP, at the average depth the shoe is played to.
+
+The model itself (ev_calculator.HouseEdgeModel) is a small dataclass so the
+calculators can use it without importing the solver. Models are cached per
+counting system and rule hash; EVCalculator falls back to the constants in
+config until one is loaded.
+
+    python -m house_edge
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+from basic_strategy import BasicStrategy
+from config import CACHE_DIR
+from counting_systems import CountingSystem, get_counting_system
+from dealer_probabilities import shoe_composition
+from eor import basic_strategy_ev
+from ev_calculator import HouseEdgeModel
+from exact_ev import ExactEVCalculator
+from index_plays import average_decks_remaining, count_composition
+from settings import RuleSet, settings
+from strategy_generator import StrategyCharts
+
+# True counts either side of zero used for the slope
+SLOPE_STEP = 2.0
+
+
+def house_edge_path(system: CountingSystem, rules: RuleSet, cache_dir: str = CACHE_DIR) -> str:
+    """Cache file for a counting system and rule set"""
+    depth = f"pen{rules.penetration:.3f}"
+    return os.path.join(cache_dir, f"house_edge_{system.key}_{rules.cache_key()}_{depth}.json")
+
+
+def compute_house_edge(system: Optional[CountingSystem] = None, rules: Optional[RuleSet] = None,
+                       charts: Optional[StrategyCharts] = None,
+                       cache_dir: Optional[str] = CACHE_DIR) -> HouseEdgeModel:
+    """Solve the edge for a system and rules, using charts solved for the same rules"""
+    system = system if system is not None else get_counting_system()
+    rules = rules if rules is not None else settings.rule_set()
+    if charts is None:
+        charts = StrategyCharts.load_or_generate(rules, cache_dir=cache_dir)
+    strategy = BasicStrategy()
+    strategy.use_charts(charts)
+    compiled = strategy.compile(rules)
+    calculator = ExactEVCalculator(cache_size=8)
+
+    base = basic_strategy_ev(shoe_composition(rules.num_decks), rules, compiled, calculator)
+    decks = average_decks_remaining(rules)
+    high, low = (basic_strategy_ev(count_composition(system, true_count, decks), rules,
+                                   compiled, calculator)
+                 for true_count in (SLOPE_STEP, -SLOPE_STEP))
+    return HouseEdgeModel(base, (high - low) / (2 * SLOPE_STEP), system.key, rules.cache_key())
+
+
+def load_or_compute_house_edge(system: Optional[CountingSystem] = None,
+                               rules: Optional[RuleSet] = None,
+                               charts: Optional[StrategyCharts] = None,
+                               cache_dir: Optional[str] = CACHE_DIR) -> HouseEdgeModel:
+    """Load the cached model for this system and rules, computing and saving it if missing"""
+    system = system if system is not None else get_counting_system()
+    rules = rules if rules is not None else settings.rule_set()
+    path = house_edge_path(system, rules, cache_dir) if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            return HouseEdgeModel.load(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable house edge model {path}: {e}")
+
+    model = compute_house_edge(system, rules, charts, cache_dir)
+    if path:
+        model.save(path)
+    return model
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Solve the house edge for the current rules")
+    parser.add_argument('--system', default=None,
+                        help="Counting system key (default: the one in settings)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Solve again even if a cached model exists")
+    args = parser.parse_args(argv)
+
+    try:
+        system = get_counting_system(args.system)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    start = time.perf_counter()
+    rules = settings.rule_set()
+    if args.no_cache:
+        model = compute_house_edge(system, rules)
+        model.save(house_edge_path(system, rules))
+    else:
+        model = load_or_compute_house_edge(system, rules)
+    print(f"=== House Edge ({system.name}, {rules.num_decks} decks) ===")
+    print(f"Off the top:      {model.base_house_edge * 100:+.3f}%")
+    print(f"Per true count:   {model.true_count_advantage * 100:+.3f}%")
+    breakeven = (-model.base_house_edge / model.true_count_advantage
+                 if model.true_count_advantage > 0 else float('inf'))
+    print(f"Break-even count: {breakeven:+.2f}")
+    print(f"\nSolved in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""Index plays - the true counts at which basic strategy decisions flip
+
+For a counting system, the average shoe at true count TC has, per rank r,
+
+    n_r = w_r * d * (1 - TC * (t_r - t_mean) / V)
+
+cards, where w_r is the cards of the rank per deck, d the decks remaining,
+t_r the system's tag and V = sum(w_r * (t_r - t_mean)^2). This is the
+linear (least-squares) composition whose drift-corrected running count per
+deck is exactly TC. The playing true count already counts the hand and the
+upcard, so that composition is the unseen cards at the decision. Action EVs
+on it come from exact_ev, so for each two-card hand and upcard the index is
+found by bisecting the EV gain of the deviation over the basic strategy
+action. The basic strategy action comes from the charts the table will be
+played with (generated or typed), since a deviation only means something
+against the action it replaces. Upcards are solved in parallel and tables
+are cached per system, rule set and charts.
+
+IndexTable.lookup keys a hand state and upcard straight to its (at most
+two) deviations, so BasicStrategy.get_optimal_action(true_count=...) stays
+a constant-time lookup.
+
+    python -m index_plays --system hi-lo
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from basic_strategy import BasicStrategy, CompiledStrategy
+from config import CACHE_DIR
+from counting_systems import CountingSystem, get_counting_system
+from eor import RANK_LABELS, RANK_WEIGHTS
+from exact_ev import ExactEVCalculator
+from hand_state import (
+    ACE_INDEX, NUM_RANKS, NUM_STATES, STATE_BUST, STATE_VALUE, TEN_INDEX, decode,
+    state_from_ranks
+)
+from settings import RuleSet, settings
+from strategy_generator import StrategyCharts, charts_tag
+
+# True counts searched either side of zero, per level of the count
+SEARCH_RANGE = 10.0
+INDEX_TOLERANCE = 0.05
+# Bump when the solver changes, so tables cached by an older one are solved again
+INDEX_FORMAT = 2
+
+# Representative two-card hand for each hand key
+HAND_RANKS: Dict[str, Tuple[int, int]] = {}
+HAND_RANKS.update({f"H{total}": ranks for total, ranks in {
+    5: (1, 0), 6: (2, 0), 7: (3, 0), 8: (4, 0), 9: (3, 2), 10: (4, 2), 11: (4, 3)}.items()})
+HAND_RANKS.update({f"H{total}": (TEN_INDEX, total - 12) for total in range(12, 20)})
+HAND_RANKS.update({f"S{total}": (ACE_INDEX, total - 13) for total in range(13, 21)})
+HAND_RANKS.update({f"P{RANK_LABELS[rank]}": (rank, rank) for rank in range(NUM_RANKS)})
+
+CHART_ACTIONS = {'H': 'hit', 'S': 'stand', 'D': 'double', 'Ds': 'double', 'P': 'split'}
+ACTION_CODES = {'hit': 'H', 'stand': 'S', 'double': 'D', 'split': 'P'}
+
+
+def index_table_path(system: CountingSystem, rules: RuleSet, cache_dir: str = CACHE_DIR,
+                     charts: Optional[StrategyCharts] = None) -> str:
+    """Cache file for a counting system, rule set and the charts deviations are measured from"""
+    depth = f"pen{rules.penetration:.3f}"
+    return os.path.join(cache_dir, f"indices_{system.key}_{rules.cache_key()}_"
+                                   f"{rules.num_decks}d_{depth}_{charts_tag(charts)}_"
+                                   f"v{INDEX_FORMAT}.json")
+
+
+def average_decks_remaining(rules: RuleSet) -> float:
+    """Decks left on average while the shoe is in play (full shoe down to the cut)"""
+    return max(0.5, rules.num_decks * (1 - rules.penetration / 2))
+
+
+def count_composition(system: CountingSystem, true_count: float,
+                      decks: float) -> Tuple[float, ...]:
+    """Average rank composition of d decks at a true count in the given system"""
+    tags = system.average_rank_tags()
+    mean = sum(w * t for w, t in zip(RANK_WEIGHTS, tags)) / 52
+    spread = sum(w * (t - mean) ** 2 for w, t in zip(RANK_WEIGHTS, tags))
+    return tuple(w * decks * (1 - true_count * (t - mean) / spread)
+                 for w, t in zip(RANK_WEIGHTS, tags))
+
+
+def search_range(system: CountingSystem) -> float:
+    """Widest true count searched, kept inside compositions with every rank present"""
+    tags = system.average_rank_tags()
+    mean = sum(w * t for w, t in zip(RANK_WEIGHTS, tags)) / 52
+    spread = sum(w * (t - mean) ** 2 for w, t in zip(RANK_WEIGHTS, tags))
+    widest = max(abs(t - mean) for t in tags)
+    return min(SEARCH_RANGE * system.level, 0.9 * spread / widest)
+
+
+def insurance_index(system: CountingSystem, decks: float) -> Optional[float]:
+    """True count at which insurance against an ace breaks even (None if the count can't tell)"""
+    tags = system.average_rank_tags()
+    mean = sum(w * t for w, t in zip(RANK_WEIGHTS, tags)) / 52
+    spread = sum(w * (t - mean) ** 2 for w, t in zip(RANK_WEIGHTS, tags))
+    slope = tags[TEN_INDEX] - mean
+    if slope == 0:
+        return None
+    # Tens make up a third of the unseen cards once the ace upcard is out
+    tens_needed = (52 * decks - 1) / 3
+    return round((1 - tens_needed / (16 * decks)) * spread / slope, 1)
+
+
+@dataclass(frozen=True)
+class IndexPlay:
+    """Play `action` instead of basic strategy when the true count reaches `index`"""
+    hand: str  # Hand key, e.g. "H16", "S18", "PT"
+    upcard: int  # Rank index
+    action: str  # Chart code: 'H', 'S', 'D' or 'P'
+    index: float
+    above: bool  # True: at or above the index; False: at or below it
+
+    def applies(self, true_count: float) -> bool:
+        return true_count >= self.index if self.above else true_count <= self.index
+
+    def label(self) -> str:
+        return (f"{self.hand} v {RANK_LABELS[self.upcard]}: {self.action} at "
+                f"{self.index:+.1f}{'+' if self.above else '-'}")
+
+
+def _state_keys() -> Tuple[Tuple[Optional[str], Optional[str]], ...]:
+    """(total key, pair key) of every hand state"""
+    keys = []
+    for state in range(NUM_STATES):
+        hard, soft, cards, pair = decode(state)
+        if cards < 2 or STATE_BUST[state]:
+            keys.append((None, None))
+            continue
+        value = STATE_VALUE[state]
+        total_key = f"S{value}" if soft else f"H{value}"
+        pair_key = f"P{RANK_LABELS[pair]}" if pair >= 0 else None
+        keys.append((total_key, pair_key))
+    return tuple(keys)
+
+
+STATE_KEYS = _state_keys()
+
+
+@dataclass
+class IndexTable:
+    """Generated index plays for one counting system and rule set"""
+    system: str
+    num_decks: int
+    plays: List[IndexPlay] = field(default_factory=list)
+    insurance: Optional[float] = None
+
+    def __post_init__(self):
+        # (hand key, upcard) -> deviations, for constant-time lookups
+        self._by_key: Dict[Tuple[str, int], Tuple[IndexPlay, ...]] = {}
+        for play in self.plays:
+            key = (play.hand, play.upcard)
+            self._by_key[key] = self._by_key.get(key, ()) + (play,)
+
+    def lookup(self, state: int, upcard_index: int, true_count: float, can_double: bool,
+               can_split: bool, basic_action: str) -> str:
+        """Action for a hand state at a true count, given the basic strategy action"""
+        total_key, pair_key = STATE_KEYS[state]
+        if can_split and pair_key is not None:
+            for play in self._by_key.get((pair_key, upcard_index), ()):
+                if play.applies(true_count):
+                    if play.action == 'P':
+                        return play.action
+                    # Not splitting: play the hand as a total, deviations included
+                    basic_action = play.action
+                    break
+            else:
+                if basic_action == 'P':
+                    return basic_action
+        for play in self._by_key.get((total_key, upcard_index), ()):
+            if play.applies(true_count) and (play.action != 'D' or can_double):
+                return play.action
+        return basic_action
+
+    def take_insurance(self, true_count: float) -> bool:
+        return self.insurance is not None and true_count >= self.insurance
+
+    def find(self, hand: str, upcard_index: int) -> Tuple[IndexPlay, ...]:
+        """Deviations for a hand key (e.g. "H16") against an upcard"""
+        return self._by_key.get((hand, upcard_index), ())
+
+    @classmethod
+    def generate(cls, system: Optional[CountingSystem] = None, rules: Optional[RuleSet] = None,
+                 workers: Optional[int] = None, hands: Optional[Sequence[str]] = None,
+                 decks: Optional[float] = None,
+                 charts: Optional[StrategyCharts] = None) -> 'IndexTable':
+        """
+        Solve every hand and upcard, one upcard per pool task when workers > 1
+        charts: the charts the table will be played with (None for the typed ones)
+        """
+        system = system if system is not None else get_counting_system()
+        rules = rules if rules is not None else settings.rule_set()
+        decks = decks if decks is not None else average_decks_remaining(rules)
+        hands = tuple(hands) if hands is not None else tuple(HAND_RANKS)
+        workers = workers or os.cpu_count() or 1
+        jobs = [(system.key, rules, upcard, hands, decks, charts) for upcard in range(NUM_RANKS)]
+        if workers == 1:
+            solved = [_solve_upcard(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                solved = list(pool.map(_solve_upcard, jobs))
+        plays = [play for upcard_plays in solved for play in upcard_plays]
+        return cls(system.key, rules.num_decks, plays, insurance_index(system, decks))
+
+    @classmethod
+    def load_or_generate(cls, system: Optional[CountingSystem] = None,
+                         rules: Optional[RuleSet] = None, workers: Optional[int] = None,
+                         cache_dir: Optional[str] = CACHE_DIR,
+                         charts: Optional[StrategyCharts] = None) -> 'IndexTable':
+        """Load the cached table for this system and rules, generating and saving it if missing"""
+        system = system if system is not None else get_counting_system()
+        rules = rules if rules is not None else settings.rule_set()
+        path = index_table_path(system, rules, cache_dir, charts) if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                return cls.load(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable index table {path}: {e}")
+
+        table = cls.generate(system, rules, workers, charts=charts)
+        if path:
+            table.save(path)
+        return table
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            'format': INDEX_FORMAT,
+            'system': self.system,
+            'num_decks': self.num_decks,
+            'insurance': self.insurance,
+            'plays': [asdict(play) for play in self.plays]
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'IndexTable':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('format') != INDEX_FORMAT:
+            raise ValueError(f"solved by an older index solver (format {data.get('format')})")
+        return cls(data['system'], data['num_decks'],
+                   [IndexPlay(**play) for play in data['plays']], data['insurance'])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IndexTable):
+            return NotImplemented
+        return (self.system, self.num_decks, self.plays, self.insurance) == \
+            (other.system, other.num_decks, other.plays, other.insurance)
+
+
+class _HandSolver:
+    """Action EVs for one two-card hand and upcard as the true count varies"""
+
+    def __init__(self, system: CountingSystem, rules: RuleSet, calculator: ExactEVCalculator,
+                 ranks: Tuple[int, int], upcard: int, decks: float, split: bool):
+        self.system = system
+        self.rules = rules
+        self.calculator = calculator
+        self.ranks = ranks
+        self.upcard = upcard
+        self.decks = decks
+        self.split = split
+        self._evs: Dict[float, Dict[str, float]] = {}
+
+    def evs(self, true_count: float) -> Dict[str, float]:
+        cached = self._evs.get(true_count)
+        if cached is None:
+            # The hand and upcard are in the count, so they are already out of this
+            counts = count_composition(self.system, true_count, self.decks)
+            cached = self.calculator.action_evs(self.ranks, self.upcard, counts,
+                                                can_split=self.split, rules=self.rules)
+            if self.split:
+                cached = {'split': cached.get('split', float('-inf')),
+                          'other': max(ev for action, ev in cached.items() if action != 'split')}
+            self._evs[true_count] = cached
+        return cached
+
+    def gain(self, true_count: float, action: str, basic: str) -> float:
+        evs = self.evs(true_count)
+        return evs[action] - evs[basic]
+
+    def flip(self, action: str, basic: str, limit: float) -> Optional[float]:
+        """True count where `action` overtakes `basic`, searching from 0 towards `limit`"""
+        if self.gain(limit, action, basic) <= 0:
+            return None
+        low, high = (0.0, limit) if limit > 0 else (limit, 0.0)
+        gain_low = self.gain(low, action, basic)
+        gain_high = self.gain(high, action, basic)
+        if (gain_low > 0) == (gain_high > 0):
+            # Already better at zero: the chart disagrees; look across the other side
+            low, high = (-limit, 0.0) if limit > 0 else (0.0, -limit)
+            gain_low = self.gain(low, action, basic)
+            gain_high = self.gain(high, action, basic)
+            if (gain_low > 0) == (gain_high > 0):
+                return None
+        while high - low > INDEX_TOLERANCE:
+            middle = (low + high) / 2
+            if (self.gain(middle, action, basic) > 0) == (gain_high > 0):
+                high = middle
+            else:
+                low = middle
+        return round((low + high) / 2, 1)
+
+
+def _solve_upcard(job: Tuple) -> List[IndexPlay]:
+    """Worker entry point: deviations for every hand against one upcard"""
+    system_key, rules, upcard, hands, decks, charts = job
+    system = get_counting_system(system_key)
+    strategy = BasicStrategy()
+    strategy.use_charts(charts)
+    compiled = strategy.compile(rules)
+    calculator = ExactEVCalculator(cache_size=16)
+    limit = search_range(system)
+    plays = []
+    for hand in hands:
+        ranks = HAND_RANKS[hand]
+        split = hand[0] == 'P'
+        if split and rules.max_splits == 0:
+            continue
+        state = state_from_ranks(ranks)
+        solver = _HandSolver(system, rules, calculator, ranks, upcard, decks, split)
+        plays.extend(_hand_plays(solver, compiled, hand, state, upcard, limit))
+    return plays
+
+
+def _hand_plays(solver: _HandSolver, compiled: CompiledStrategy, hand: str, state: int,
+                upcard: int, limit: float) -> List[IndexPlay]:
+    """Deviations at high and low counts for one hand, relative to the compiled chart"""
+    plays = []
+    if solver.split:
+        splits = compiled.lookup(state, upcard, True, True) == 'P'
+        other = compiled.lookup(state, upcard, True, False)
+        basic = 'split' if splits else 'other'
+        codes = {'split': 'P', 'other': other}
+    else:
+        chart = compiled.lookup(state, upcard, True, False)
+        basic = CHART_ACTIONS[chart]
+        if basic not in solver.evs(0.0):
+            basic = 'stand' if chart == 'Ds' else 'hit'
+        codes = ACTION_CODES
+
+    for extreme, above in ((limit, True), (-limit, False)):
+        evs = solver.evs(extreme)
+        best = max(evs, key=evs.get)
+        if best == basic:
+            continue
+        index = solver.flip(best, basic, extreme)
+        if index is not None:
+            plays.append(IndexPlay(hand, upcard, codes[best], index, above))
+    return plays
+
+
+def format_indices(table: IndexTable) -> str:
+    """Format an index table for console output"""
+    system = get_counting_system(table.system)
+    lines = [f"=== Index Plays ({system.name}, {table.num_decks} decks) ==="]
+    if table.insurance is not None:
+        lines.append(f"Insurance at {table.insurance:+.1f}+")
+    for play in sorted(table.plays, key=lambda play: (play.hand[0], play.hand, play.upcard)):
+        lines.append(play.label())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Generate count-based index plays")
+    parser.add_argument('--system', default=None,
+                        help="Counting system key (default: the one in settings)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Generate again even if a cached table exists")
+    parser.add_argument('--typed-charts', action='store_true',
+                        help="Deviate from the typed charts, not ones generated for the rules")
+    args = parser.parse_args(argv)
+
+    try:
+        system = get_counting_system(args.system)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    start = time.perf_counter()
+    rules = settings.rule_set()
+    charts = None if args.typed_charts else StrategyCharts.load_or_generate(rules)
+    if args.no_cache:
+        table = IndexTable.generate(system, rules, args.workers, charts=charts)
+        table.save(index_table_path(system, rules, charts=charts))
+    else:
+        table = IndexTable.load_or_generate(system, rules, args.workers, charts=charts)
+    print(format_indices(table))
+    print(f"\n{len(table.plays)} index plays in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Kelly bet sizing over a full round outcome distribution
+
+A round's result X (in initial-bet units) takes many values: -1 and +1,
++1.5 for a blackjack, +/-2 for doubles and more after splits. Betting a
+fraction f of the bankroll grows it by E[log(1 + f * X)] per round, which is
+concave in f, so the growth-optimal fraction is the root of
+
+    g'(f) = sum(p_i * x_i / (1 + f * x_i)) = 0
+
+on [0, 1 / max loss), found by bisection. With unit variance and even-money
+results it reduces to the familiar fraction = edge.
+"""
+
+import math
+from typing import Sequence
+
+TOLERANCE = 1e-9
+# Upper bound on the fraction when the distribution has no losing outcome
+MAX_FRACTION = 1.0
+
+
+def log_growth(fraction: float, results: Sequence[float],
+               probabilities: Sequence[float]) -> float:
+    """Expected log growth of the bankroll per round when betting a fraction of it"""
+    growth = 0.0
+    for result, probability in zip(results, probabilities):
+        wealth = 1.0 + fraction * result
+        if wealth <= 0:
+            return -math.inf
+        growth += probability * math.log(wealth)
+    return growth
+
+
+def optimal_fraction(results: Sequence[float], probabilities: Sequence[float],
+                     shift: float = 0.0) -> float:
+    """
+    Growth-optimal share of the bankroll to bet on one round (0 without an edge)
+    shift moves every result, e.g. to match a smoothed mean
+    """
+    shifted = [result + shift for result in results]
+    mean = sum(p * x for x, p in zip(shifted, probabilities))
+    if mean <= 0:
+        return 0.0
+
+    worst = min(shifted)
+    high = min(MAX_FRACTION, -1.0 / worst) if worst < 0 else MAX_FRACTION
+    low = 0.0
+
+    def slope(fraction: float) -> float:
+        return sum(p * x / (1.0 + fraction * x) for x, p in zip(shifted, probabilities))
+
+    # Stay strictly inside the domain where the worst result doesn't wipe out the bankroll
+    high *= 1 - TOLERANCE
+    if slope(high) >= 0:
+        return high
+    while high - low > TOLERANCE:
+        middle = (low + high) / 2
+        if slope(middle) > 0:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
@@ -3,22 +3,28 @@
 import tkinter as tk
 from tkinter import messagebox
 import sys
+import threading
 from typing import Optional
 
 from config import *
 from game_engine import GameState, GameRules
 from card_counting import CardCounter
-from ev_calculator import EVCalculator
+from counting_systems import get_counting_system
+from ev_calculator import EVCalculator, HouseEdgeModel
+from house_edge import load_or_compute_house_edge
 from basic_strategy import StrategyTracker
 from ui_components import (
     BlackjackTable, ControlPanel, InfoDisplay, 
-    GameControls, MessageDisplay, StrategyDisplay
+    GameControls, MessageDisplay, StrategyDisplay, ProbabilityDisplay
 )
 from session_stats_display import SessionStatsDisplay
 from settings import settings
 from settings_dialog import SettingsDialog
 from auto_play import AutoPlayer, DifficultyLevel, PracticeMode
 from betting_strategy import BettingStrategyCalculator
+from ev_table import EVTable, available as ev_table_available
+from ev_worker import EVRequest, EVWorker
+from strategy_generator import StrategyCharts
 
 class BlackjackGame:
     """Main application class that coordinates game logic and UI"""
@@ -50,6 +56,16 @@ class BlackjackGame:
         # Initialize betting strategy
         self.betting_calculator = BettingStrategyCalculator(self.ev_calculator)
         
+        # Per-action EVs are solved off the Tk thread and posted back via after()
+        self.ev_worker = EVWorker(lambda callback: self.root.after(0, callback))
+        self._ev_request: Optional[EVRequest] = None
+        self._hand_true_count = 0.0
+        
+        # (rule hash, system, penetration) of the strategy charts, house edge and
+        # EV table in use, and of any still being solved or loaded in the background
+        self._models_key: Optional[tuple] = None
+        self._models_pending: Optional[tuple] = None
+        
         # Auto-deal timer
         self.auto_deal_timer = None
         
@@ -78,6 +94,7 @@ class BlackjackGame:
         self.control_panel = ControlPanel(self.root)
         self.info_display = InfoDisplay(self.root)
         self.strategy_display = StrategyDisplay(self.root)
+        self.probability_display = ProbabilityDisplay(self.root)
         self.session_stats_display = SessionStatsDisplay(self.root)
         self.game_controls = GameControls(self.root)
         
@@ -142,24 +159,96 @@ class BlackjackGame:
     
     def _on_settings_saved(self):
         """Called when settings are saved"""
-        # Apply new settings
-        self._apply_settings()
-        
-        # Recreate shoe if deck count changed
-        if self.game_state.shoe.num_decks != settings.shoe_config.num_decks:
+        # Apply new settings; a new deck count or counting system needs a fresh shoe
+        if self._apply_settings():
             self.new_shoe()
         
         # Update displays
         self.update_displays()
     
-    def _apply_settings(self):
-        """Apply current settings to the game"""
+    def _apply_settings(self) -> bool:
+        """Apply current settings to the game; True if the count had to start over"""
         # Update table color
         self.root.configure(bg=settings.display_prefs.table_color)
         
-        # Update shoe if needed
-        if hasattr(self.game_state, 'shoe') and self.game_state.shoe.num_decks != settings.shoe_config.num_decks:
-            self.game_state.shoe = self.game_state.shoe.__class__(settings.shoe_config.num_decks)
+        # Snapshot the new rules; the shoe is rebuilt if the deck count changed
+        num_decks = self.game_state.shoe.num_decks
+        self.game_state.set_rules(settings.rule_set())
+        
+        # The counter's initial count and true count depend on system and shoe size
+        system = get_counting_system()
+        shoe_changed = (system is not self.counter.system
+                        or num_decks != self.game_state.shoe.num_decks)
+        if shoe_changed:
+            self.counter.set_system(system, self.game_state.shoe.num_decks)
+        
+        # Strategy charts, house edge and EV table for the new rules come from disk or solvers
+        self._load_rule_models()
+        
+        # Show/hide the action EV panel
+        self.probability_display.set_visible(settings.display_prefs.show_probabilities)
+        self._ev_request = None
+        return shoe_changed
+    
+    def _load_rule_models(self):
+        """Load or solve the strategy charts, house edge and EV table off the Tk thread"""
+        rules = self.game_state.rules
+        system = self.counter.system
+        models_key = (rules.cache_key(), system.key, rules.penetration)
+        if models_key == self._models_key:
+            self._models_pending = None  # Drop anything still solving for other rules
+            return
+        if models_key == self._models_pending:
+            return
+        self._models_pending = models_key
+        
+        def load():
+            try:
+                charts = StrategyCharts.load_or_generate(rules)
+                self.root.after(0, lambda: self._on_charts_loaded(models_key, charts))
+                model = load_or_compute_house_edge(system, rules, charts)
+                self.root.after(0, lambda: self._on_house_edge_loaded(models_key, model))
+                # Simulating the EV table needs NumPy; without it the linear model stays
+                ev_table = (EVTable.load_or_simulate(system, rules, charts=charts)
+                            if ev_table_available() else None)
+            except Exception as e:
+                error = e
+                self.root.after(0, lambda: self._on_rule_models_failed(models_key, error))
+                return
+            self.root.after(0, lambda: self._on_ev_table_loaded(models_key, ev_table))
+        
+        # Until they arrive, hints and edges come from the models already in use
+        threading.Thread(target=load, name="rule-models", daemon=True).start()
+    
+    def _on_charts_loaded(self, models_key: tuple, charts: StrategyCharts):
+        """Runs on the Tk thread; ignores charts for rules that were changed meanwhile"""
+        if models_key == self._models_pending:
+            self.strategy_tracker.strategy.use_charts(charts)
+    
+    def _on_house_edge_loaded(self, models_key: tuple, model: HouseEdgeModel):
+        """Runs on the Tk thread; the edge feeds the EV display and Kelly bets"""
+        if models_key == self._models_pending:
+            self.ev_calculator.set_model(model)
+            # The old rules' EV table no longer applies; the new model stands in for it
+            self.ev_calculator.set_ev_table(None)
+            self.update_displays()
+    
+    def _on_rule_models_failed(self, models_key: tuple, error: Exception):
+        """Runs on the Tk thread; clears the pending key so applying these rules again retries"""
+        if models_key != self._models_pending:
+            return
+        self._models_pending = None
+        self.message_display.show_message(
+            f"Solving strategy charts, house edge or EV table failed: {error}", ERROR_COLOR)
+    
+    def _on_ev_table_loaded(self, models_key: tuple, ev_table: Optional[EVTable]):
+        """Runs on the Tk thread; the simulated table takes over from the linear model"""
+        if models_key != self._models_pending:
+            return
+        self._models_pending = None
+        self._models_key = models_key
+        self.ev_calculator.set_ev_table(ev_table)
+        self.update_displays()
     
     def increase_bet(self):
         """Increase bet size"""
@@ -217,6 +306,9 @@ class BlackjackGame:
             self.new_shoe()
             return
         
+        # Results are bucketed by the count the bet was placed at
+        self._hand_true_count = self.counter.get_betting_true_count(self.game_state.shoe.cards_remaining())
+        
         # Start new hand
         self.game_state.start_new_hand(self.game_state.current_bet)
         
@@ -474,9 +566,8 @@ class BlackjackGame:
         outcome, profit = self.game_state.complete_hand()
         
         # Update EV tracking
-        true_count = self.counter.get_true_count(self.game_state.shoe.cards_remaining())
         self.ev_calculator.update_session_ev(
-            self.game_state.current_bet, true_count, profit
+            self.game_state.current_bet, self._hand_true_count, profit
         )
         
         # Record hand played in practice mode
@@ -630,6 +721,28 @@ class BlackjackGame:
             self._update_bet_suggestion()
         else:
             self.game_controls.clear_bet_suggestion()
+        
+        # Action EVs for the active hand
+        self._update_probabilities()
+    
+    def _update_probabilities(self):
+        """Queue an EV calculation for the active hand on the background worker"""
+        request = None
+        if settings.display_prefs.show_probabilities:
+            request = EVRequest.from_game_state(self.game_state)
+        
+        # Nothing changed since the last request
+        if request == self._ev_request:
+            return
+        self._ev_request = request
+        
+        if request is None:
+            self.ev_worker.cancel()
+            self.probability_display.clear()
+            return
+        
+        self.probability_display.show_calculating()
+        self.ev_worker.submit(request, self.probability_display.show_evs)
     
     def _update_bet_suggestion(self):
         """Update betting strategy suggestion"""
@@ -638,7 +751,7 @@ class BlackjackGame:
             self.game_controls.clear_bet_suggestion()
             return
         
-        true_count = self.counter.get_true_count(self.game_state.shoe.cards_remaining())
+        true_count = self.counter.get_betting_true_count(self.game_state.shoe.cards_remaining())
         suggested_bet = self.betting_calculator.calculate_bet_size(
             self.game_state.bankroll,
             true_count,
@@ -743,7 +856,11 @@ class BlackjackGame:
     
     def run(self):
         """Start the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # Closing the window or Escape both end the main loop
+            self.ev_worker.stop(timeout=1.0)
 
 def main():
     """Main entry point"""
@@ -0,0 +1,252 @@
+"""Risk of ruin - analytic estimates and a NumPy Monte Carlo over bankroll trajectories
+
+The analytic estimates treat the bankroll as Brownian motion with the
+per-round win rate and standard deviation of the betting ramp. The Monte
+Carlo instead draws rounds from empirical per-true-count outcome
+histograms (recorded by vector_sim) and plays thousands of trajectories
+side by side, so skew from doubles, splits and blackjacks is kept.
+
+    python -m risk_of_ruin --bankroll 10000 --trip-rounds 5000 --stop-loss 2000
+"""
+
+import argparse
+import math
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only the Monte Carlo needs it
+    np = None
+
+from counting_systems import CountingSystem
+from settings import BettingLimits, RuleSet, settings
+from strategy_generator import StrategyCharts
+from vector_sim import VectorSimulator, flat_ramp, ramp_for_limits
+
+
+def normal_cdf(x: float) -> float:
+    """Standard normal cumulative distribution"""
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def analytic_risk_of_ruin(win_rate: float, std_dev: float, bankroll: float) -> float:
+    """
+    Chance of ever losing the bankroll: exp(-2 * win rate * bankroll / variance)
+    win_rate and std_dev are per round, in the same units as the bankroll.
+    """
+    if bankroll <= 0:
+        return 1.0
+    if win_rate <= 0:
+        return 1.0
+    if std_dev <= 0:
+        return 0.0
+    return min(1.0, math.exp(-2.0 * win_rate * bankroll / (std_dev * std_dev)))
+
+
+def trip_risk_of_ruin(win_rate: float, std_dev: float, bankroll: float, rounds: int) -> float:
+    """Chance of losing the bankroll at any point within a trip of the given length"""
+    if bankroll <= 0:
+        return 1.0
+    if rounds <= 0 or std_dev <= 0:
+        return 0.0 if win_rate * rounds > -bankroll else 1.0
+    spread = std_dev * math.sqrt(rounds)
+    drift = win_rate * rounds
+    # First passage of Brownian motion with drift below -bankroll by time T
+    risk = normal_cdf((-bankroll - drift) / spread)
+    exponent = -2.0 * win_rate * bankroll / (std_dev * std_dev)
+    if exponent < 700:
+        risk += math.exp(exponent) * normal_cdf((-bankroll + drift) / spread)
+    return min(1.0, max(0.0, risk))
+
+
+@dataclass
+class OutcomeModel:
+    """Empirical round results in initial-bet units, per floor(true count) bucket"""
+    histograms: Dict[int, Dict[float, int]] = field(default_factory=dict)
+
+    @classmethod
+    def simulate(cls, rounds: int, rules: Optional[RuleSet] = None, lanes: int = 10000,
+                 rng=None, system: Optional[CountingSystem] = None,
+                 charts: Optional[StrategyCharts] = None) -> 'OutcomeModel':
+        """Record outcome histograms from a flat-bet vectorized simulation"""
+        simulator = VectorSimulator(lanes=lanes, rules=rules, rng=rng,
+                                    bet_ramp=flat_ramp(1), record_outcomes=True, system=system,
+                                    charts=charts)
+        simulator.run(rounds)
+        return cls(simulator.outcome_counts)
+
+    @property
+    def rounds(self) -> int:
+        return sum(sum(histogram.values()) for histogram in self.histograms.values())
+
+    def bucket_frequencies(self) -> Dict[int, float]:
+        """Share of rounds played at each true count"""
+        total = self.rounds
+        return {key: sum(histogram.values()) / total
+                for key, histogram in sorted(self.histograms.items())}
+
+    def bucket_bets(self, bet_ramp) -> Dict[int, float]:
+        """Bet for each bucket, evaluated at the middle of its true count range"""
+        keys = sorted(self.histograms)
+        bets = bet_ramp(np.array(keys, dtype=float) + 0.5)
+        return dict(zip(keys, bets.tolist()))
+
+    def joint(self, bet_ramp) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Per-round dollar results and their probabilities under a bet ramp"""
+        total = self.rounds
+        bets = self.bucket_bets(bet_ramp)
+        values: List[float] = []
+        probabilities: List[float] = []
+        for key, histogram in self.histograms.items():
+            for units, count in histogram.items():
+                values.append(units * bets[key])
+                probabilities.append(count / total)
+        probabilities_array = np.array(probabilities)
+        return np.array(values), probabilities_array / probabilities_array.sum()
+
+    def win_rate_and_std_dev(self, bet_ramp) -> Tuple[float, float]:
+        """Expected result and standard deviation per round under a bet ramp"""
+        values, probabilities = self.joint(bet_ramp)
+        mean = float(values @ probabilities)
+        variance = float(((values - mean) ** 2) @ probabilities)
+        return mean, math.sqrt(variance)
+
+
+@dataclass
+class RiskResult:
+    """Monte Carlo risk of ruin estimate"""
+    risk_of_ruin: float
+    std_error: float
+    trajectories: int
+    rounds: int
+    ruined: int
+    mean_final_bankroll: float  # Over all trajectories, ruined ones included
+    analytic: float  # Closed-form estimate for the same horizon
+
+    def get_summary(self) -> Dict:
+        return {
+            'risk_of_ruin': self.risk_of_ruin,
+            'std_error': self.std_error,
+            'trajectories': self.trajectories,
+            'rounds': self.rounds,
+            'ruined': self.ruined,
+            'mean_final_bankroll': self.mean_final_bankroll,
+            'analytic': self.analytic
+        }
+
+
+class RiskOfRuinCalculator:
+    """Risk of ruin for a bankroll and a count-based bet ramp"""
+
+    def __init__(self, model: OutcomeModel, bankroll: Optional[float] = None,
+                 bet_ramp=None, limits: Optional[BettingLimits] = None):
+        if np is None:
+            raise ImportError("RiskOfRuinCalculator requires numpy (pip install numpy)")
+        limits = limits if limits is not None else settings.betting_limits
+        self.model = model
+        self.bankroll = float(bankroll if bankroll is not None else limits.default_bankroll)
+        self.bet_ramp = bet_ramp if bet_ramp is not None else ramp_for_limits(limits)
+        self.win_rate, self.std_dev = model.win_rate_and_std_dev(self.bet_ramp)
+
+    def _risk_capital(self, stop_loss: Optional[float]) -> float:
+        """Amount that can be lost before the trip counts as ruined"""
+        if stop_loss is None:
+            return self.bankroll
+        return min(self.bankroll, stop_loss)
+
+    def analytic(self, rounds: Optional[int] = None, stop_loss: Optional[float] = None) -> float:
+        """Closed-form risk of ruin, over a lifetime or a trip of the given length"""
+        capital = self._risk_capital(stop_loss)
+        if rounds is None:
+            return analytic_risk_of_ruin(self.win_rate, self.std_dev, capital)
+        return trip_risk_of_ruin(self.win_rate, self.std_dev, capital, rounds)
+
+    def monte_carlo(self, rounds: int, trajectories: int = 10000,
+                    stop_loss: Optional[float] = None, rng=None,
+                    block_rounds: int = 500) -> RiskResult:
+        """Play bankroll trajectories in parallel for a trip of the given length"""
+        rng = rng if rng is not None else np.random.default_rng()
+        values, probabilities = self.model.joint(self.bet_ramp)
+        capital = self._risk_capital(stop_loss)
+
+        # Track the loss budget; a trajectory is ruined once it reaches zero
+        budget = np.full(trajectories, capital)
+        alive = np.ones(trajectories, dtype=bool)
+        played = 0
+        while played < rounds and alive.any():
+            step = min(block_rounds, rounds - played)
+            rows = np.flatnonzero(alive)
+            draws = rng.choice(values, size=(len(rows), step), p=probabilities)
+            paths = budget[rows, None] + np.cumsum(draws, axis=1)
+            ruined = (paths <= 0).any(axis=1)
+            budget[rows] = np.where(ruined, 0.0, paths[:, -1])
+            alive[rows[ruined]] = False
+            played += step
+
+        ruined_count = int((~alive).sum())
+        risk = ruined_count / trajectories
+        return RiskResult(
+            risk_of_ruin=risk,
+            std_error=math.sqrt(risk * (1 - risk) / trajectories),
+            trajectories=trajectories,
+            rounds=rounds,
+            ruined=ruined_count,
+            mean_final_bankroll=float((self.bankroll - capital + budget).mean()),
+            analytic=self.analytic(rounds, stop_loss)
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Risk of ruin for the configured bet ramp")
+    parser.add_argument('--bankroll', type=float, default=None,
+                        help="Bankroll (default: settings default bankroll)")
+    parser.add_argument('--betting', choices=['flat', 'spread', 'optimal'], default=None,
+                        help="Override the betting strategy from settings")
+    parser.add_argument('--trip-rounds', type=int, default=10000,
+                        help="Rounds per trip for the Monte Carlo and trip estimate")
+    parser.add_argument('--stop-loss', type=float, default=None,
+                        help="Quit the trip after losing this much")
+    parser.add_argument('--trajectories', type=int, default=10000,
+                        help="Bankroll trajectories to simulate")
+    parser.add_argument('--sample-rounds', type=int, default=2000000,
+                        help="Rounds simulated to build the outcome histograms")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed for a reproducible run")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("risk_of_ruin requires numpy (pip install numpy)")
+        return 1
+    if args.betting:
+        settings.betting_limits.betting_strategy = args.betting
+    # Check the ramp before spending time on the simulation
+    strategy = settings.betting_limits.betting_strategy
+    try:
+        bet_ramp = flat_ramp() if strategy == "kelly" else ramp_for_limits()
+    except ValueError as e:
+        print(e)
+        return 1
+    if strategy == "kelly":
+        print("Kelly sizing depends on the bankroll; using flat bets")
+
+    rng = np.random.default_rng(args.seed)
+    model = OutcomeModel.simulate(args.sample_rounds, rng=rng)
+    calculator = RiskOfRuinCalculator(model, bankroll=args.bankroll, bet_ramp=bet_ramp)
+    result = calculator.monte_carlo(args.trip_rounds, args.trajectories, args.stop_loss, rng)
+
+    print("=== Risk of Ruin ===")
+    print(f"Bankroll:          ${calculator.bankroll:,.2f}")
+    print(f"Win rate:          ${calculator.win_rate:+.4f} per round")
+    print(f"SD:                ${calculator.std_dev:.2f} per round")
+    print(f"Lifetime (analytic): {calculator.analytic(stop_loss=args.stop_loss) * 100:.2f}%")
+    print(f"Trip of {args.trip_rounds:,} rounds: {result.risk_of_ruin * 100:.2f}% "
+          f"± {result.std_error * 100:.2f}% (analytic {result.analytic * 100:.2f}%)")
+    print(f"Mean final bankroll: ${result.mean_final_bankroll:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
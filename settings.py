@@ -1,9 +1,10 @@
 """Settings management system for Blackjack Card Counter Trainer"""
 
+import hashlib
 import json
 import os
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, asdict, fields
 
 @dataclass
 class GameRules:
@@ -30,11 +31,25 @@ class BettingLimits:
     bet_increment: int = 5
     
     # Betting strategy settings
-    betting_strategy: str = "flat"  # "flat", "spread", "kelly"
+    betting_strategy: str = "flat"  # "flat", "spread", "kelly", "optimal"
     spread_min_multiplier: float = 1.0  # Minimum bet multiplier for spread betting
     spread_max_multiplier: float = 8.0  # Maximum bet multiplier for spread betting
     kelly_fraction: float = 0.25  # Fractional Kelly (25% of full Kelly)
     spread_start_count: float = 1.0  # True count to start spreading bets
+    optimal_max_spread: float = 8.0  # Largest bet / min bet allowed by bet_optimizer
+    # [true count, bet] steps written by bet_optimizer, ascending by count
+    optimal_ramp: List[List[float]] = field(default_factory=list)
+    
+    def optimal_bet(self, true_count: float) -> Optional[float]:
+        """Bet from the optimized ramp: the step at or below the count (None if unset)"""
+        if not self.optimal_ramp:
+            return None
+        bet = self.optimal_ramp[0][1]
+        for step_count, step_bet in self.optimal_ramp:
+            if step_count > true_count:
+                break
+            bet = step_bet
+        return bet
     
 @dataclass
 class ShoeConfiguration:
@@ -69,10 +84,51 @@ class DisplayPreferences:
 @dataclass
 class CountingSystem:
     """Card counting system settings"""
-    system: str = "hi-lo"  # Currently only hi-lo supported
+    system: str = "hi-lo"  # Key in counting_systems.COUNTING_SYSTEMS
     show_deck_estimation: bool = True
     true_count_precision: int = 1  # Decimal places
     
+@dataclass(frozen=True)
+class RuleSet:
+    """Immutable, hashable snapshot of the rules the game engine enforces
+    
+    Captured once per GameState/Shoe so hot loops read plain attributes
+    instead of going through the global settings, and so several rule sets
+    can be simulated side by side in one process.
+    """
+    num_decks: int = 6
+    penetration: float = 0.67
+    burn_card: bool = True
+    dealer_stand_soft_17: bool = True
+    blackjack_payout: float = 1.5
+    surrender_allowed: bool = False
+    late_surrender_only: bool = True
+    double_after_split: bool = True
+    resplit_aces: bool = False
+    max_splits: int = 3
+    double_on_any_two: bool = True
+    insurance_allowed: bool = True
+    split_aces_one_card: bool = True
+    
+    # Shoe cut settings don't change per-round play or edge
+    _CUT_FIELDS = ('penetration', 'burn_card')
+    
+    @classmethod
+    def from_settings(cls, game_rules: GameRules, shoe_config: ShoeConfiguration) -> 'RuleSet':
+        """Snapshot the rule-related settings groups"""
+        values = {}
+        for f in fields(cls):
+            source = shoe_config if hasattr(shoe_config, f.name) else game_rules
+            values[f.name] = getattr(source, f.name)
+        return cls(**values)
+    
+    def cache_key(self) -> str:
+        """Stable digest for on-disk caches, ignoring shoe cut settings"""
+        data = {name: value for name, value in asdict(self).items()
+                if name not in self._CUT_FIELDS}
+        encoded = json.dumps(data, sort_keys=True).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()[:16]
+
 class Settings:
     """Main settings manager class"""
     
@@ -149,6 +205,10 @@ class Settings:
         self.display_prefs = DisplayPreferences()
         self.counting_system = CountingSystem()
     
+    def rule_set(self) -> RuleSet:
+        """Get an immutable snapshot of the current game and shoe rules"""
+        return RuleSet.from_settings(self.game_rules, self.shoe_config)
+    
     def get_dealer_stand_value(self) -> int:
         """Get the dealer stand value based on soft 17 rule"""
         return self.game_rules.dealer_stand_value
@@ -174,6 +234,8 @@ class Settings:
             errors.append("Default bet must be at least minimum bet")
         if self.betting_limits.default_bet > self.betting_limits.max_bet:
             errors.append("Default bet cannot exceed maximum bet")
+        if self.betting_limits.betting_strategy == "optimal" and not self.betting_limits.optimal_ramp:
+            errors.append("Optimal betting needs a ramp (run python3 -m bet_optimizer --apply)")
             
         # Validate shoe configuration
         if self.shoe_config.num_decks < 1 or self.shoe_config.num_decks > 8:
@@ -4,6 +4,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Callable, Optional
 from settings import Settings
+from counting_systems import system_choices
 
 class SettingsDialog:
     """Settings configuration dialog window"""
@@ -213,7 +214,7 @@ class SettingsDialog:
         ttk.Label(strategy_frame, text="Betting strategy:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
         self.betting_strategy_var = tk.StringVar(value=self.temp_settings.betting_limits.betting_strategy)
         strategy_combo = ttk.Combobox(strategy_frame, textvariable=self.betting_strategy_var,
-                                     values=["flat", "spread", "kelly"], state="readonly", width=15)
+                                     values=["flat", "spread", "kelly", "optimal"], state="readonly", width=15)
         strategy_combo.grid(row=0, column=1, padx=5, pady=5)
         strategy_combo.bind("<<ComboboxSelected>>", self._on_strategy_change)
         
@@ -251,6 +252,24 @@ class SettingsDialog:
         kelly_spin.grid(row=0, column=1, padx=5)
         ttk.Label(self.kelly_frame, text="(0.25 = 25% Kelly)").grid(row=0, column=2, padx=5)
         
+        # Optimized ramp options
+        self.optimal_frame = ttk.Frame(strategy_frame)
+        self.optimal_frame.grid(row=3, column=0, columnspan=3, sticky="ew", pady=10)
+        
+        ttk.Label(self.optimal_frame, text="Max spread:").grid(row=0, column=0, sticky="w", padx=5)
+        self.optimal_spread_var = tk.DoubleVar(value=self.temp_settings.betting_limits.optimal_max_spread)
+        optimal_spin = ttk.Spinbox(self.optimal_frame, from_=2.0, to=50.0, increment=1.0,
+                                  textvariable=self.optimal_spread_var, width=8)
+        optimal_spin.grid(row=0, column=1, padx=5)
+        
+        ramp = self.temp_settings.betting_limits.optimal_ramp
+        if ramp:
+            ramp_text = ", ".join(f"TC {count:+.0f}: ${bet:.0f}" for count, bet in ramp)
+        else:
+            ramp_text = "Not computed yet - run: python3 -m bet_optimizer --apply"
+        ttk.Label(self.optimal_frame, text=ramp_text, wraplength=350).grid(
+            row=1, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        
         # Initially hide strategy-specific options
         self._on_strategy_change()
         
@@ -435,9 +454,10 @@ class SettingsDialog:
         
         ttk.Label(system_frame, text="Card counting system:").pack(anchor="w")
         self.count_system_var = tk.StringVar(value=self.temp_settings.counting_system.system)
-        ttk.Radiobutton(system_frame, text="Hi-Lo", variable=self.count_system_var,
-                       value="hi-lo").pack(anchor="w", padx=20)
-        ttk.Label(system_frame, text="(More systems coming soon)", 
+        for key, name in system_choices():
+            ttk.Radiobutton(system_frame, text=name, variable=self.count_system_var,
+                           value=key).pack(anchor="w", padx=20)
+        ttk.Label(system_frame, text="(Changing system starts a new shoe)", 
                  font=("Arial", 9, "italic")).pack(anchor="w", padx=40)
         
         # Display Options
@@ -477,12 +497,19 @@ class SettingsDialog:
         if strategy == "spread":
             self.spread_frame.grid()
             self.kelly_frame.grid_remove()
+            self.optimal_frame.grid_remove()
         elif strategy == "kelly":
             self.spread_frame.grid_remove()
             self.kelly_frame.grid()
+            self.optimal_frame.grid_remove()
+        elif strategy == "optimal":
+            self.spread_frame.grid_remove()
+            self.kelly_frame.grid_remove()
+            self.optimal_frame.grid()
         else:  # flat
             self.spread_frame.grid_remove()
             self.kelly_frame.grid_remove()
+            self.optimal_frame.grid_remove()
     
     def _save_settings(self):
         """Save settings and close dialog"""
@@ -535,6 +562,7 @@ class SettingsDialog:
         self.temp_settings.betting_limits.spread_max_multiplier = self.spread_max_var.get()
         self.temp_settings.betting_limits.kelly_fraction = self.kelly_fraction_var.get()
         self.temp_settings.betting_limits.spread_start_count = self.spread_start_var.get()
+        self.temp_settings.betting_limits.optimal_max_spread = self.optimal_spread_var.get()
         
         # Shoe Configuration
         self.temp_settings.shoe_config.num_decks = self.num_decks_var.get()
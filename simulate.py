@@ -0,0 +1,463 @@
+"""Headless batch simulator - plays rounds through the game engine without any UI
+
+Run from the command line:
+    python -m simulate --rounds 1000000
+    python -m simulate --rounds 10000000 --workers 8 --seed 42
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from game_engine import ArrayShoe, GameState, Hand
+from card_counting import CardCounter
+from counting_systems import CountingSystem, get_counting_system
+from basic_strategy import BasicStrategy
+from ev_calculator import EVCalculator, HouseEdgeModel, RunningMoments, TrueCountAggregator
+from betting_strategy import BettingStrategyCalculator
+from house_edge import load_or_compute_house_edge
+from index_plays import IndexTable
+from settings import RuleSet, settings
+from strategy_generator import StrategyCharts
+
+# Rounds per independently seeded chunk in parallel runs. Results depend on the
+# seed and chunk size only, never on the number of worker processes.
+DEFAULT_CHUNK_ROUNDS = 50000
+
+
+@dataclass
+class SimulationResult:
+    """Aggregated results of a simulation run"""
+    rounds: int = 0
+    hands: int = 0  # Player hands including split hands
+    total_initial_bet: float = 0.0
+    total_wagered: float = 0.0
+    net_result: float = 0.0
+    moments: RunningMoments = field(default_factory=RunningMoments)  # Per-round results (dollars)
+    unit_moments: RunningMoments = field(default_factory=RunningMoments)  # In initial-bet units
+    starting_bankroll: float = 0.0
+    min_bankroll: float = 0.0
+    elapsed: float = 0.0
+    bankroll_path: List[Tuple[int, float]] = field(default_factory=list)  # (round, bankroll)
+    # Per-round totals keyed by floor(true count) at the time of the bet
+    by_true_count: TrueCountAggregator = field(default_factory=TrueCountAggregator)
+
+    @property
+    def final_bankroll(self) -> float:
+        return self.starting_bankroll + self.net_result
+
+    def hands_per_second(self) -> float:
+        """Hands played (splits included) per second of wall-clock time"""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.hands / self.elapsed
+
+    def ev_per_round(self) -> float:
+        """Average result per round in dollars"""
+        if self.rounds == 0:
+            return 0.0
+        return self.net_result / self.rounds
+
+    def ev_percentage(self) -> float:
+        """Net result as a percentage of initial bets"""
+        if self.total_initial_bet == 0:
+            return 0.0
+        return (self.net_result / self.total_initial_bet) * 100
+
+    def std_dev_per_round(self) -> float:
+        """Standard deviation of the per-round result in dollars"""
+        return self.moments.std_dev()
+
+    def std_dev_units(self) -> float:
+        """Standard deviation of the per-round result in initial-bet units"""
+        return self.unit_moments.std_dev()
+
+    def win_rate_per_100(self) -> float:
+        """Expected dollars won per 100 rounds"""
+        return self.moments.win_rate_per_100()
+
+    def n0(self) -> float:
+        """Rounds until expected profit equals one standard deviation"""
+        return self.moments.n0()
+
+    def score(self) -> float:
+        """SCORE of the betting strategy (scale free, $10,000 Kelly bankroll)"""
+        return self.moments.score()
+
+    def desirability_index(self) -> float:
+        """1000 * EV / SD per round"""
+        return self.moments.desirability_index()
+
+    def merge(self, other: 'SimulationResult') -> 'SimulationResult':
+        """
+        Append another run's statistics as if its rounds followed this run's
+        Bankroll figures from the other run are shifted to continue from this
+        run's final bankroll.
+        """
+        offset = self.final_bankroll - other.starting_bankroll
+        base_round = self.rounds
+
+        self.min_bankroll = min(self.min_bankroll, other.min_bankroll + offset)
+        self.bankroll_path.extend((base_round + round_number, value + offset)
+                                  for round_number, value in other.bankroll_path
+                                  if round_number > 0)
+
+        self.rounds += other.rounds
+        self.hands += other.hands
+        self.total_initial_bet += other.total_initial_bet
+        self.total_wagered += other.total_wagered
+        self.net_result += other.net_result
+        self.moments.merge(other.moments)
+        self.unit_moments.merge(other.unit_moments)
+        self.elapsed += other.elapsed
+
+        self.by_true_count.merge(other.by_true_count)
+        return self
+
+    def get_summary(self) -> Dict:
+        """Get complete simulation summary"""
+        return {
+            'rounds': self.rounds,
+            'hands': self.hands,
+            'elapsed': self.elapsed,
+            'hands_per_second': self.hands_per_second(),
+            'total_wagered': self.total_wagered,
+            'net_result': self.net_result,
+            'ev_per_round': self.ev_per_round(),
+            'ev_percentage': self.ev_percentage(),
+            'std_dev_per_round': self.std_dev_per_round(),
+            'std_dev_units': self.std_dev_units(),
+            'win_rate_per_100': self.win_rate_per_100(),
+            'n0': self.n0(),
+            'score': self.score(),
+            'desirability_index': self.desirability_index(),
+            'starting_bankroll': self.starting_bankroll,
+            'final_bankroll': self.final_bankroll,
+            'min_bankroll': self.min_bankroll
+        }
+
+
+class Simulator:
+    """Drives GameState in a tight loop using basic strategy and the configured betting strategy"""
+
+    def __init__(self, bankroll: Optional[float] = None, path_interval: int = 1000,
+                 rules: Optional[RuleSet] = None, rng: Optional[random.Random] = None,
+                 index_table: Optional[IndexTable] = None,
+                 system: Optional[CountingSystem] = None,
+                 charts: Optional[StrategyCharts] = None,
+                 house_edge: Optional[HouseEdgeModel] = None):
+        self.rules = rules if rules is not None else settings.rule_set()
+        self.game_state = GameState(shoe=ArrayShoe(rules=self.rules, rng=rng), rules=self.rules)
+        self.counter = CardCounter(system, num_decks=self.rules.num_decks)
+        self.strategy = BasicStrategy()
+        if charts is not None:  # Generated for the rules; the typed charts otherwise
+            self.strategy.use_charts(charts)
+        self.strategy.index_table = index_table  # Deviations from the count, if given
+        # Kelly bets are sized from the edge solved for these rules, loaded if not given
+        if house_edge is None and settings.betting_limits.betting_strategy == "kelly":
+            house_edge = load_or_compute_house_edge(self.counter.system, self.rules, charts)
+        self.ev_calculator = EVCalculator(house_edge)
+        self.betting_calculator = BettingStrategyCalculator(self.ev_calculator)
+
+        self.starting_bankroll = float(bankroll if bankroll is not None
+                                       else settings.betting_limits.default_bankroll)
+        self.bankroll = self.starting_bankroll
+        self.path_interval = max(1, path_interval)
+        self.round_true_count = 0.0  # True count the current round was bet at
+
+        # The table bankroll is left unbounded so double/split affordability
+        # checks never alter strategy; the simulated bankroll is tracked separately.
+        self.game_state.bankroll = float('inf')
+
+    def run(self, rounds: int) -> SimulationResult:
+        """Play the given number of rounds and return aggregated results"""
+        result = SimulationResult(starting_bankroll=self.bankroll,
+                                  min_bankroll=self.bankroll)
+        result.bankroll_path.append((0, self.bankroll))
+
+        start = time.perf_counter()
+        for i in range(1, rounds + 1):
+            bet, profit, hands = self.play_round()
+            self.bankroll += profit
+
+            units = profit / bet
+            result.rounds += 1
+            result.hands += hands
+            result.total_initial_bet += bet
+            result.net_result += profit
+            result.moments.add(profit)
+            result.unit_moments.add(units)
+            if self.bankroll < result.min_bankroll:
+                result.min_bankroll = self.bankroll
+            result.by_true_count.add(self.round_true_count, bet, profit)
+
+            if i % self.path_interval == 0:
+                result.bankroll_path.append((i, self.bankroll))
+        result.elapsed = time.perf_counter() - start
+
+        if rounds % self.path_interval != 0:
+            result.bankroll_path.append((rounds, self.bankroll))
+        result.total_wagered = self.game_state.total_wagered
+        return result
+
+    def play_round(self):
+        """Play a single round. Returns (initial_bet, profit, hands_played)"""
+        game = self.game_state
+
+        if game.shoe.needs_shuffle:
+            game.shoe.shuffle()
+            self.counter.reset()
+
+        bet = self._get_bet()
+        game.start_new_hand(bet)
+        profit = self.play_hands()
+
+        # Count every card revealed this round
+        for hand in game.player_hands:
+            self.counter.update_count_multiple(hand.cards)
+        self.counter.update_count_multiple(game.dealer_hand.cards)
+
+        game.phase = "betting"
+        return bet, profit, len(game.player_hands)
+
+    def play_hands(self) -> float:
+        """Play the dealt hands out with basic strategy and settle; returns the profit"""
+        game = self.game_state
+        upcard = game.dealer_hand.cards[0]
+        while game.phase == "playing":
+            hand = game.player_hand
+            action = self.strategy.get_optimal_action(
+                hand, upcard, self._can_double(hand), self._can_split(hand), game,
+                self._playing_true_count()
+            )
+            self._apply_action(action, hand)
+
+        _, profit = game.complete_hand()
+        return profit
+
+    def _get_bet(self) -> float:
+        """Get the bet for the next round from the configured betting strategy"""
+        limits = settings.betting_limits
+        true_count = self.counter.get_betting_true_count(self.game_state.shoe.cards_remaining())
+        self.round_true_count = true_count
+        bet = self.betting_calculator.calculate_bet_size(
+            max(self.bankroll, 0.0), true_count, limits.default_bet
+        )
+        return max(limits.min_bet, min(limits.max_bet, bet))
+
+    def _playing_true_count(self) -> Optional[float]:
+        """True count including the cards on the table, when index plays are in use"""
+        if self.strategy.index_table is None:
+            return None
+        game = self.game_state
+        visible = [card for hand in game.player_hands for card in hand.cards]
+        visible.append(game.dealer_hand.cards[0])
+        return self.counter.get_true_count_with(visible, game.shoe.cards_remaining())
+
+    def _is_split_ace(self, hand: Hand) -> bool:
+        """Check if hand is the result of splitting aces"""
+        return len(self.game_state.player_hands) > 1 and hand.cards[0].rank == 'A'
+
+    def _can_double(self, hand: Hand) -> bool:
+        """Apply the doubling rules the UI normally enforces"""
+        rules = self.rules
+        if not hand.can_double():
+            return False
+        if len(self.game_state.player_hands) > 1 and not rules.double_after_split:
+            return False
+        if not rules.double_on_any_two and hand.value not in [9, 10, 11]:
+            return False
+        return True
+
+    def _can_split(self, hand: Hand) -> bool:
+        """Apply the splitting rules the UI normally enforces"""
+        if not self.game_state.can_split_current_hand():
+            return False
+        if self._is_split_ace(hand) and not self.rules.resplit_aces:
+            return False
+        return True
+
+    def _apply_action(self, action: str, hand: Hand):
+        """Execute a strategy action against the game state"""
+        game = self.game_state
+
+        # Split aces receive one card only
+        if self._is_split_ace(hand) and self.rules.split_aces_one_card and action != 'P':
+            game.player_stand()
+            return
+
+        if action == 'P':
+            if game.player_split():
+                return
+            action = self.strategy.get_optimal_action(
+                hand, game.dealer_hand.cards[0], self._can_double(hand), False, game,
+                self._playing_true_count()
+            )
+
+        if action in ('D', 'Ds') and self._can_double(hand) and game.player_double():
+            return
+
+        if action in ('H', 'D'):
+            game.player_hit()
+        else:
+            game.player_stand()
+
+
+def chunk_rng(seed: int, chunk_index: int) -> random.Random:
+    """Independent, reproducible RNG stream for one chunk of a seeded run"""
+    return random.Random(f"blackjack-sim:{seed}:{chunk_index}")
+
+
+def _run_chunk(job: Tuple) -> SimulationResult:
+    """Worker entry point: simulate one seeded chunk with its own game state and counter"""
+    (seed, chunk_index, rounds, bankroll, path_interval, rules, betting_limits, index_table,
+     system, charts, house_edge) = job
+    # Workers may not share the parent's settings object, so apply the snapshot
+    settings.betting_limits = betting_limits
+    simulator = Simulator(bankroll=bankroll, path_interval=path_interval, rules=rules,
+                          rng=chunk_rng(seed, chunk_index), index_table=index_table,
+                          system=system, charts=charts, house_edge=house_edge)
+    return simulator.run(rounds)
+
+
+def run_parallel(rounds: int, workers: Optional[int] = None, seed: int = 0,
+                 chunk_rounds: int = DEFAULT_CHUNK_ROUNDS, bankroll: Optional[float] = None,
+                 path_interval: int = 1000, rules: Optional[RuleSet] = None,
+                 index_table: Optional[IndexTable] = None,
+                 system: Optional[CountingSystem] = None,
+                 charts: Optional[StrategyCharts] = None) -> SimulationResult:
+    """
+    Shard rounds into fixed-size seeded chunks and simulate them on a process pool
+    Each chunk starts from a fresh shoe and the starting bankroll; chunk results
+    are merged in chunk order, so a given seed and chunk size reproduce the same
+    statistics bit for bit with any number of workers. The counting system,
+    betting limits and Kelly house edge model are resolved here and sent with
+    each chunk, since a worker process need not see this process's settings.
+    """
+    if rules is None:
+        rules = settings.rule_set()
+    if bankroll is None:
+        bankroll = settings.betting_limits.default_bankroll
+    if system is None:
+        system = get_counting_system()
+    house_edge = None
+    if settings.betting_limits.betting_strategy == "kelly":
+        house_edge = load_or_compute_house_edge(system, rules, charts)
+    workers = workers or os.cpu_count() or 1
+    chunk_rounds = max(1, chunk_rounds)
+
+    jobs = []
+    for chunk_index, first_round in enumerate(range(0, rounds, chunk_rounds)):
+        jobs.append((seed, chunk_index, min(chunk_rounds, rounds - first_round),
+                     bankroll, path_interval, rules, settings.betting_limits, index_table,
+                     system, charts, house_edge))
+
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        chunks = [_run_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            chunks = list(pool.map(_run_chunk, jobs))
+
+    result = SimulationResult(starting_bankroll=float(bankroll), min_bankroll=float(bankroll))
+    result.bankroll_path.append((0, float(bankroll)))
+    for chunk in chunks:
+        result.merge(chunk)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def format_summary(result: SimulationResult) -> str:
+    """Format simulation results for console output"""
+    lines = [
+        "=== Simulation Results ===",
+        f"Rounds:            {result.rounds:,}",
+        f"Hands (w/ splits): {result.hands:,}",
+        f"Elapsed:           {result.elapsed:.2f}s",
+        f"Hands/sec:         {result.hands_per_second():,.0f}",
+        f"Total wagered:     ${result.total_wagered:,.2f}",
+        f"Net result:        ${result.net_result:+,.2f}",
+        f"EV per round:      ${result.ev_per_round():+.4f}",
+        f"EV:                {result.ev_percentage():+.3f}% of initial bets",
+        f"SD per round:      ${result.std_dev_per_round():.2f} ({result.std_dev_units():.3f} units)",
+        f"Win rate:          ${result.win_rate_per_100():+.2f} per 100 rounds",
+        f"N0:                {result.n0():,.0f} rounds",
+        f"SCORE / DI:        {result.score():.2f} / {result.desirability_index():+.2f}",
+        f"Bankroll:          ${result.starting_bankroll:,.2f} -> ${result.final_bankroll:,.2f} "
+        f"(low ${result.min_bankroll:,.2f})",
+    ]
+    return "\n".join(lines)
+
+
+def format_count_table(by_true_count: TrueCountAggregator) -> str:
+    """Format per-true-count results for console output"""
+    lines = ["=== Results by True Count ===",
+             f"{'TC':>6} {'Rounds':>12} {'Wagered':>14} {'EV %':>8} {'SD $':>9}"]
+    for row in by_true_count.get_summary():
+        lines.append(f"{row['true_count']:>+6.1f} {row['hands']:>12,} {row['wagered']:>14,.0f} "
+                     f"{row['ev_percentage']:>+8.2f} {row['std_dev']:>9.2f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Headless blackjack simulator")
+    parser.add_argument('--rounds', type=int, default=100000,
+                        help="Number of rounds to simulate")
+    parser.add_argument('--bankroll', type=float, default=None,
+                        help="Starting bankroll (default: settings default bankroll)")
+    parser.add_argument('--betting', choices=['flat', 'spread', 'kelly'], default=None,
+                        help="Override the betting strategy from settings")
+    parser.add_argument('--path-interval', type=int, default=1000,
+                        help="Record the bankroll every N rounds")
+    parser.add_argument('--path', action='store_true',
+                        help="Print the recorded bankroll path")
+    parser.add_argument('--by-count', action='store_true',
+                        help="Print EV and SD for each true count")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Shard rounds across N processes (0 = all cores)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed for a reproducible run (implies chunked simulation)")
+    parser.add_argument('--chunk-rounds', type=int, default=DEFAULT_CHUNK_ROUNDS,
+                        help="Rounds per seeded chunk in parallel runs")
+    parser.add_argument('--index-plays', action='store_true',
+                        help="Deviate from basic strategy by the true count (see index_plays)")
+    parser.add_argument('--typed-charts', action='store_true',
+                        help="Play the typed charts instead of ones generated for the rules")
+    args = parser.parse_args(argv)
+
+    if args.betting:
+        settings.betting_limits.betting_strategy = args.betting
+    charts = None if args.typed_charts else StrategyCharts.load_or_generate()
+    # Deviations are measured from the charts they are played with
+    index_table = IndexTable.load_or_generate(charts=charts) if args.index_plays else None
+
+    if args.workers is not None or args.seed is not None:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        result = run_parallel(args.rounds, workers=args.workers or None, seed=seed,
+                              chunk_rounds=args.chunk_rounds, bankroll=args.bankroll,
+                              path_interval=args.path_interval, index_table=index_table,
+                              charts=charts)
+    else:
+        simulator = Simulator(bankroll=args.bankroll, path_interval=args.path_interval,
+                              index_table=index_table, charts=charts)
+        result = simulator.run(args.rounds)
+
+    print(format_summary(result))
+    if args.by_count:
+        print()
+        print(format_count_table(result.by_true_count))
+    if args.path:
+        print("\nBankroll path:")
+        for round_number, value in result.bankroll_path:
+            print(f"  {round_number:>10,}  ${value:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Rule-aware basic strategy charts solved with the exact EV calculator
+
+Each chart row is a hand total (or pair) against a dealer upcard. Its action
+maximises the EV averaged over every two-card hand making that total,
+weighted by how likely the hand is off a full shoe once the upcard is out.
+Action EVs come from exact_ev, so dealer H17/S17, the deck count, doubling
+and split rules all feed into the result.
+
+Charts keep the layout of the hand-typed ones in basic_strategy (hard 5-21,
+soft 12-21, pairs by rank label) and are cached as JSON keyed by the rule
+hash, so a rule set is only ever solved once.
+
+    python -m strategy_generator
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import CACHE_DIR
+from dealer_probabilities import shoe_composition
+from exact_ev import ExactEVCalculator, remove_cards
+from hand_state import ACE_INDEX, NUM_RANKS, STATE_VALUE, state_from_ranks
+from settings import RuleSet, settings
+
+HARD_TOTALS = range(5, 22)
+SOFT_TOTALS = range(12, 22)
+PAIR_LABELS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'A']
+UPCARD_LABELS = PAIR_LABELS
+
+
+def charts_path(rules: RuleSet, cache_dir: str = CACHE_DIR) -> str:
+    """Cache file for a rule set"""
+    return os.path.join(cache_dir, f"strategy_{rules.cache_key()}.json")
+
+
+def charts_tag(charts: Optional['StrategyCharts']) -> str:
+    """Cache file tag for results solved against some charts (None for the typed ones)"""
+    return "typed" if charts is None else f"gen{charts.rules_key}"
+
+
+def _two_card_hands() -> Tuple[Dict[int, List[Tuple[int, int]]], Dict[int, List[Tuple[int, int]]]]:
+    """Two-card rank pairs making each hard and soft total"""
+    hard: Dict[int, List[Tuple[int, int]]] = {}
+    soft: Dict[int, List[Tuple[int, int]]] = {}
+    for first in range(NUM_RANKS):
+        for second in range(first, NUM_RANKS):
+            value = STATE_VALUE[state_from_ranks((first, second))]
+            if second == ACE_INDEX:
+                # A,A is soft 12; it only reaches the chart when it can't be split
+                soft.setdefault(value, []).append((first, second))
+            else:
+                hard.setdefault(value, []).append((first, second))
+    return hard, soft
+
+
+HARD_HANDS, SOFT_HANDS = _two_card_hands()
+
+
+@dataclass
+class StrategyCharts:
+    """Hard, soft and pair charts for one rule set, in BasicStrategy's layout"""
+    rules_key: str
+    num_decks: int
+    hard: Dict[int, List[str]] = field(default_factory=dict)
+    soft: Dict[int, List[str]] = field(default_factory=dict)
+    pairs: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def generate(cls, rules: Optional[RuleSet] = None,
+                 calculator: Optional[ExactEVCalculator] = None) -> 'StrategyCharts':
+        """Solve every chart cell for a rule set (default: current settings)"""
+        rules = rules if rules is not None else settings.rule_set()
+        calculator = calculator if calculator is not None else ExactEVCalculator(cache_size=16)
+        solver = _ChartSolver(rules, calculator)
+
+        charts = cls(rules.cache_key(), rules.num_decks)
+        for total in HARD_TOTALS:
+            charts.hard[total] = [solver.total_action(HARD_HANDS.get(total, []), up)
+                                  for up in range(NUM_RANKS)]
+        for total in SOFT_TOTALS:
+            charts.soft[total] = [solver.total_action(SOFT_HANDS.get(total, []), up)
+                                  for up in range(NUM_RANKS)]
+        for rank, label in enumerate(PAIR_LABELS):
+            charts.pairs[label] = [solver.pair_action(rank, up) for up in range(NUM_RANKS)]
+        # Face cards share the ten row
+        for label in ('J', 'Q', 'K'):
+            charts.pairs[label] = list(charts.pairs['10'])
+        return charts
+
+    @classmethod
+    def load_or_generate(cls, rules: Optional[RuleSet] = None,
+                         cache_dir: Optional[str] = CACHE_DIR) -> 'StrategyCharts':
+        """Load the cached charts for these rules, generating and saving them if missing"""
+        rules = rules if rules is not None else settings.rule_set()
+        path = charts_path(rules, cache_dir) if cache_dir else None
+        if path and os.path.exists(path):
+            try:
+                charts = cls.load(path)
+                if charts.rules_key == rules.cache_key():
+                    return charts
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable strategy charts {path}: {e}")
+
+        charts = cls.generate(rules)
+        if path:
+            charts.save(path)
+        return charts
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            'rules_key': self.rules_key,
+            'num_decks': self.num_decks,
+            'hard': self.hard,
+            'soft': self.soft,
+            'pairs': self.pairs
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'StrategyCharts':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        # JSON object keys are strings; totals go back to ints
+        return cls(data['rules_key'], data['num_decks'],
+                   {int(total): row for total, row in data['hard'].items()},
+                   {int(total): row for total, row in data['soft'].items()},
+                   dict(data['pairs']))
+
+    def differences(self, other: 'StrategyCharts') -> List[str]:
+        """Cells where two sets of charts disagree, e.g. "H12 v 3: H -> S" """
+        changes = []
+        for prefix, mine, theirs in (("H", self.hard, other.hard), ("S", self.soft, other.soft),
+                                     ("P", self.pairs, other.pairs)):
+            for key, row in mine.items():
+                for up, (action, other_action) in enumerate(zip(row, theirs.get(key, row))):
+                    if action != other_action:
+                        changes.append(f"{prefix}{key} v {UPCARD_LABELS[up]}: "
+                                       f"{action} -> {other_action}")
+        return changes
+
+
+class _ChartSolver:
+    """Probability-weighted action EVs for chart cells off a full shoe"""
+
+    def __init__(self, rules: RuleSet, calculator: ExactEVCalculator):
+        self.rules = rules
+        self.calculator = calculator
+        self.shoe = shoe_composition(rules.num_decks)
+
+    def _weight(self, ranks: Tuple[int, int], counts: Tuple[int, ...]) -> float:
+        """Probability of being dealt these two ranks from the unseen cards"""
+        total = sum(counts)
+        first, second = ranks
+        if first == second:
+            return counts[first] * (counts[first] - 1) / (total * (total - 1))
+        return 2 * counts[first] * counts[second] / (total * (total - 1))
+
+    def _evs(self, ranks: Tuple[int, int], upcard: int, can_split: bool) -> Dict[str, float]:
+        counts = remove_cards(self.shoe, ranks + (upcard,))
+        return self.calculator.action_evs(ranks, upcard, counts, can_split=can_split,
+                                          rules=self.rules)
+
+    def total_action(self, hands: List[Tuple[int, int]], upcard: int) -> str:
+        """Best chart code for a total, averaged over its two-card hands"""
+        unseen = remove_cards(self.shoe, (upcard,))
+        weighted: Dict[str, float] = {}
+        weights: Dict[str, float] = {}
+        for ranks in hands:
+            weight = self._weight(ranks, unseen)
+            if weight <= 0:
+                continue
+            for action, ev in self._evs(ranks, upcard, False).items():
+                weighted[action] = weighted.get(action, 0.0) + weight * ev
+                weights[action] = weights.get(action, 0.0) + weight
+        if not weighted or STATE_VALUE[state_from_ranks(hands[0])] == 21:
+            return 'S'
+        return _chart_code({action: weighted[action] / weights[action] for action in weighted})
+
+    def pair_action(self, rank: int, upcard: int) -> str:
+        """Chart code for a pair: 'P' when splitting beats playing it as a total"""
+        evs = self._evs((rank, rank), upcard, self.rules.max_splits > 0)
+        split = evs.pop('split', None)
+        if split is not None and split > max(evs.values()):
+            return 'P'
+        return _chart_code(evs)
+
+
+def _chart_code(evs: Dict[str, float]) -> str:
+    """Chart code for action EVs: D/Ds say what to do when doubling isn't allowed"""
+    fallback = 'S' if evs['stand'] >= evs.get('hit', float('-inf')) else 'H'
+    if evs.get('double', float('-inf')) > max(evs['stand'], evs.get('hit', float('-inf'))):
+        return 'Ds' if fallback == 'S' else 'D'
+    return fallback
+
+
+def format_charts(charts: StrategyCharts) -> str:
+    """Format the charts for console output"""
+    header = "        " + " ".join(f"{label:>3}" for label in UPCARD_LABELS)
+    lines = [f"=== Basic Strategy ({charts.num_decks} decks, rules {charts.rules_key}) ==="]
+    for title, rows, prefix in (("Hard", charts.hard, "H"), ("Soft", charts.soft, "S"),
+                                ("Pairs", {label: charts.pairs[label] for label in PAIR_LABELS},
+                                 "P")):
+        lines.append(f"\n{title}")
+        lines.append(header)
+        for key, row in rows.items():
+            lines.append(f"{prefix}{key:<6} " + " ".join(f"{action:>3}" for action in row))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Generate basic strategy charts for the "
+                                                 "current rules")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Solve again even if cached charts exist")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rules = settings.rule_set()
+    if args.no_cache:
+        charts = StrategyCharts.generate(rules)
+        charts.save(charts_path(rules))
+    else:
+        charts = StrategyCharts.load_or_generate(rules)
+    print(format_charts(charts))
+    print(f"\nCharts ready in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test the array-backed shoe"""
+
+import sys
+from collections import Counter
+from game_engine import ArrayShoe, GameState, RANK_INDEX, Shoe
+from settings import settings
+
+def test_array_shoe_contents():
+    """Test the shoe holds exactly num_decks full decks"""
+    print("=== Testing Array Shoe Contents ===")
+
+    try:
+        shoe = ArrayShoe(num_decks=2)
+        burned = 1 if settings.shoe_config.burn_card else 0
+
+        assert shoe.cards_remaining() == 104 - burned
+        assert abs(shoe.decks_remaining() - (104 - burned) / 52) < 1e-9
+        assert len(shoe.cards) == shoe.cards_remaining()
+
+        # Each card appears twice, except possibly the burn card
+        counts = Counter(str(card) for card in shoe.cards)
+        assert len(counts) == 52
+        assert sum(counts.values()) == 104 - burned
+        assert max(counts.values()) == 2
+        print("✓ Shoe contains 2 full decks")
+
+        # The burn card is unseen, so it stays in the composition
+        assert shoe.rank_counts == [8, 8, 8, 8, 8, 8, 8, 8, 32, 8]
+        assert shoe.composition() == tuple(shoe.rank_counts)
+        print("✓ Rank composition starts full")
+        return True
+    except Exception as e:
+        print(f"✗ Array shoe contents test failed: {e}")
+        return False
+
+def test_array_shoe_dealing():
+    """Test dealing updates the cursor, composition and penetration"""
+    print("\n=== Testing Array Shoe Dealing ===")
+
+    try:
+        shoe = ArrayShoe(num_decks=1)
+        expected = list(shoe.rank_counts)
+        remaining = shoe.cards_remaining()
+        upcoming = shoe.cards[:5]
+
+        for i in range(5):
+            card = shoe.deal_card()
+            assert card is upcoming[i]
+            expected[RANK_INDEX[card.rank]] -= 1
+            assert shoe.rank_counts == expected
+        assert shoe.cards_remaining() == remaining - 5
+        assert shoe.dealt_count == 5
+        print("✓ Dealing advances cursor and updates composition")
+
+        while shoe.deal_card() is not None:
+            pass
+        assert shoe.cards_remaining() == 0
+        assert shoe.needs_shuffle
+        assert shoe.deal_card() is None
+        print("✓ Empty shoe returns None and needs shuffle")
+
+        shoe.shuffle()
+        assert not shoe.needs_shuffle
+        assert shoe.dealt_count == 0
+        assert sum(shoe.rank_counts) == 52
+        print("✓ Shuffle resets the shoe")
+        return True
+    except Exception as e:
+        print(f"✗ Array shoe dealing test failed: {e}")
+        return False
+
+def test_array_shoe_in_game():
+    """Test GameState plays with an injected array shoe"""
+    print("\n=== Testing Array Shoe In Game ===")
+
+    try:
+        game = GameState(shoe=ArrayShoe())
+        assert isinstance(game.shoe, ArrayShoe)
+        assert isinstance(GameState().shoe, Shoe)
+
+        game.start_new_hand(25)
+        assert len(game.player_hand.cards) == 2
+        assert len(game.dealer_hand.cards) == 2
+        assert game.shoe.dealt_count == 4
+        print("✓ GameState deals from array shoe")
+        return True
+    except Exception as e:
+        print(f"✗ Array shoe game test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Array Shoe Test ===\n")
+
+    tests = [
+        test_array_shoe_contents,
+        test_array_shoe_dealing,
+        test_array_shoe_in_game
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Array Shoe Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
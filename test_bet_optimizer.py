@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Test the bet ramp optimizer and the optimal betting strategy"""
+
+import os
+import sys
+import tempfile
+from betting_strategy import BettingStrategyCalculator
+from ev_calculator import EVCalculator
+from settings import BettingLimits, settings
+
+try:
+    import numpy as np
+    from bet_optimizer import BetOptimizer, CountTable, apply_to_settings
+    from vector_sim import table_ramp
+except ImportError:
+    np = None
+
+def _table():
+    # Edge rises ~0.5% per count from -0.5% at zero; most rounds near zero
+    counts = np.arange(-3.0, 5.0)
+    frequency = np.array([0.05, 0.1, 0.2, 0.3, 0.2, 0.1, 0.04, 0.01])
+    mean = -0.005 + 0.005 * counts
+    second = np.full(len(counts), 1.3)
+    return CountTable(counts, frequency, mean, second, rounds=10 ** 9)
+
+def test_optimizer_beats_alternatives():
+    """Test the chosen ramp respects limits and beats other monotone ramps"""
+    print("=== Testing Ramp Search ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        limits = BettingLimits(min_bet=10, max_bet=500, bet_increment=10, default_bankroll=20000)
+        optimizer = BetOptimizer(_table(), limits, max_spread=8)
+        result = optimizer.optimize("score")
+        bets = np.array(result.bets)
+        assert bets.min() >= 10 and bets.max() <= 80
+        assert (np.diff(bets) >= 0).all()
+        assert bets[0] == 10 and bets[-1] == 80  # wong-style: min when negative, max when rich
+        print(f"✓ SCORE {result.score:.2f} with steps {result.steps()}")
+
+        rng = np.random.default_rng(0)
+        for _ in range(300):
+            candidate = np.sort(rng.choice(optimizer.levels, len(bets)))
+            assert optimizer.score(candidate) <= result.score + 1e-9
+        linear = np.clip(10 * (1 + 7 * (np.arange(-3.0, 5.0) - 1) / 4), 10, 80)
+        assert optimizer.score(linear) < result.score
+        print("✓ No random monotone ramp or linear spread does better")
+
+        safe = optimizer.optimize("ror")
+        assert safe.risk_of_ruin <= result.risk_of_ruin
+        assert safe.score <= result.score
+        print(f"✓ Min-RoR ramp: {safe.risk_of_ruin:.2%} vs {result.risk_of_ruin:.2%} at max SCORE")
+        return True
+    except Exception as e:
+        print(f"✗ Ramp search test failed: {e}")
+        return False
+
+def test_smoothing_and_cache():
+    """Test sparse/noisy buckets are pooled and tables round-trip through the cache"""
+    print("\n=== Testing Table Smoothing and Cache ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        noisy = CountTable(np.array([-6.0, -1.0, 0.0, 1.0, 2.0, 7.0]),
+                           np.array([0.00001, 0.3, 0.4, 0.2, 0.09998, 0.00001]),
+                           np.array([0.9, -0.01, 0.002, -0.004, 0.01, -1.0]),
+                           np.full(6, 1.3), rounds=10 ** 6)
+        smooth = noisy.smoothed(min_rounds=1000)
+        assert smooth.true_counts.tolist() == [-1.0, 0.0, 1.0, 2.0]
+        assert abs(smooth.frequency.sum() - 1) < 1e-12
+        assert (np.diff(smooth.mean) >= 0).all()
+        assert smooth.mean[1] == smooth.mean[2]  # 0 and +1 pooled by isotonic fit
+        print("✓ Sparse tails pooled, means forced to rise with the count")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            rules = settings.rule_set()
+            first = CountTable.load_or_simulate(rules, rounds=20000, cache_dir=cache_dir,
+                                                rng=np.random.default_rng(1))
+            files = os.listdir(cache_dir)
+            assert len(files) == 1 and rules.cache_key() in files[0]
+            again = CountTable.load_or_simulate(rules, rounds=20000, cache_dir=cache_dir)
+            assert again.rounds == first.rounds == 20000
+            assert np.allclose(again.mean, first.mean) and np.allclose(again.frequency, first.frequency)
+        print("✓ Count table cached per rule set")
+        return True
+    except Exception as e:
+        print(f"✗ Smoothing/cache test failed: {e}")
+        return False
+
+def test_optimal_strategy_setting():
+    """Test the ramp is written back and used by the optimal betting strategy"""
+    print("\n=== Testing Optimal Strategy ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    original = settings.betting_limits
+    try:
+        limits = BettingLimits(min_bet=10, max_bet=500, bet_increment=10)
+        result = BetOptimizer(_table(), limits, max_spread=8).optimize()
+        settings.betting_limits = limits
+        apply_to_settings(result)
+        assert limits.betting_strategy == "optimal" and limits.optimal_ramp == result.steps()
+        assert not settings.validate()
+
+        calculator = BettingStrategyCalculator(EVCalculator())
+        ramp = table_ramp(limits.optimal_ramp)
+        for true_count in (-5.0, -0.5, 0.0, 1.7, 3.2, 9.0):
+            expected = limits.optimal_bet(true_count)
+            assert calculator.calculate_bet_size(1000, true_count, 25) == expected
+            assert ramp(np.array([true_count]))[0] == expected
+        assert calculator.calculate_bet_size(1000, -5, 25) == 10
+        assert calculator.calculate_bet_size(1000, 9, 25) == 80
+        assert "Optimized" in calculator.get_strategy_description()
+        print(f"✓ Optimal strategy bets {limits.optimal_ramp}")
+
+        limits.optimal_ramp = []
+        assert settings.validate()  # optimal without a ramp is rejected
+        print("✓ Missing ramp flagged by validation")
+        return True
+    except Exception as e:
+        print(f"✗ Optimal strategy test failed: {e}")
+        return False
+    finally:
+        settings.betting_limits = original
+
+if __name__ == "__main__":
+    print("=== Bet Optimizer Test ===\n")
+
+    tests = [
+        test_optimizer_beats_alternatives,
+        test_smoothing_and_cache,
+        test_optimal_strategy_setting
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Bet Optimizer Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
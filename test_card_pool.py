@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test the shared canonical card pool"""
+
+import sys
+from game_engine import ArrayShoe, Card, CARD_POOL, Shoe
+
+def test_card_pool():
+    """Test the pool holds 52 unique precomputed cards"""
+    print("=== Testing Card Pool ===")
+
+    try:
+        assert len(CARD_POOL) == 52
+        assert len({str(card) for card in CARD_POOL}) == 52
+        for code, card in enumerate(CARD_POOL):
+            assert card.code == code
+        print("✓ 52 canonical cards indexed by code")
+
+        ace = Card.interned('A', 'spades')
+        assert ace is Card.interned('A', 'Spades')
+        assert ace.value == 11 and ace.rank_index == 9
+        king = Card.interned('K', 'hearts')
+        assert king.value == 10 and king.rank_index == 8
+        five = Card.interned('5', 'clubs')
+        assert five.value == 5 and five.rank_index == 3
+        print("✓ Values and rank indices precomputed")
+
+        assert not hasattr(ace, '__dict__')
+        print("✓ Cards use __slots__")
+
+        # Ad-hoc cards still work and match their canonical twin
+        loose = Card('5', 'Clubs')
+        assert loose.code == five.code and loose.value == five.value
+        print("✓ Direct construction still supported")
+        return True
+    except Exception as e:
+        print(f"✗ Card pool test failed: {e}")
+        return False
+
+def test_shoes_share_pool():
+    """Test shoes reference pooled cards instead of allocating"""
+    print("\n=== Testing Shoes Share Pool ===")
+
+    try:
+        pool_ids = {id(card) for card in CARD_POOL}
+
+        for shoe in (Shoe(num_decks=2), ArrayShoe(num_decks=2)):
+            shoe.shuffle()
+            assert all(id(card) in pool_ids for card in shoe.cards)
+            card = shoe.deal_card()
+            assert id(card) in pool_ids
+            print(f"✓ {shoe.__class__.__name__} deals pooled cards")
+        return True
+    except Exception as e:
+        print(f"✗ Shared pool test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Card Pool Test ===\n")
+
+    tests = [
+        test_card_pool,
+        test_shoes_share_pool
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Card Pool Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
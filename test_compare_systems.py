@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Test single-pass comparison of counting systems"""
+
+import sys
+import tempfile
+from card_counting import CardCounter
+from compare_systems import MultiSystemSimulator, format_comparison, tag_scale
+from counting_systems import get_counting_system
+from game_engine import CARD_POOL
+from index_plays import IndexTable
+from vector_sim import VectorSimulator, np, spread_ramp
+from settings import settings
+
+SYSTEMS = ['hi-lo', 'ko', 'hi-opt-1', 'wong-halves', 'red-7']
+
+def test_matches_single_runs():
+    """Test each system's results equal a separate run on the same seed"""
+    print("=== Testing Multi-System Results ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping system comparison")
+        return True
+
+    try:
+        ramp = spread_ramp(settings.betting_limits)
+        simulator = MultiSystemSimulator(SYSTEMS, lanes=500, bet_ramp=ramp,
+                                         rng=np.random.default_rng(11))
+        comparison = simulator.run(20000)
+        assert comparison.baseline == 'hi-lo'
+        for key, system_ramp in zip(SYSTEMS, simulator.bet_ramps):
+            single = VectorSimulator(lanes=500, bet_ramp=system_ramp,
+                                     system=get_counting_system(key),
+                                     rng=np.random.default_rng(11)).run(20000)
+            result = comparison.results[key]
+            assert result.rounds == single.rounds == 20000
+            assert abs(result.net_result - single.net_result) < 1e-6, key
+            assert abs(result.total_initial_bet - single.total_initial_bet) < 1e-6, key
+            assert result.by_true_count == single.by_true_count, key
+        print(f"✓ {len(SYSTEMS)} systems match separate runs over identical shoes")
+
+        # Wong Halves counts in half points, so its level 3 is a tag scale of 1.5
+        scales = [tag_scale(get_counting_system(key)) for key in ('hi-lo', 'zen', 'wong-halves')]
+        assert scales == [1.0, 2.0, 1.5]
+        zen = MultiSystemSimulator(['hi-lo', 'zen'], lanes=10, bet_ramp=ramp)
+        counts = np.array([-1.0, 2.0, 4.0, 8.0])
+        assert (zen.bet_ramps[1](counts) == ramp(counts / 2)).all()
+        print("✓ Each system bets the ramp on its own true count scale")
+        return True
+    except Exception as e:
+        print(f"✗ Multi-system results test failed: {e}")
+        return False
+
+def test_paired_differences():
+    """Test paired differences against the baseline and their reduced error"""
+    print("\n=== Testing Paired Differences ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping paired differences")
+        return True
+
+    try:
+        ramp = spread_ramp(settings.betting_limits)
+        simulator = MultiSystemSimulator(['hi-lo', 'ko', 'zen'], lanes=1000, bet_ramp=ramp,
+                                         rng=np.random.default_rng(2))
+        comparison = simulator.run(50000)
+        baseline = comparison.results['hi-lo']
+        assert comparison.difference_per_100('hi-lo') == 0.0
+        for key in ('ko', 'zen'):
+            result = comparison.results[key]
+            expected = (result.net_result - baseline.net_result) / result.rounds * 100
+            assert abs(comparison.difference_per_100(key) - expected) < 1e-6
+            assert comparison.difference_std_error(key) < comparison.independent_std_error(key)
+            assert abs(comparison.di_difference(key) - (result.desirability_index()
+                                                        - baseline.desirability_index())) < 1e-9
+        print("✓ Paired differences beat independent runs on standard error")
+
+        table = format_comparison(comparison)
+        assert "Zen Count" in table and "paired against Hi-Lo" in table and "dDI" in table
+        print("✓ Comparison table formats")
+
+        try:
+            MultiSystemSimulator(['hi-lo', 'hi-lo'], lanes=10)
+            print("✗ Duplicate systems accepted")
+            return False
+        except ValueError:
+            print("✓ Duplicate systems rejected")
+        return True
+    except Exception as e:
+        print(f"✗ Paired differences test failed: {e}")
+        return False
+
+def test_index_plays():
+    """Test per-system index plays replay only what they change, on the right count"""
+    print("\n=== Testing Index Plays ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping index plays")
+        return True
+
+    try:
+        systems = ['hi-lo', 'ko', 'zen', 'wong-halves']
+        ramp = spread_ramp(settings.betting_limits)
+        plain = MultiSystemSimulator(systems, lanes=500, bet_ramp=ramp,
+                                     rng=np.random.default_rng(4)).run(20000)
+        # Without deviations the replays (every split) reproduce the shared rounds
+        empty = {key: IndexTable(key, 6) for key in systems}
+        replayed = MultiSystemSimulator(systems, lanes=500, bet_ramp=ramp,
+                                        rng=np.random.default_rng(4),
+                                        index_tables=empty).run(20000)
+        for key in systems:
+            assert replayed.results[key].net_result == plain.results[key].net_result, key
+            assert replayed.results[key].hands == plain.results[key].hands, key
+        print("✓ Replaying with no deviations matches the shared play")
+
+        # The vector check sees the count the scalar engine plays from
+        simulator = MultiSystemSimulator(systems, lanes=50, rng=np.random.default_rng(9),
+                                         index_tables=empty)
+        simulator._reset()
+        lanes = np.arange(50)
+        simulator._cursor[lanes] += 40
+        simulator._round_start[lanes] = simulator._cursor[lanes]
+        for _ in range(5):
+            simulator._draw(lanes)
+        playing = simulator._playing_true_counts(lanes)
+        for lane in (0, 17, 49):
+            codes = simulator._codes[lane]
+            start = int(simulator._round_start[lane])
+            visible = [CARD_POOL[code] for i, code in enumerate(codes[start:start + 5]) if i != 3]
+            for column, key in enumerate(systems):
+                counter = CardCounter(key, num_decks=simulator.rules.num_decks)
+                counter.update_count_codes(codes[simulator.start:start])
+                expected = counter.get_true_count_with(visible, simulator.shoe_size - start - 5)
+                assert abs(playing[lane, column] - expected) < 1e-9, (lane, key)
+        print("✓ Playing true counts match CardCounter")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            tables = {key: IndexTable.load_or_generate(get_counting_system(key),
+                                                       cache_dir=cache_dir)
+                      for key in systems}
+        indexed = MultiSystemSimulator(systems, lanes=500, bet_ramp=ramp,
+                                       rng=np.random.default_rng(4), index_tables=tables)
+        comparison = indexed.run(20000)
+        assert all(result.rounds == 20000 for result in comparison.results.values())
+        assert comparison.results['zen'].net_result != plain.results['zen'].net_result
+        print("✓ Each system deviates with its own index table")
+        return True
+    except Exception as e:
+        print(f"✗ Index plays test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Compare Systems Test ===\n")
+
+    tests = [
+        test_matches_single_runs,
+        test_paired_differences,
+        test_index_plays
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Compare Systems Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
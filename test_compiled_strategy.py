@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test the compiled strategy decision table"""
+
+import sys
+from basic_strategy import BasicStrategy, CompiledStrategy
+from game_engine import Card, GameState, Hand
+from hand_state import NUM_RANKS, NUM_STATES
+from settings import settings
+
+def _hand(*ranks) -> Hand:
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card(rank, 'hearts'))
+    return hand
+
+def test_compiled_table():
+    """Test the table covers every state and matches the charts"""
+    print("=== Testing Compiled Table ===")
+
+    try:
+        strategy = BasicStrategy()
+        compiled = strategy.compile()
+        assert isinstance(compiled.table, tuple)
+        assert len(compiled.table) == 4 * NUM_STATES * NUM_RANKS
+        print(f"✓ {len(compiled.table)} entries compiled")
+
+        hard_16 = _hand('10', '6')
+        nine = Card('9', 'clubs')
+        index = CompiledStrategy.index(hard_16.state, nine.rank_index, True, False)
+        assert compiled.table[index] == 'H'
+        assert compiled.lookup(hard_16.state, nine.rank_index, True, False) == 'H'
+        assert strategy.get_optimal_action(hard_16, nine, True, False) == 'H'
+        print("✓ Lookup matches chart for hard 16 vs 9")
+
+        # Unsplittable A,A plays as soft 12
+        aces = _hand('A', 'A')
+        assert strategy.get_optimal_action(aces, Card('5', 'clubs'), True, False) == 'H'
+        assert strategy.get_optimal_action(aces, Card('5', 'clubs'), True, True) == 'P'
+        print("✓ A,A splits, or hits as soft 12 when it can't")
+
+        # 5,5 without doubling falls back to hitting
+        fives = _hand('5', '5')
+        assert strategy.get_optimal_action(fives, Card('6', 'clubs'), False, True) == 'H'
+        print("✓ 5,5 hits when doubling is not allowed")
+        return True
+    except Exception as e:
+        print(f"✗ Compiled table test failed: {e}")
+        return False
+
+def test_rebuild_on_rule_change():
+    """Test the table is rebuilt only when relevant rules change"""
+    print("\n=== Testing Rebuild On Rule Change ===")
+
+    original_das = settings.game_rules.double_after_split
+    original_max = settings.game_rules.max_splits
+    original_any_two = settings.game_rules.double_on_any_two
+    try:
+        strategy = BasicStrategy()
+        fours = _hand('4', '4')
+        five = Card('5', 'clubs')
+
+        settings.game_rules.double_after_split = True
+        assert strategy.get_optimal_action(fours, five) == 'P'
+        first = strategy._compiled
+        assert strategy.get_optimal_action(fours, five) == 'P'
+        assert strategy._compiled is first
+        print("✓ Table reused while rules are unchanged")
+
+        settings.game_rules.double_after_split = False
+        assert strategy.get_optimal_action(fours, five) == 'H'
+        assert strategy._compiled is not first
+        print("✓ No DAS: 4,4 vs 5 hits")
+
+        settings.game_rules.max_splits = 0
+        assert strategy.get_optimal_action(_hand('8', '8'), Card('7', 'clubs')) == 'H'
+        print("✓ max_splits = 0 never splits")
+
+        settings.game_rules.double_on_any_two = False
+        assert strategy.get_optimal_action(_hand('A', '6'), Card('4', 'clubs')) == 'H'
+        assert strategy.get_optimal_action(_hand('6', '5'), Card('4', 'clubs')) == 'D'
+        print("✓ Double restricted to 9-11")
+
+        # Split limits from the game state still apply
+        settings.game_rules.max_splits = 1
+        game = GameState()
+        game.player_hands = [_hand('8', '8'), _hand('8', '8')]
+        game.hand_bets = [25, 25]
+        game.phase = "playing"
+        assert strategy.get_optimal_action(game.player_hands[0], Card('7', 'clubs'),
+                                           True, True, game) == 'H'
+        print("✓ Split limit from game state respected")
+        return True
+    except Exception as e:
+        print(f"✗ Rebuild test failed: {e}")
+        return False
+    finally:
+        settings.game_rules.double_after_split = original_das
+        settings.game_rules.max_splits = original_max
+        settings.game_rules.double_on_any_two = original_any_two
+
+if __name__ == "__main__":
+    print("=== Compiled Strategy Test ===\n")
+
+    tests = [
+        test_compiled_table,
+        test_rebuild_on_rule_change
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Compiled Strategy Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test streaming per-true-count result aggregation"""
+
+import math
+import random
+import statistics
+import sys
+from ev_calculator import EVCalculator, SessionStats, TrueCountAggregator
+
+def test_bucketing_rules():
+    """Test bucket width and floor/truncate rounding"""
+    print("=== Testing Bucketing Rules ===")
+
+    try:
+        floor = TrueCountAggregator()
+        truncate = TrueCountAggregator(rounding="truncate")
+        halves = TrueCountAggregator(bucket_width=0.5)
+        for true_count, floor_key, truncate_key, half_key in [
+                (2.7, 2, 2, 5), (-0.4, -1, 0, -1), (-1.6, -2, -1, -4), (0.0, 0, 0, 0)]:
+            assert floor.bucket_key(true_count) == floor_key
+            assert truncate.bucket_key(true_count) == truncate_key
+            assert halves.bucket_key(true_count) == half_key
+        assert halves.bucket_start(-3) == -1.5
+        print("✓ Floor, truncate and half-count buckets")
+
+        for bad in ({'bucket_width': 0}, {'rounding': 'nearest'}):
+            try:
+                TrueCountAggregator(**bad)
+                raise AssertionError(f"{bad} accepted")
+            except ValueError:
+                pass
+        try:
+            floor.merge(truncate)
+            raise AssertionError("merged mismatched bucketing")
+        except ValueError:
+            pass
+        print("✓ Invalid settings rejected")
+        return True
+    except Exception as e:
+        print(f"✗ Bucketing test failed: {e}")
+        return False
+
+def test_streaming_statistics():
+    """Test per-bucket totals match statistics over the stored hands"""
+    print("\n=== Testing Streaming Statistics ===")
+
+    try:
+        rng = random.Random(4)
+        hands = [(rng.uniform(-4, 4), rng.choice([10, 25, 50]), rng.choice([-1, 0, 1, 1.5, 2]))
+                 for _ in range(5000)]
+
+        first = TrueCountAggregator()
+        second = TrueCountAggregator()
+        combined = TrueCountAggregator()
+        for i, (true_count, bet, outcome) in enumerate(hands):
+            (first if i % 2 else second).add(true_count, bet, bet * outcome)
+            combined.add(true_count, bet, bet * outcome)
+        assert first.merge(second) == combined
+        assert combined.total_count() == len(hands)
+        print(f"✓ Merged halves equal one stream ({len(combined)} buckets)")
+
+        for key in combined:
+            results = [bet * outcome for tc, bet, outcome in hands if math.floor(tc) == key]
+            wagered = sum(bet for tc, bet, _ in hands if math.floor(tc) == key)
+            count, bucket_wagered, net, _ = combined[key]
+            assert count == len(results) and bucket_wagered == wagered
+            assert abs(combined.ev_percentage(key) - net / wagered * 100) < 1e-9
+            assert abs(combined.variance(key) - statistics.variance(results)) < 1e-6
+        rows = combined.get_summary()
+        assert [row['true_count'] for row in rows] == sorted(combined.keys())
+        print("✓ EV and variance per bucket match the full hand list")
+        return True
+    except Exception as e:
+        print(f"✗ Streaming statistics test failed: {e}")
+        return False
+
+def test_session_stats_by_count():
+    """Test SessionStats buckets hands recorded through EVCalculator"""
+    print("\n=== Testing Session Stats by Count ===")
+
+    try:
+        calculator = EVCalculator()
+        calculator.update_session_ev(10, 2.4, 10)
+        calculator.update_session_ev(10, 2.9, -10)
+        calculator.update_session_ev(20, -1.2, 30)
+        by_count = calculator.session_stats.results_by_count
+        assert by_count[2] == [2, 20.0, 0.0, 200.0]
+        assert by_count[-2] == [1, 20.0, 30.0, 900.0]
+        summary = calculator.session_stats.get_session_summary()
+        assert [row['hands'] for row in summary['by_count']] == [1, 2]
+        print("✓ Hands bucketed by the count they were bet at")
+
+        stats = SessionStats(bucket_width=2, rounding="truncate")
+        stats.add_hand(10, 0.0, 5, -1.5)
+        stats.add_hand(10, 0.0, 5)  # no count given: totals only
+        assert stats.hands_played == 2 and stats.results_by_count.total_count() == 1
+        assert list(stats.results_by_count) == [0]
+        stats.reset()
+        assert len(stats.results_by_count) == 0
+        print("✓ Custom bucketing and reset")
+        return True
+    except Exception as e:
+        print(f"✗ Session stats test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Count Aggregation Test ===\n")
+
+    tests = [
+        test_bucketing_rules,
+        test_streaming_statistics,
+        test_session_stats_by_count
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Count Aggregation Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Test the counting system registry and multi-system CardCounter"""
+
+import random
+import sys
+from card_counting import CardCounter
+from counting_systems import COUNTING_SYSTEMS, get_counting_system, np
+from game_engine import Card, CARD_POOL, shuffled_shoes
+from settings import settings
+
+def test_registry():
+    """Test tag tables, deck sums and suit-dependent tags"""
+    print("=== Testing Counting System Registry ===")
+
+    try:
+        expected_sums = {'ko': 4, 'red-7': 2}
+        for key, system in COUNTING_SYSTEMS.items():
+            assert len(system.code_tags) == 52
+            assert system.deck_sum == expected_sums.get(key, 0), key
+            assert system.balanced == (key not in expected_sums)
+            for card in CARD_POOL:
+                if key != 'red-7':
+                    assert system.code_tags[card.code] == system.tag(card.rank)
+        print(f"✓ {len(COUNTING_SYSTEMS)} systems with expected deck sums")
+
+        red_7 = get_counting_system('red-7')
+        assert red_7.tag('7', 'hearts') == 1 and red_7.tag('7', 'diamonds') == 1
+        assert red_7.tag('7', 'spades') == 0 and red_7.tag('7') == 0
+        assert red_7.initial_running_count(6) == -12
+        assert get_counting_system('ko').initial_running_count(6) == -20
+        print("✓ Red 7 tags by suit; unbalanced initial running counts")
+
+        halves = get_counting_system('wong-halves')
+        assert halves.fractional and halves.tag('5') == 1.5 and halves.tag('9') == -0.5
+        assert get_counting_system('omega-2').tag('A') == 0
+
+        try:
+            get_counting_system('bogus')
+            print("✗ Unknown system accepted")
+            return False
+        except ValueError:
+            pass
+        print("✓ Level-3 fractional tags; unknown keys rejected")
+        return True
+    except Exception as e:
+        print(f"✗ Registry test failed: {e}")
+        return False
+
+def test_array_counts():
+    """Test array gather-sums agree with per-card counting"""
+    print("\n=== Testing Array Tag Lookup ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping array lookup")
+        return True
+
+    try:
+        shoe = shuffled_shoes(1, 6, np.random.default_rng(3))[0]
+        for key, system in COUNTING_SYSTEMS.items():
+            block = shoe[:150]
+            assert system.count_codes(block) == system.count_codes(block.tolist()), key
+            assert system.count_codes(shoe) == system.deck_sum * 6, key
+            assert system.tag_array("rank").tolist() == list(system.rank_tags)
+        print("✓ Gather-sum matches the Python sum for every system")
+        return True
+    except Exception as e:
+        print(f"✗ Array lookup test failed: {e}")
+        return False
+
+def test_card_tags():
+    """Test card tags come from the system selected in settings"""
+    print("\n=== Testing Card Tags ===")
+
+    original = settings.counting_system.system
+    try:
+        seven = Card('7', 'hearts')
+        settings.counting_system.system = 'hi-lo'
+        system = get_counting_system()
+        assert system.get_count_value(seven) == 0
+        assert system.get_count_value(Card('A', 'spades')) == -1
+        settings.counting_system.system = 'red-7'
+        system = get_counting_system()
+        assert system.get_count_value(seven) == 1
+        assert system.get_count_value(Card('7', 'clubs')) == 0
+        settings.counting_system.system = 'zen'
+        assert get_counting_system().get_count_value(Card('5', 'clubs')) == 2
+        print("✓ Card tags follow settings")
+        return True
+    except Exception as e:
+        print(f"✗ Card tag test failed: {e}")
+        return False
+    finally:
+        settings.counting_system.system = original
+
+def test_counter():
+    """Test initial counts, unbalanced true counts and the ace side count"""
+    print("\n=== Testing Multi-System CardCounter ===")
+
+    try:
+        counter = CardCounter('ko', num_decks=6)
+        assert counter.running_count == -20
+        # A full deck of KO tags drifts the count by +4 but leaves the true count at 0
+        for card in CARD_POOL:
+            counter.update_count(card)
+        assert counter.running_count == -16
+        assert abs(counter.get_true_count(5 * 52)) < 1e-9
+        counter.update_count(Card('5', 'hearts'))
+        assert counter.get_true_count(5 * 52 - 1) > 0
+        print("✓ KO true count is drift-corrected")
+
+        counter.set_system('hi-opt-1', num_decks=1)
+        assert counter.running_count == 0 and counter.cards_seen == 0
+        for rank in ['2', '3', '4', '5']:
+            counter.update_count(Card(rank, 'clubs'))
+        assert counter.get_running_count() == 3
+        # No aces seen with 48 cards left: 4 aces against 48/13 expected
+        surplus = counter.get_ace_surplus(48)
+        assert abs(surplus - (4 - 48 / 13)) < 1e-9
+        expected = counter.get_true_count(48) + surplus / (48 / 52)
+        assert abs(counter.get_betting_true_count(48) - expected) < 1e-9
+        counter.update_count(Card('A', 'clubs'))
+        assert counter.aces_seen == 1 and counter.get_ace_surplus(47) < 0
+        print("✓ Hi-Opt I side count adjusts the betting true count")
+
+        counter.set_system('hi-lo')
+        rng = random.Random(5)
+        codes = [rng.randrange(52) for _ in range(30)]
+        reference = CardCounter('hi-lo', num_decks=1)
+        for code in codes:
+            reference.update_count(CARD_POOL[code])
+        counter.update_count_codes(codes)
+        assert counter.running_count == reference.running_count
+        assert counter.get_betting_true_count(30) == counter.get_true_count(30)
+        print("✓ Block updates match card-by-card counting")
+        return True
+    except Exception as e:
+        print(f"✗ CardCounter test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Counting Systems Test ===\n")
+
+    tests = [
+        test_registry,
+        test_array_counts,
+        test_card_tags,
+        test_counter
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Counting Systems Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
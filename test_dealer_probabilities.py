@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Test exact dealer final-total distributions"""
+
+import sys
+import threading
+from dealer_probabilities import (
+    BLACKJACK, BUST, DealerProbabilities, RESULT_LABELS, shoe_composition
+)
+from hand_state import ACE_INDEX, TEN_INDEX
+
+def _without(composition, rank_index):
+    counts = list(composition)
+    counts[rank_index] -= 1
+    return tuple(counts)
+
+def test_known_distributions():
+    """Test distributions sum to one and match published 6-deck S17 figures"""
+    print("=== Testing Known Distributions ===")
+
+    try:
+        dealer = DealerProbabilities()
+        shoe = shoe_composition(6)
+        assert sum(shoe) == 312
+
+        for upcard, dist in enumerate(dealer.all_upcards(shoe, stand_soft_17=True)):
+            assert len(dist) == len(RESULT_LABELS)
+            assert abs(sum(dist) - 1.0) < 1e-9
+        print("✓ Every upcard distribution sums to 1")
+
+        six = dealer.distribution(4, _without(shoe, 4), stand_soft_17=True)
+        assert abs(six[BUST] - 0.4228) < 0.001, six[BUST]
+        ace = dealer.distribution(ACE_INDEX, _without(shoe, ACE_INDEX), stand_soft_17=True)
+        assert abs(ace[BLACKJACK] - 96 / 311) < 1e-12
+        print(f"✓ Dealer 6 busts {six[BUST]:.2%}, ace has blackjack {ace[BLACKJACK]:.2%}")
+
+        h17 = dealer.distribution(ACE_INDEX, _without(shoe, ACE_INDEX), stand_soft_17=False)
+        assert h17[0] < ace[0] and h17[BUST] > ace[BUST]
+        print("✓ Hitting soft 17 lowers 17s and raises busts")
+
+        peeked = dealer.distribution(TEN_INDEX, _without(shoe, TEN_INDEX), no_blackjack=True)
+        assert peeked[BLACKJACK] == 0.0 and abs(sum(peeked) - 1.0) < 1e-9
+        print("✓ No-blackjack distribution is conditioned on the peek")
+        return True
+    except Exception as e:
+        print(f"✗ Known distributions test failed: {e}")
+        return False
+
+def test_matches_brute_force():
+    """Test against direct enumeration of ordered draws on a tiny shoe"""
+    print("\n=== Testing Against Brute Force ===")
+
+    try:
+        composition = (1, 0, 1, 0, 1, 1, 0, 0, 3, 1)
+        upcard = 5  # 7
+
+        def brute(counts, cards):
+            hard = sum(1 if r == ACE_INDEX else min(r + 2, 10) for r in cards)
+            soft = ACE_INDEX in cards and hard <= 11
+            value = hard + 10 if soft else hard
+            if len(cards) == 2 and value == 21:
+                return {BLACKJACK: 1.0}
+            if hard > 21:
+                return {BUST: 1.0}
+            if value >= 17:
+                return {value - 17: 1.0}
+            total = sum(counts)
+            result = {}
+            for rank, n in enumerate(counts):
+                if n:
+                    rest = list(counts)
+                    rest[rank] -= 1
+                    for outcome, p in brute(rest, cards + [rank]).items():
+                        result[outcome] = result.get(outcome, 0.0) + p * n / total
+            return result
+
+        expected = brute(list(composition), [upcard])
+        actual = DealerProbabilities().distribution(upcard, composition, stand_soft_17=True)
+        for outcome in range(len(RESULT_LABELS)):
+            assert abs(actual[outcome] - expected.get(outcome, 0.0)) < 1e-12
+        print("✓ Memoized enumeration matches ordered brute force")
+        return True
+    except Exception as e:
+        print(f"✗ Brute force test failed: {e}")
+        return False
+
+def test_lru_cache():
+    """Test results are memoized with bounded eviction"""
+    print("\n=== Testing LRU Cache ===")
+
+    try:
+        dealer = DealerProbabilities(cache_size=2)
+        shoe = shoe_composition(1)
+        first = dealer.distribution(0, shoe, True)
+        assert dealer.distribution(0, shoe, True) is first
+        assert dealer.hits == 1 and dealer.misses == 1
+        print("✓ Repeat lookups hit the cache")
+
+        dealer.distribution(1, shoe, True)
+        dealer.distribution(0, shoe, True)  # refresh so upcard 1 is the oldest
+        dealer.distribution(2, shoe, True)
+        assert len(dealer) == 2
+        assert dealer.distribution(0, shoe, True) is first
+        misses = dealer.misses
+        dealer.distribution(1, shoe, True)
+        assert dealer.misses == misses + 1
+        print("✓ Least recently used entry evicted")
+
+        # Threads evicting each other's entries must not break lookups
+        errors = []
+        def lookups(offset):
+            try:
+                for i in range(300):
+                    dealer.distribution((i + offset) % 10, shoe, True)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=lookups, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        assert len(dealer) == 2
+        print("✓ Shared cache is safe across threads")
+        return True
+    except Exception as e:
+        print(f"✗ LRU cache test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Dealer Probabilities Test ===\n")
+
+    tests = [
+        test_known_distributions,
+        test_matches_brute_force,
+        test_lru_cache
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Dealer Probabilities Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
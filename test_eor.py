@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test effects of removal and counting system correlations"""
+
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+from counting_systems import get_counting_system
+from eor import EORTable, RANK_WEIGHTS, eor_path, weighted_correlation
+from settings import settings
+
+def test_weighted_correlation():
+    """Test the card-weighted correlation"""
+    print("=== Testing Weighted Correlation ===")
+
+    try:
+        tags = get_counting_system('hi-lo').average_rank_tags()
+        assert abs(weighted_correlation(tags, tags) - 1.0) < 1e-12
+        assert abs(weighted_correlation(tags, [-t for t in tags]) + 1.0) < 1e-12
+        assert weighted_correlation(tags, [1.0] * 10) == 0.0
+        print("✓ Perfect, inverse and degenerate correlations")
+        return True
+    except Exception as e:
+        print(f"✗ Weighted correlation test failed: {e}")
+        return False
+
+def test_single_deck_eor():
+    """Test single-deck EORs, system correlations and the disk cache"""
+    print("\n=== Testing Single-Deck Effects of Removal ===")
+
+    try:
+        rules = dataclasses.replace(settings.rule_set(), num_decks=1)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            table = EORTable.load_or_compute(rules, workers=2, cache_dir=cache_dir)
+            assert os.path.exists(eor_path(rules, cache_dir))
+            assert EORTable.load_or_compute(rules, cache_dir=cache_dir) == table
+            # Tables from an older solver are rejected rather than reused
+            path = eor_path(rules, cache_dir)
+            with open(path) as f:
+                data = json.load(f)
+            del data['format']
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            try:
+                EORTable.load(path)
+                assert False, "stale table loaded"
+            except ValueError:
+                pass
+        print(f"✓ Solved on a process pool and cached (EV {table.base_ev * 100:+.3f}%)")
+
+        eor = table.eor
+        assert max(range(10), key=lambda i: eor[i]) == 3  # The five
+        assert all(eor[i] > 0 for i in range(5)) and eor[8] < 0 and eor[9] < 0
+        # Removing an average card leaves the EV about where it was
+        average = sum(w * e for w, e in zip(RANK_WEIGHTS, eor)) / 52
+        assert abs(average) < 0.1 * max(abs(e) for e in eor)
+        print("✓ Low cards help the player, tens and aces hurt")
+
+        hi_lo = table.system_summary(get_counting_system('hi-lo'))
+        halves = table.system_summary(get_counting_system('wong-halves'))
+        hi_opt = table.system_summary(get_counting_system('hi-opt-1'))
+        assert 0.9 < hi_lo['betting_correlation'] < halves['betting_correlation'] <= 1.0
+        assert hi_opt['insurance_correlation'] > hi_lo['insurance_correlation']
+        assert 0.5 < hi_lo['playing_efficiency'] < 1.0
+        assert "16 v T" in table.decisions and len(table.decisions["16 v T"]) == 10
+        print(f"✓ Hi-Lo BC {hi_lo['betting_correlation']:.3f}, "
+              f"PE {hi_lo['playing_efficiency']:.3f}, IC {hi_lo['insurance_correlation']:.3f}")
+        return True
+    except Exception as e:
+        print(f"✗ Single-deck EOR test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== EOR Test ===\n")
+
+    tests = [
+        test_weighted_correlation,
+        test_single_deck_eor
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== EOR Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
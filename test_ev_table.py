@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Test the simulated per-true-count EV table"""
+
+import os
+import sys
+import tempfile
+from counting_systems import get_counting_system
+from ev_calculator import EVCalculator
+from ev_table import EVTable, available, ev_table_path
+from settings import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def test_interpolation():
+    """Test interpolation between bucket centres and holding the ends"""
+    print("=== Testing Interpolation ===")
+
+    try:
+        table = EVTable('hi-lo', 'rules', [-1.5, 0.5, 2.5], [0.3, 0.5, 0.2],
+                        [-0.02, 0.0, 0.03], [1.2, 1.3, 1.4], [[-1.0, 1.0]] * 3,
+                        [[0.51, 0.49], [0.5, 0.5], [0.485, 0.515]], [0.0, 0.0, 0.03], 1000)
+        assert table.edge(0.5) == 0.0
+        assert abs(table.edge(1.5) - 0.015) < 1e-12
+        assert abs(table.edge(-0.5) + 0.01) < 1e-12
+        assert table.edge(10) == 0.03 and table.edge(-10) == -0.02
+        assert abs(table.variance_at(1.5) - 1.35) < 1e-12
+        print("✓ Linear between centres, flat beyond the ends")
+
+        calculator = EVCalculator()
+        linear = calculator.get_player_edge(3.0)
+        calculator.set_ev_table(table)
+        assert abs(calculator.get_player_edge(1.5) - 1.5) < 1e-9
+        assert abs(calculator.calculate_ev(2.5, 100) - 3.0) < 1e-9
+        assert calculator.calculate_kelly_bet(10000, -1.5) == 0
+        calculator.set_ev_table(None)
+        assert calculator.get_player_edge(3.0) == linear
+        print("✓ EVCalculator uses the table and falls back to the linear model")
+        return True
+    except Exception as e:
+        print(f"✗ Interpolation test failed: {e}")
+        return False
+
+def test_simulated_table():
+    """Test a simulated table is monotone, sums to one and round-trips through the cache"""
+    print("\n=== Testing Simulated Table ===")
+
+    assert available() == (np is not None)
+    if np is None:
+        print("✓ NumPy not installed - skipping simulated table")
+        return True
+
+    try:
+        system = get_counting_system('hi-lo')
+        rules = settings.rule_set()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            table = EVTable.load_or_simulate(system, rules, rounds=200000, cache_dir=cache_dir,
+                                             rng=np.random.default_rng(3))
+            path = ev_table_path(system, rules, cache_dir)
+            assert os.path.getsize(path) < 10000
+            again = EVTable.load_or_simulate(system, rules, rounds=200000, cache_dir=cache_dir)
+        assert again.rounds == table.rounds and again.centres == [
+            float(f"{c:.6g}") for c in table.centres]
+        print(f"✓ {len(table.centres)} buckets cached in {os.path.basename(path)}")
+
+        assert abs(sum(table.frequency) - 1.0) < 1e-9
+        assert all(a < b for a, b in zip(table.centres, table.centres[1:]))
+        assert all(a <= b for a, b in zip(table.mean, table.mean[1:]))
+        assert table.edge(table.centres[-1]) > table.edge(table.centres[0])
+        assert all(1.0 < v < 1.6 for v in table.variance)
+        print(f"✓ EV rises from {table.mean[0] * 100:+.2f}% to {table.mean[-1] * 100:+.2f}%")
+        return True
+    except Exception as e:
+        print(f"✗ Simulated table test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== EV Table Test ===\n")
+
+    tests = [
+        test_interpolation,
+        test_simulated_table
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== EV Table Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
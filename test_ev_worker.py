@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Test the background EV worker and request building"""
+
+import queue
+import sys
+import threading
+from ev_worker import EVRequest, EVWorker
+from exact_ev import ExactEVCalculator
+from game_engine import ArrayShoe, Card, GameState, Shoe
+
+class _MainThread:
+    """Stand-in for root.after: collects posted callbacks to run on this thread"""
+
+    def __init__(self):
+        self.posted = queue.Queue()
+
+    def post(self, callback):
+        self.posted.put(callback)
+
+    def run_one(self, timeout=5.0):
+        self.posted.get(timeout=timeout)()
+
+def _playing_game(shoe_class=Shoe):
+    game = GameState(shoe=shoe_class())
+    game.start_new_hand(25)
+    game.phase = "playing"
+    return game
+
+def test_request_from_game_state():
+    """Test requests see the shoe from the player's seat"""
+    print("=== Testing EV Request ===")
+
+    try:
+        for shoe_class in (Shoe, ArrayShoe):
+            game = _playing_game(shoe_class)
+            request = EVRequest.from_game_state(game)
+            seen = len(game.player_hand.cards) + 1  # player cards and upcard
+            assert sum(request.composition) == game.shoe.num_decks * 52 - seen
+            assert request.upcard_index == game.dealer_hand.cards[0].rank_index
+            assert request.hands_in_play == 1 and request.rules is game.rules
+            print(f"✓ {shoe_class.__name__}: hole and burn cards counted as unseen")
+
+        assert request == EVRequest.from_game_state(game)
+        game.phase = "complete"
+        assert EVRequest.from_game_state(game) is None
+        print("✓ Requests compare equal and need a live decision")
+        return True
+    except Exception as e:
+        print(f"✗ EV request test failed: {e}")
+        return False
+
+def test_worker_delivers_latest():
+    """Test results arrive via the post function and stale ones are dropped"""
+    print("\n=== Testing EV Worker ===")
+
+    main_thread = _MainThread()
+    release = threading.Event()
+
+    class _SlowCalculator(ExactEVCalculator):
+        def action_evs(self, *args, **kwargs):
+            release.wait(5.0)
+            return super().action_evs(*args, **kwargs)
+
+    worker = EVWorker(main_thread.post, _SlowCalculator())
+    try:
+        game = _playing_game()
+        game.player_hand.cards = [Card('10', 'hearts'), Card('6', 'spades')]
+        request = EVRequest.from_game_state(game)
+
+        received = []
+        worker.submit(request, lambda evs: received.append(('stale', evs)))
+        worker.submit(request, lambda evs: received.append(('latest', evs)))
+        release.set()
+        main_thread.run_one()
+        assert len(received) == 1 and received[0][0] == 'latest'
+        assert {'hit', 'stand'} <= set(received[0][1])
+        print("✓ Only the latest submission is delivered")
+
+        # A result computed before cancel() never reaches the callback
+        release.clear()
+        worker.submit(request, lambda evs: received.append(('cancelled', evs)))
+        worker.cancel()
+        release.set()
+        try:
+            main_thread.run_one(timeout=0.5)
+        except queue.Empty:
+            pass
+        assert all(tag != 'cancelled' for tag, _ in received)
+        print("✓ Cancelled work is dropped")
+        return True
+    except Exception as e:
+        print(f"✗ EV worker test failed: {e}")
+        return False
+    finally:
+        release.set()
+        worker.stop(timeout=5.0)
+
+def test_worker_reports_failure():
+    """Test a failed calculation reaches the callback as an empty result"""
+    print("\n=== Testing EV Worker Failure ===")
+
+    class _BrokenCalculator(ExactEVCalculator):
+        def action_evs(self, *args, **kwargs):
+            raise RuntimeError("solver failed")
+
+    main_thread = _MainThread()
+    worker = EVWorker(main_thread.post, _BrokenCalculator())
+    try:
+        request = EVRequest.from_game_state(_playing_game())
+        received = []
+        worker.submit(request, received.append)
+        main_thread.run_one()
+        assert received == [{}], received
+        print("✓ Failure delivered as an empty result")
+        return True
+    except Exception as e:
+        print(f"✗ EV worker failure test failed: {e}")
+        return False
+    finally:
+        worker.stop(timeout=5.0)
+
+if __name__ == "__main__":
+    print("=== EV Worker Test ===\n")
+
+    tests = [
+        test_request_from_game_state,
+        test_worker_delivers_latest,
+        test_worker_reports_failure
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== EV Worker Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
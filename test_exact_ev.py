@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Test the composition-dependent exact EV solver"""
+
+import sys
+import time
+from dataclasses import replace
+from dealer_probabilities import BUST, DealerProbabilities, shoe_composition
+from exact_ev import ExactEVCalculator, remove_cards
+from game_engine import Card, Hand
+from hand_state import STATE_BUST, STATE_VALUE, advance, state_from_ranks
+from settings import settings
+
+TEN = 8
+ACE = 9
+
+def _evs(player, upcard, rules=None, **kwargs):
+    composition = remove_cards(shoe_composition(6), list(player) + [upcard])
+    return ExactEVCalculator().action_evs(player, upcard, composition, rules=rules, **kwargs)
+
+def test_stand_and_hit():
+    """Test stand/hit/double against a full-removal reference"""
+    print("=== Testing Stand, Hit and Double ===")
+
+    try:
+        dealer = DealerProbabilities(cache_size=100000)
+
+        def stand(value, counts, upcard):
+            dist = dealer.distribution(upcard, counts, True, no_blackjack=True)
+            if value < 17:
+                return 2 * dist[BUST] - 1
+            return dist[BUST] + sum(dist[:value - 17]) - sum(dist[value - 16:BUST])
+
+        def hit(state, counts, upcard):
+            total = sum(counts)
+            ev = 0.0
+            for rank, n in enumerate(counts):
+                if not n:
+                    continue
+                next_state = advance(state, rank)
+                rest = list(counts)
+                rest[rank] -= 1
+                if STATE_BUST[next_state]:
+                    ev -= n / total
+                    continue
+                best = stand(STATE_VALUE[next_state], rest, upcard)
+                if STATE_VALUE[next_state] < 21:
+                    best = max(best, hit(next_state, rest, upcard))
+                ev += n / total * best
+            return ev
+
+        rules = replace(settings.rule_set(), dealer_stand_soft_17=True)
+        # 10,6 vs 10 and 10,4 vs 10
+        for player in [(TEN, 4), (TEN, 2)]:
+            composition = remove_cards(shoe_composition(6), list(player) + [TEN])
+            evs = ExactEVCalculator().action_evs(player, TEN, composition, rules=rules)
+            state = state_from_ranks(player)
+            assert abs(evs['stand'] - stand(STATE_VALUE[state], composition, TEN)) < 1e-12
+            assert abs(evs['hit'] - hit(state, composition, TEN)) < 0.002
+            print(f"✓ {STATE_VALUE[state]} vs 10: stand {evs['stand']:+.4f}, hit {evs['hit']:+.4f}")
+
+        eleven = _evs((4, 3), 4, rules)
+        assert eleven['double'] > eleven['hit'] > eleven['stand']
+        assert 0.6 < eleven['double'] < 0.75
+        print(f"✓ 11 vs 6 doubles for {eleven['double']:+.4f}")
+
+        twenty = _evs((TEN, TEN), 4, rules)
+        assert max(twenty, key=twenty.get) == 'stand'
+        print("✓ 20 vs 6 stands")
+        return True
+    except Exception as e:
+        print(f"✗ Stand/hit test failed: {e}")
+        return False
+
+def test_split_rules():
+    """Test split EVs respond to max_splits, DAS and ace rules"""
+    print("\n=== Testing Split Rules ===")
+
+    try:
+        rules = settings.rule_set()
+        eights = [_evs((6, 6), 4, replace(rules, max_splits=n))['split'] for n in (1, 2, 3)]
+        assert eights[0] < eights[1] < eights[2]
+        assert 'split' not in _evs((6, 6), 4, replace(rules, max_splits=0))
+        assert 'split' not in _evs((6, 6), 4, replace(rules, max_splits=3), hands_in_play=4)
+        print(f"✓ 8,8 vs 6 split EV rises with max_splits: {[round(ev, 4) for ev in eights]}")
+
+        das = _evs((6, 6), 4, replace(rules, double_after_split=True))['split']
+        no_das = _evs((6, 6), 4, replace(rules, double_after_split=False))['split']
+        assert das > no_das
+        print("✓ DAS adds split value")
+
+        one_card = _evs((ACE, ACE), 4, replace(rules, split_aces_one_card=True))['split']
+        played = _evs((ACE, ACE), 4, replace(rules, split_aces_one_card=False))['split']
+        resplit = _evs((ACE, ACE), 4, replace(rules, resplit_aces=True))['split']
+        assert played > one_card and resplit > one_card
+        print(f"✓ Split aces: one card {one_card:+.4f}, played {played:+.4f}, resplit {resplit:+.4f}")
+        return True
+    except Exception as e:
+        print(f"✗ Split rules test failed: {e}")
+        return False
+
+def test_latency_and_hand_api():
+    """Test a full decision set for a 6-deck shoe is interactive"""
+    print("\n=== Testing Latency ===")
+
+    try:
+        hand = Hand()
+        hand.add_card(Card('2', 'hearts'))
+        hand.add_card(Card('2', 'spades'))
+        upcard = Card('6', 'clubs')
+        composition = remove_cards(shoe_composition(6), [0, 0, 4])
+
+        calculator = ExactEVCalculator()
+        start = time.perf_counter()
+        evs = calculator.hand_evs(hand, upcard, composition)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert set(evs) == {'stand', 'hit', 'double', 'split'}
+        assert calculator.best_action(evs) == 'split'
+        print(f"✓ 2,2 vs 6 decision set in {elapsed:.1f} ms")
+        assert elapsed < 500  # generous bound for slow CI machines
+        return True
+    except Exception as e:
+        print(f"✗ Latency test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Exact EV Test ===\n")
+
+    tests = [
+        test_stand_and_hit,
+        test_split_rules,
+        test_latency_and_hand_api
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Exact EV Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
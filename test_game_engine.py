@@ -2,6 +2,7 @@
 
 from game_engine import Card, Shoe, Hand, GameRules, GameState
 from card_counting import CardCounter
+from counting_systems import get_counting_system
 from ev_calculator import EVCalculator
 
 def test_card_creation():
@@ -15,7 +16,7 @@ def test_card_creation():
     ]
     
     for card in cards:
-        print(f"  {card} - Value: {card.value}, Count: {card.count_value}")
+        print(f"  {card} - Value: {card.value}, Count: {get_counting_system().get_count_value(card)}")
     print()
 
 def test_hand_calculation():
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test hand state encoding and the transition table"""
+
+import sys
+from itertools import product
+from game_engine import Card, GameState, Hand
+from hand_state import (
+    ACE_INDEX, EMPTY_STATE, NO_PAIR, NUM_RANKS, NUM_STATES, TEN_INDEX, TRANSITIONS,
+    STATE_BUST, STATE_NATURAL, STATE_PAIR, STATE_SOFT, STATE_VALUE,
+    advance, decode, dealer_hits_table, encode, state_from_ranks
+)
+
+def test_state_encoding():
+    """Test encode/decode round trip and table shape"""
+    print("=== Testing State Encoding ===")
+
+    try:
+        assert len(TRANSITIONS) == NUM_STATES * NUM_RANKS
+        assert decode(EMPTY_STATE) == (0, False, 0, NO_PAIR)
+        for state in range(NUM_STATES):
+            assert encode(*decode(state)) == state
+        print(f"✓ {NUM_STATES} states round trip through encode/decode")
+
+        aces = state_from_ranks([ACE_INDEX, ACE_INDEX])
+        assert decode(aces) == (2, True, 2, ACE_INDEX)
+        assert STATE_VALUE[aces] == 12 and STATE_PAIR[aces] == ACE_INDEX
+
+        natural = state_from_ranks([ACE_INDEX, TEN_INDEX])
+        assert STATE_NATURAL[natural] and STATE_VALUE[natural] == 21
+        assert not STATE_NATURAL[advance(state_from_ranks([ACE_INDEX, 4]), 3)]
+
+        hard_16 = state_from_ranks([TEN_INDEX, 4])
+        assert decode(hard_16) == (16, False, 2, NO_PAIR)
+        assert STATE_BUST[advance(hard_16, TEN_INDEX)]
+        print("✓ Pairs, naturals and busts encoded")
+        return True
+    except Exception as e:
+        print(f"✗ State encoding test failed: {e}")
+        return False
+
+def test_table_matches_hand():
+    """Test table-driven values match card-by-card arithmetic for all 3-card hands"""
+    print("\n=== Testing Table Matches Hand Arithmetic ===")
+
+    try:
+        checked = 0
+        for ranks in product(range(NUM_RANKS), repeat=3):
+            state = EMPTY_STATE
+            hard = 0
+            aces = 0
+            for rank in ranks:
+                state = advance(state, rank)
+                hard += 1 if rank == ACE_INDEX else min(rank + 2, 10)
+                aces += rank == ACE_INDEX
+                soft = aces > 0 and hard <= 11
+                assert STATE_VALUE[state] == (hard + 10 if soft else hard)
+                assert STATE_SOFT[state] == soft
+                assert STATE_BUST[state] == (hard > 21)
+                checked += 1
+        print(f"✓ {checked} transitions agree with direct arithmetic")
+
+        hand = Hand()
+        for rank in ['A', '5', 'K']:
+            hand.add_card(Card(rank, 'hearts'))
+        assert hand.state == state_from_ranks([ACE_INDEX, 3, TEN_INDEX])
+        print("✓ Hand advances through the transition table")
+        return True
+    except Exception as e:
+        print(f"✗ Table arithmetic test failed: {e}")
+        return False
+
+def test_dealer_hit_tables():
+    """Test dealer hit flags for S17 and H17"""
+    print("\n=== Testing Dealer Hit Tables ===")
+
+    try:
+        soft_17 = state_from_ranks([ACE_INDEX, 4])
+        hard_17 = state_from_ranks([TEN_INDEX, 5])
+        hard_16 = state_from_ranks([TEN_INDEX, 4])
+
+        s17 = dealer_hits_table(True)
+        h17 = dealer_hits_table(False)
+        assert not s17[soft_17] and h17[soft_17]
+        assert not s17[hard_17] and not h17[hard_17]
+        assert s17[hard_16] and h17[hard_16]
+        print("✓ Soft 17 rule reflected in dealer tables")
+
+        game = GameState()
+        game.start_new_hand(25)
+        game.play_dealer_hand()
+        assert game.dealer_hand.value >= 17
+        print("✓ Dealer plays out by table lookup")
+        return True
+    except Exception as e:
+        print(f"✗ Dealer table test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Hand State Test ===\n")
+
+    tests = [
+        test_state_encoding,
+        test_table_matches_hand,
+        test_dealer_hit_tables
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Hand State Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Test incremental hand value tracking"""
+
+import sys
+from game_engine import Card, GameState, Hand
+
+def _hand(*ranks) -> Hand:
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card(rank, 'hearts'))
+    return hand
+
+def test_incremental_values():
+    """Test running totals give correct soft/hard values as cards arrive"""
+    print("=== Testing Incremental Values ===")
+
+    try:
+        # (cards, value, soft, bust)
+        cases = [
+            (['A'], 11, True, False),
+            (['A', '6'], 17, True, False),
+            (['A', '6', '10'], 17, False, False),
+            (['A', 'A'], 12, True, False),
+            (['A', 'A', '9'], 21, True, False),
+            (['A', 'A', '9', 'K'], 21, False, False),
+            (['A', 'A', 'A', 'A', '7'], 21, True, False),
+            (['10', '6'], 16, False, False),
+            (['10', '6', 'Q'], 26, False, True),
+            (['9', 'A', 'A'], 21, True, False),
+        ]
+
+        for ranks, value, soft, bust in cases:
+            hand = _hand(*ranks)
+            assert hand.value == value, f"{ranks}: value {hand.value} != {value}"
+            assert hand.is_soft == soft, f"{ranks}: soft {hand.is_soft} != {soft}"
+            assert hand.is_bust == bust, f"{ranks}: bust {hand.is_bust} != {bust}"
+            print(f"✓ {'-'.join(ranks)} = {value} ({'soft' if soft else 'hard'})")
+
+        assert _hand('A', 'K').is_blackjack
+        assert not _hand('A', '5', '5').is_blackjack
+        print("✓ Blackjack detection")
+
+        assert not hasattr(Hand(), '__dict__')
+        print("✓ Hand uses __slots__")
+        return True
+    except Exception as e:
+        print(f"✗ Incremental values test failed: {e}")
+        return False
+
+def test_replaced_cards_resync():
+    """Test assigning hand.cards resyncs the running totals"""
+    print("\n=== Testing Card Replacement ===")
+
+    try:
+        hand = _hand('10', '6')
+        hand.cards = [Card('A', 'hearts'), Card('7', 'spades')]
+        assert hand.value == 18 and hand.is_soft
+        hand.add_card(Card('5', 'clubs'))
+        assert hand.value == 13 and not hand.is_soft
+        print("✓ Assigning cards resyncs totals")
+
+        hand.cards.append(Card('8', 'clubs'))
+        hand._calculate_value()
+        assert hand.value == 21
+        print("✓ _calculate_value recomputes after in-place edits")
+        return True
+    except Exception as e:
+        print(f"✗ Card replacement test failed: {e}")
+        return False
+
+def test_split_hand_values():
+    """Test split hands keep correct values and are never blackjack"""
+    print("\n=== Testing Split Hand Values ===")
+
+    try:
+        game = GameState()
+        game.start_new_hand(25)
+        game.phase = "playing"
+        game.player_hands[0].cards = [Card('A', 'hearts'), Card('A', 'spades')]
+
+        assert game.player_split()
+        for hand in game.player_hands:
+            assert hand.cards[0].rank == 'A'
+            assert len(hand.cards) == 2
+            expected = _hand(*[card.rank for card in hand.cards])
+            assert hand.value == expected.value
+            assert hand.is_soft == expected.is_soft
+            assert not hand.is_blackjack
+        print("✓ Split aces values correct, 21 is not blackjack")
+        return True
+    except Exception as e:
+        print(f"✗ Split hand values test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Hand Tracking Test ===\n")
+
+    tests = [
+        test_incremental_values,
+        test_replaced_cards_resync,
+        test_split_hand_values
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Hand Tracking Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
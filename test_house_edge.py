@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test the rule-derived house edge model"""
+
+import dataclasses
+import os
+import sys
+import tempfile
+from betting_strategy import BettingStrategyCalculator
+from config import BASE_HOUSE_EDGE, TRUE_COUNT_ADVANTAGE
+from counting_systems import get_counting_system
+from ev_calculator import EVCalculator
+from house_edge import compute_house_edge, house_edge_path, load_or_compute_house_edge
+from settings import settings
+from simulate import Simulator
+
+def _single_deck_rules(**changes):
+    rules = dataclasses.replace(settings.rule_set(), num_decks=1, dealer_stand_soft_17=True,
+                                blackjack_payout=1.5, double_after_split=True,
+                                double_on_any_two=True)
+    return dataclasses.replace(rules, **changes)
+
+def test_rule_effects():
+    """Test payouts and H17 move the solved edge the expected way"""
+    print("=== Testing Rule Effects ===")
+
+    try:
+        hi_lo = get_counting_system('hi-lo')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            base = compute_house_edge(hi_lo, _single_deck_rules(), cache_dir=cache_dir)
+            six_five = compute_house_edge(hi_lo, _single_deck_rules(blackjack_payout=1.2),
+                                          cache_dir=cache_dir)
+            h17 = compute_house_edge(hi_lo, _single_deck_rules(dealer_stand_soft_17=False),
+                                     cache_dir=cache_dir)
+        assert -0.002 < base.base_house_edge < 0.004, base
+        # A natural comes about 4.8% of the time, so 6:5 costs about 1.4%
+        payout_cost = base.base_house_edge - six_five.base_house_edge
+        assert 0.012 < payout_cost < 0.016, payout_cost
+        assert 0.001 < base.base_house_edge - h17.base_house_edge < 0.004
+        print(f"✓ Off the top {base.base_house_edge * 100:+.3f}%, 6:5 costs "
+              f"{payout_cost * 100:.2f}%, H17 costs "
+              f"{(base.base_house_edge - h17.base_house_edge) * 100:.2f}%")
+
+        assert 0.004 < base.true_count_advantage < 0.006, base
+        assert base.system == 'hi-lo' and base.rules_key == _single_deck_rules().cache_key()
+        print(f"✓ Hi-Lo gains {base.true_count_advantage * 100:.3f}% per true count")
+        return True
+    except Exception as e:
+        print(f"✗ Rule effects test failed: {e}")
+        return False
+
+def test_cache_and_calculators():
+    """Test the disk cache and that EV and Kelly bets read from the model"""
+    print("\n=== Testing Cache and Calculators ===")
+
+    try:
+        calculator = EVCalculator()
+        assert calculator.base_house_edge == BASE_HOUSE_EDGE
+        assert calculator.true_count_advantage == TRUE_COUNT_ADVANTAGE
+        print("✓ Defaults to the config constants")
+
+        rules = _single_deck_rules(blackjack_payout=1.2)
+        system = get_counting_system('hi-lo')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            model = load_or_compute_house_edge(system, rules, cache_dir=cache_dir)
+            assert os.path.exists(house_edge_path(system, rules, cache_dir))
+            assert load_or_compute_house_edge(system, rules, cache_dir=cache_dir) == model
+        print("✓ Model cached by system and rule hash")
+
+        calculator.set_model(model)
+        assert abs(calculator.get_player_edge(0) - model.base_house_edge * 100) < 1e-12
+        assert abs(calculator.calculate_ev(2, 100) - model.player_edge(2) * 100) < 1e-12
+
+        # At +3 the default model says +1.0%; the 6:5 game is barely positive, if at all
+        original = settings.betting_limits.betting_strategy
+        settings.betting_limits.betting_strategy = "kelly"
+        try:
+            betting = BettingStrategyCalculator(calculator)
+            bet = betting.calculate_bet_size(10000, 3.0, 10)
+            default_bet = BettingStrategyCalculator(EVCalculator()).calculate_bet_size(
+                10000, 3.0, 10)
+            assert bet < default_bet, (bet, default_bet)
+            simulator = Simulator(rules=rules, house_edge=model)
+            assert simulator.ev_calculator.model == model
+            simulator = Simulator()
+            assert simulator.ev_calculator.model.rules_key == settings.rule_set().cache_key()
+        finally:
+            settings.betting_limits.betting_strategy = original
+        print("✓ EV, Kelly bets and simulated Kelly runs follow the solved model")
+        return True
+    except Exception as e:
+        print(f"✗ Cache and calculators test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== House Edge Test ===\n")
+
+    tests = [
+        test_rule_effects,
+        test_cache_and_calculators
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== House Edge Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Test index play generation and count-based strategy lookups"""
+
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+from basic_strategy import BasicStrategy
+from card_counting import CardCounter
+from counting_systems import get_counting_system
+from eor import RANK_WEIGHTS
+from game_engine import Card, Hand
+from index_plays import IndexTable, count_composition, index_table_path, insurance_index
+from settings import settings
+from strategy_generator import StrategyCharts
+
+HANDS = ["H16", "H12", "H10", "PT"]
+
+def _hand(*ranks):
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card(rank, 'clubs'))
+    return hand
+
+def test_count_composition():
+    """Test the average composition has the requested true count"""
+    print("=== Testing Count Compositions ===")
+
+    try:
+        for key in ('hi-lo', 'ko', 'zen', 'red-7'):
+            system = get_counting_system(key)
+            tags = system.average_rank_tags()
+            composition = count_composition(system, 2.5, 3.0)
+            assert abs(sum(composition) - 156) < 1e-9
+            # Cards removed from a 6-deck shoe to leave this composition
+            removed = [w * 6 - n for w, n in zip(RANK_WEIGHTS, composition)]
+            running = sum(t * r for t, r in zip(tags, removed))
+            running -= system.deck_sum * sum(removed) / 52
+            assert abs(running / 3.0 - 2.5) < 1e-9, key
+        print("✓ Drift-corrected true count of each composition matches")
+
+        index = insurance_index(get_counting_system('hi-lo'), 4.0)
+        assert 2.5 <= index <= 3.5
+        assert insurance_index(get_counting_system('hi-opt-1'), 4.0) > 0
+        print(f"✓ Hi-Lo insurance index {index:+.1f}")
+        return True
+    except Exception as e:
+        print(f"✗ Count composition test failed: {e}")
+        return False
+
+def test_generated_indices():
+    """Test generated Hi-Lo indices against the published Illustrious 18 values"""
+    print("\n=== Testing Generated Indices ===")
+
+    try:
+        rules = settings.rule_set()
+        table = IndexTable.generate(get_counting_system('hi-lo'), rules, workers=1, hands=HANDS)
+        expected = [("H16", 8, 'S', 0), ("H12", 1, 'S', 2), ("H12", 0, 'S', 3),
+                    ("H10", 8, 'D', 4), ("PT", 3, 'P', 5), ("PT", 4, 'P', 4)]
+        for hand, upcard, action, published in expected:
+            plays = [play for play in table.find(hand, upcard) if play.action == action]
+            assert len(plays) == 1, (hand, upcard)
+            assert plays[0].above and abs(plays[0].index - published) <= 1.5, plays[0].label()
+        low = [play for play in table.find("H12", 3) if not play.above]
+        assert low and low[0].action == 'H' and -3 <= low[0].index <= -1
+        print(f"✓ {len(table.plays)} plays; I18 entries within 1.5 of published indices")
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, "indices.json")
+            table.save(path)
+            assert IndexTable.load(path) == table
+        print("✓ Index table round-trips through JSON")
+        return True
+    except Exception as e:
+        print(f"✗ Generated indices test failed: {e}")
+        return False
+
+def test_charts_and_cache():
+    """Test deviations are measured from the charts played and stale caches are solved again"""
+    print("\n=== Testing Charts and Cache ===")
+
+    try:
+        # H17: the typed chart hits 11 v A, the generated one doubles it
+        rules = dataclasses.replace(settings.rule_set(), dealer_stand_soft_17=False)
+        hi_lo = get_counting_system('hi-lo')
+        with tempfile.TemporaryDirectory() as cache_dir:
+            charts = StrategyCharts.load_or_generate(rules, cache_dir=cache_dir)
+            typed = IndexTable.generate(hi_lo, rules, workers=1, hands=["H11"])
+            generated = IndexTable.generate(hi_lo, rules, workers=1, hands=["H11"],
+                                            charts=charts)
+            assert [(p.action, p.above) for p in typed.find("H11", 9)] == [('D', True)]
+            assert [(p.action, p.above) for p in generated.find("H11", 9)] == [('H', False)]
+            print("✓ 11 v A deviates from the chart it is played with")
+
+            path = index_table_path(hi_lo, rules, cache_dir, charts)
+            assert path != index_table_path(hi_lo, rules, cache_dir)
+            generated.save(path)
+            assert IndexTable.load_or_generate(hi_lo, rules, cache_dir=cache_dir,
+                                               charts=charts) == generated
+            with open(path) as f:
+                data = json.load(f)
+            del data['format']
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            try:
+                IndexTable.load(path)
+                assert False, "stale table loaded"
+            except ValueError:
+                pass
+        print("✓ Cached per charts; tables from an older solver are rejected")
+        return True
+    except Exception as e:
+        print(f"✗ Charts and cache test failed: {e}")
+        return False
+
+def test_strategy_lookup():
+    """Test get_optimal_action applies deviations only when given a true count"""
+    print("\n=== Testing Count-Based Lookup ===")
+
+    try:
+        table = IndexTable.generate(get_counting_system('hi-lo'), settings.rule_set(),
+                                    workers=1, hands=HANDS)
+        strategy = BasicStrategy()
+        ten = Card('K', 'clubs')
+        six = Card('6', 'clubs')
+        assert strategy.get_optimal_action(_hand('10', '6'), ten, True, False, true_count=5) == 'H'
+        strategy.index_table = table
+        assert strategy.get_optimal_action(_hand('10', '6'), ten, True, False) == 'H'
+        assert strategy.get_optimal_action(_hand('10', '6'), ten, True, False, true_count=3) == 'S'
+        assert strategy.get_optimal_action(_hand('10', '6'), ten, True, False, true_count=-2) == 'H'
+        assert strategy.get_optimal_action(_hand('5', '4', '7'), ten, False, False,
+                                           true_count=3) == 'S'
+        print("✓ 16 v T stands at high counts, two or three cards")
+
+        assert strategy.get_optimal_action(_hand('K', 'K'), six, True, True, true_count=6) == 'P'
+        assert strategy.get_optimal_action(_hand('K', 'K'), six, True, False, true_count=6) == 'S'
+        assert strategy.get_optimal_action(_hand('K', 'K'), six, True, True, true_count=0) == 'S'
+        assert strategy.get_optimal_action(_hand('6', '4'), ten, True, False, true_count=6) == 'D'
+        assert strategy.get_optimal_action(_hand('6', '4'), ten, False, False, true_count=6) == 'H'
+        print("✓ Splits and doubles deviate only when allowed")
+
+        counter = CardCounter('hi-lo', num_decks=6)
+        counter.update_count(Card('5', 'hearts'))
+        before = (counter.running_count, counter.cards_seen)
+        with_cards = counter.get_true_count_with([Card('2', 'clubs'), Card('3', 'clubs')], 52)
+        assert with_cards == 3.0 and (counter.running_count, counter.cards_seen) == before
+        print("✓ Visible cards count toward the playing true count without being recorded")
+        return True
+    except Exception as e:
+        print(f"✗ Strategy lookup test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Index Plays Test ===\n")
+
+    tests = [
+        test_count_composition,
+        test_generated_indices,
+        test_charts_and_cache,
+        test_strategy_lookup
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Index Plays Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test Kelly sizing over full outcome distributions"""
+
+import sys
+from betting_strategy import BettingStrategyCalculator
+from counting_systems import get_counting_system
+from ev_calculator import EVCalculator
+from ev_table import EVTable
+from kelly import log_growth, optimal_fraction
+from settings import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def test_optimal_fraction():
+    """Test the growth-optimal fraction against known cases and a grid search"""
+    print("=== Testing Optimal Fraction ===")
+
+    try:
+        # Even money: bet the edge
+        fraction = optimal_fraction([-1.0, 1.0], [0.48, 0.52])
+        assert abs(fraction - 0.04) < 1e-6
+        assert optimal_fraction([-1.0, 1.0], [0.52, 0.48]) == 0.0
+        assert abs(optimal_fraction([-1.0, 1.0], [0.5, 0.5], shift=0.04) - 0.04 / (1 - 0.04 ** 2)) \
+            < 1e-4
+        print("✓ Even-money bets size to the edge, nothing without one")
+
+        # Blackjack-like round: naturals, doubles and split losses
+        results = [-4.0, -2.0, -1.0, 0.0, 1.0, 1.5, 2.0, 4.0]
+        probabilities = [0.002, 0.04, 0.429, 0.085, 0.341, 0.048, 0.053, 0.002]
+        fraction = optimal_fraction(results, probabilities)
+        grid = max((f / 100000 for f in range(0, 20001)),
+                   key=lambda f: log_growth(f, results, probabilities))
+        assert abs(fraction - grid) < 2e-5, (fraction, grid)
+        mean = sum(r * p for r, p in zip(results, probabilities))
+        second = sum(r * r * p for r, p in zip(results, probabilities))
+        assert fraction < mean  # Variance above one shrinks the bet below the edge
+        assert abs(fraction - mean / (second - mean * mean)) < 0.1 * fraction
+        print(f"✓ Fraction {fraction * 100:.3f}% maximizes log growth (edge {mean * 100:.2f}%)")
+
+        assert log_growth(0.2, results, probabilities) < 0
+        assert log_growth(0.26, results, probabilities) == float('-inf')
+        print("✓ Overbetting shrinks the bankroll; the worst loss bounds the fraction")
+        return True
+    except Exception as e:
+        print(f"✗ Optimal fraction test failed: {e}")
+        return False
+
+def test_kelly_bets():
+    """Test Kelly bets read the simulated table's per-count fractions"""
+    print("\n=== Testing Kelly Bets ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping Kelly bets")
+        return True
+
+    try:
+        table = EVTable.simulate(get_counting_system('hi-lo'), settings.rule_set(), rounds=300000,
+                                 rng=np.random.default_rng(8))
+        for i, fraction in enumerate(table.kelly):
+            assert (fraction > 0) == (table.mean[i] > 0)
+            if fraction > 0:
+                # Outcomes spread wider than +/-1 trim the bet below edge / variance
+                assert fraction < table.mean[i] / table.variance[i] * 1.05
+        assert all(a <= b + 1e-9 for a, b in zip(table.kelly, table.kelly[1:]))
+        print(f"✓ Fractions rise from 0 to {table.kelly[-1] * 100:.3f}% of the bankroll")
+
+        calculator = EVCalculator()
+        calculator.set_ev_table(table)
+        top = table.centres[-1]
+        expected = 10000 * table.kelly_fraction(top) * 0.25
+        assert abs(calculator.calculate_kelly_bet(10000, top) - expected) < 1e-9
+        assert calculator.calculate_kelly_bet(10000, table.centres[0]) == 0
+
+        original = settings.betting_limits.betting_strategy
+        settings.betting_limits.betting_strategy = "kelly"
+        try:
+            betting = BettingStrategyCalculator(calculator)
+            limits = settings.betting_limits
+            bet = betting.calculate_bet_size(100000, top, 10)
+            kelly_bet = 100000 * table.kelly_fraction(top) * limits.kelly_fraction
+            assert bet == int(max(limits.min_bet, min(limits.max_bet, kelly_bet)))
+            assert betting.calculate_bet_size(100000, -3, 10) == limits.min_bet
+        finally:
+            settings.betting_limits.betting_strategy = original
+        print("✓ Kelly bets are table lookups")
+        return True
+    except Exception as e:
+        print(f"✗ Kelly bets test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Kelly Test ===\n")
+
+    tests = [
+        test_optimal_fraction,
+        test_kelly_bets
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Kelly Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test analytic and Monte Carlo risk of ruin"""
+
+import math
+import sys
+import risk_of_ruin
+from risk_of_ruin import (OutcomeModel, RiskOfRuinCalculator, analytic_risk_of_ruin,
+                          normal_cdf, trip_risk_of_ruin)
+from settings import BettingLimits, settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def test_closed_form():
+    """Test the lifetime and trip formulas against known values"""
+    print("=== Testing Closed Form ===")
+
+    try:
+        assert abs(analytic_risk_of_ruin(1.0, 10.0, 100.0) - math.exp(-2)) < 1e-12
+        assert analytic_risk_of_ruin(-0.1, 10.0, 1000.0) == 1.0
+        assert analytic_risk_of_ruin(0.5, 10.0, 0.0) == 1.0
+        print("✓ Lifetime risk exp(-2 * EV * bankroll / variance)")
+
+        # Trip risk grows with the trip and approaches the lifetime figure
+        trips = [trip_risk_of_ruin(1.0, 10.0, 100.0, rounds) for rounds in (10, 100, 1000, 100000)]
+        assert trips == sorted(trips)
+        assert abs(trips[-1] - math.exp(-2)) < 1e-6
+        # With no edge the reflection principle gives 2 * P(end below -bankroll)
+        fair = trip_risk_of_ruin(0.0, 10.0, 100.0, 400)
+        assert abs(fair - 2 * normal_cdf(-100 / (10 * math.sqrt(400)))) < 1e-12
+        print(f"✓ Trip risk rises to the lifetime value: {[round(r, 4) for r in trips]}")
+        return True
+    except Exception as e:
+        print(f"✗ Closed form test failed: {e}")
+        return False
+
+def test_monte_carlo_gamblers_ruin():
+    """Test the Monte Carlo reproduces the classic gambler's ruin"""
+    print("\n=== Testing Monte Carlo ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        flat = lambda true_counts: np.ones(len(true_counts))
+        # Win one unit 55% of the time: ruin from 10 units is (45/55)^10
+        model = OutcomeModel({0: {1.0: 55, -1.0: 45}})
+        calculator = RiskOfRuinCalculator(model, bankroll=10, bet_ramp=flat)
+        assert abs(calculator.win_rate - 0.1) < 1e-12
+        result = calculator.monte_carlo(3000, trajectories=20000, rng=np.random.default_rng(3))
+        exact = (45 / 55) ** 10
+        assert abs(result.risk_of_ruin - exact) < 4 * result.std_error
+        assert abs(result.analytic - exact) < 0.01
+        print(f"✓ Ruin {result.risk_of_ruin:.4f} ± {result.std_error:.4f} (exact {exact:.4f})")
+
+        # A stop-loss caps what a trip can lose
+        stopped = calculator.monte_carlo(3000, trajectories=5000, stop_loss=4,
+                                         rng=np.random.default_rng(4))
+        assert stopped.risk_of_ruin > result.risk_of_ruin
+        assert abs(stopped.risk_of_ruin - (45 / 55) ** 4) < 0.03
+        assert calculator.analytic(stop_loss=4) > calculator.analytic()
+        print(f"✓ Stop-loss of 4 units: {stopped.risk_of_ruin:.4f}")
+        return True
+    except Exception as e:
+        print(f"✗ Monte Carlo test failed: {e}")
+        return False
+
+def test_count_ramp_and_simulated_model():
+    """Test per-count bets weight the outcome histograms"""
+    print("\n=== Testing Count Ramp ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        model = OutcomeModel({-1: {1.0: 40, -1.0: 60}, 1: {1.0: 60, -1.0: 40}})
+        ramp = lambda true_counts: np.where(true_counts > 0, 3.0, 1.0)
+        win_rate, std_dev = model.win_rate_and_std_dev(ramp)
+        assert abs(win_rate - (0.5 * -0.2 + 0.5 * 0.6)) < 1e-12
+        assert abs(std_dev - math.sqrt(0.5 * 1 + 0.5 * 9 - win_rate ** 2)) < 1e-12
+        print(f"✓ 1-3 spread turns a fair game into ${win_rate:+.2f}/round")
+
+        simulated = OutcomeModel.simulate(20000, lanes=2000, rng=np.random.default_rng(5))
+        assert simulated.rounds == 20000
+        assert abs(sum(simulated.bucket_frequencies().values()) - 1) < 1e-12
+        limits = BettingLimits(min_bet=10, max_bet=100, default_bet=10, betting_strategy="flat")
+        calculator = RiskOfRuinCalculator(simulated, bankroll=1000, limits=limits)
+        assert 10 < calculator.std_dev < 13  # ~1.15 units at $10
+        try:
+            RiskOfRuinCalculator(simulated, limits=BettingLimits(betting_strategy="kelly"))
+            raise AssertionError("Kelly accepted")
+        except ValueError:
+            pass
+        print(f"✓ Simulated histograms over {len(simulated.histograms)} true counts")
+        return True
+    except Exception as e:
+        print(f"✗ Count ramp test failed: {e}")
+        return False
+
+def test_main_checks_ramp_first():
+    """Test the command line rejects a strategy without a ramp before simulating"""
+    print("\n=== Testing Command Line Ramp Check ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    limits = settings.betting_limits
+    original = (limits.betting_strategy, limits.optimal_ramp)
+    simulate = OutcomeModel.simulate
+
+    def no_simulation(*args, **kwargs):
+        raise AssertionError("simulated before checking the ramp")
+
+    try:
+        limits.betting_strategy, limits.optimal_ramp = "optimal", []
+        OutcomeModel.simulate = no_simulation
+        assert risk_of_ruin.main([]) == 1
+        print("✓ Optimal without a computed ramp exits with an error")
+        return True
+    except Exception as e:
+        print(f"✗ Command line ramp check failed: {e}")
+        return False
+    finally:
+        OutcomeModel.simulate = simulate
+        limits.betting_strategy, limits.optimal_ramp = original
+
+if __name__ == "__main__":
+    print("=== Risk of Ruin Test ===\n")
+
+    tests = [
+        test_closed_form,
+        test_monte_carlo_gamblers_ruin,
+        test_count_ramp_and_simulated_model,
+        test_main_checks_ramp_first
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Risk of Ruin Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Test the immutable RuleSet snapshot used by the engine"""
+
+import sys
+from dataclasses import FrozenInstanceError, replace
+from basic_strategy import BasicStrategy
+from game_engine import ArrayShoe, Card, GameRules, GameState, Hand, Shoe
+from settings import RuleSet, settings
+
+def _hand(*ranks) -> Hand:
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card(rank, 'hearts'))
+    return hand
+
+def test_rule_set_snapshot():
+    """Test RuleSet is frozen, hashable and mirrors the settings"""
+    print("=== Testing RuleSet Snapshot ===")
+
+    try:
+        rules = settings.rule_set()
+        assert rules.num_decks == settings.shoe_config.num_decks
+        assert rules.max_splits == settings.game_rules.max_splits
+        assert rules == settings.rule_set()
+        assert hash(rules) == hash(settings.rule_set())
+        print("✓ Snapshot mirrors settings and is hashable")
+
+        try:
+            rules.max_splits = 1
+            assert False, "RuleSet should be immutable"
+        except FrozenInstanceError:
+            pass
+        print("✓ RuleSet is immutable")
+
+        h17 = replace(rules, dealer_stand_soft_17=False)
+        assert h17 != rules and h17.cache_key() != rules.cache_key()
+        # Cut card placement doesn't change the rules' cache key
+        deep = replace(rules, penetration=0.85, burn_card=False)
+        assert deep.cache_key() == rules.cache_key()
+        assert len({rules, h17, deep}) == 3
+        print("✓ cache_key ignores shoe cut settings")
+        return True
+    except Exception as e:
+        print(f"✗ RuleSet snapshot test failed: {e}")
+        return False
+
+def test_engine_uses_captured_rules():
+    """Test game state and shoes follow their own rules, not later settings edits"""
+    print("\n=== Testing Engine Uses Captured Rules ===")
+
+    original_max = settings.game_rules.max_splits
+    try:
+        rules = replace(settings.rule_set(), num_decks=2, max_splits=0,
+                        dealer_stand_soft_17=False, blackjack_payout=1.2)
+
+        for shoe_class in (Shoe, ArrayShoe):
+            shoe = shoe_class(rules=rules)
+            assert shoe.num_decks == 2 and shoe.rules is rules
+        print("✓ Shoes take deck count from the rule set")
+
+        game = GameState(rules=rules)
+        assert game.shoe.num_decks == 2
+        game.start_new_hand(25)
+        game.phase = "playing"
+        game.player_hands[0].cards = [Card('8', 'hearts'), Card('8', 'spades')]
+        assert not game.can_split_current_hand()
+        print("✓ Split limit comes from the game's rules")
+
+        soft_17 = _hand('A', '6')
+        assert GameRules.dealer_must_hit(soft_17, rules)
+        assert not GameRules.dealer_must_hit(soft_17, replace(rules, dealer_stand_soft_17=True))
+        outcome, payout = GameRules.get_hand_outcome(_hand('A', 'K'), _hand('10', '7'), rules)
+        assert outcome == "Blackjack!" and payout == 2.2
+        print("✓ Dealer hits soft 17 and 6:5 payout applied")
+
+        # Editing settings afterwards doesn't leak into an existing game
+        settings.game_rules.max_splits = 3
+        assert not game.can_split_current_hand()
+        assert BasicStrategy().get_optimal_action(
+            game.player_hands[0], Card('6', 'clubs'), True, True, game) == 'S'
+        print("✓ Existing game ignores later settings edits")
+
+        game.set_rules(settings.rule_set())
+        assert game.can_split_current_hand()
+        assert game.shoe.num_decks == settings.shoe_config.num_decks
+        print("✓ set_rules refreshes rules and rebuilds the shoe")
+        return True
+    except Exception as e:
+        print(f"✗ Captured rules test failed: {e}")
+        return False
+    finally:
+        settings.game_rules.max_splits = original_max
+
+def test_parallel_rule_sets():
+    """Test two rule sets can be used side by side in one process"""
+    print("\n=== Testing Parallel Rule Sets ===")
+
+    try:
+        strategy = BasicStrategy()
+        das = GameState(rules=replace(settings.rule_set(), double_after_split=True))
+        no_das = GameState(rules=replace(settings.rule_set(), double_after_split=False))
+        fours = _hand('4', '4')
+        five = Card('5', 'clubs')
+
+        for game in (das, no_das):
+            game.start_new_hand(25)
+            game.phase = "playing"
+            game.player_hands[0] = fours
+            game.active_hand_index = 0
+
+        assert strategy.get_optimal_action(fours, five, True, True, das) == 'P'
+        assert strategy.get_optimal_action(fours, five, True, True, no_das) == 'H'
+        first = strategy._compiled
+        assert strategy.get_optimal_action(fours, five, True, True, das) == 'P'
+        assert strategy.get_optimal_action(fours, five, True, True, no_das) == 'H'
+        assert strategy._compiled is first
+        print("✓ DAS and no-DAS games share one strategy with cached tables")
+        return True
+    except Exception as e:
+        print(f"✗ Parallel rule sets test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Rule Set Test ===\n")
+
+    tests = [
+        test_rule_set_snapshot,
+        test_engine_uses_captured_rules,
+        test_parallel_rule_sets
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Rule Set Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test online moments and the N0 / SCORE / DI metrics built on them"""
+
+import math
+import random
+import statistics
+import sys
+from ev_calculator import EVCalculator, RunningMoments
+
+def test_welford_and_merge():
+    """Test online moments match batch statistics and merge exactly"""
+    print("=== Testing Online Moments ===")
+
+    try:
+        rng = random.Random(8)
+        values = [rng.choice([-2, -1, -1, 0, 1, 1, 1.5, 2]) * rng.choice([10, 50]) for _ in range(20000)]
+
+        moments = RunningMoments()
+        for value in values:
+            moments.add(value)
+        assert moments.count == len(values)
+        assert abs(moments.mean - statistics.fmean(values)) < 1e-9
+        assert abs(moments.variance() - statistics.variance(values)) < 1e-6
+        print(f"✓ Mean {moments.mean:+.4f}, SD {moments.std_dev():.4f} match batch statistics")
+
+        # Uneven shards, including an empty one, merge back to the same moments
+        shards = [RunningMoments() for _ in range(4)]
+        for i, value in enumerate(values[:15000]):
+            shards[i % 3].add(value)
+        for value in values[15000:]:
+            shards[3].add(value)
+        merged = RunningMoments()
+        for shard in shards + [RunningMoments()]:
+            merged.merge(shard)
+        assert merged.count == moments.count
+        assert abs(merged.mean - moments.mean) < 1e-12
+        assert abs(merged.variance() - moments.variance()) < 1e-9
+        print("✓ Shards merge to the single-stream result")
+        return True
+    except Exception as e:
+        print(f"✗ Online moments test failed: {e}")
+        return False
+
+def test_numerical_stability():
+    """Test a large offset doesn't wipe out the variance"""
+    print("\n=== Testing Numerical Stability ===")
+
+    try:
+        # The mean dwarfs the spread, as a 10^8-round total does for a sum of squares
+        offset = 1e9
+        moments = RunningMoments()
+        total = 0.0
+        total_squares = 0.0
+        for i in range(100000):
+            value = offset + (1.0 if i % 2 else -1.0)
+            moments.add(value)
+            total += value
+            total_squares += value * value
+        naive = (total_squares - total * total / moments.count) / (moments.count - 1)
+        assert abs(moments.variance() - 1.0) < 1e-4  # sample variance is n/(n-1)
+        assert abs(naive - 1.0) > 1e-3  # the sum-of-squares formula falls apart
+        print(f"✓ Variance {moments.variance():.6f} (sum of squares gives {naive:.1f})")
+
+        # Pairwise merging of many shards stays stable too
+        merged = RunningMoments()
+        for _ in range(1000):
+            merged.merge(RunningMoments(100000, offset, 100000.0))
+        assert merged.count == 10 ** 8
+        assert abs(merged.variance() - 1.0) < 1e-6
+        print("✓ 10^8 rounds merged from 1000 shards")
+        return True
+    except Exception as e:
+        print(f"✗ Numerical stability test failed: {e}")
+        return False
+
+def test_derived_metrics():
+    """Test win rate, N0, SCORE and DI against their definitions"""
+    print("\n=== Testing Derived Metrics ===")
+
+    try:
+        # A counter winning $0.10/round with a $11.50 SD
+        moments = RunningMoments(count=10 ** 6, mean=0.10, m2=11.5 ** 2 * (10 ** 6 - 1))
+        assert abs(moments.std_dev() - 11.5) < 1e-9
+        assert abs(moments.win_rate_per_100() - 10.0) < 1e-9
+        assert abs(moments.n0() - 13225.0) < 1e-6
+        assert abs(moments.desirability_index() - 1000 * 0.10 / 11.5) < 1e-9
+        assert abs(moments.score() - moments.desirability_index() ** 2) < 1e-9
+        assert abs(moments.score() * moments.n0() - 10 ** 6) < 1e-3
+        print(f"✓ N0 {moments.n0():,.0f}, DI {moments.desirability_index():.2f}, "
+              f"SCORE {moments.score():.2f}")
+
+        losing = RunningMoments(count=100, mean=-0.5, m2=99.0)
+        assert losing.n0() == math.inf and losing.score() == 0.0
+        assert losing.desirability_index() < 0
+        assert RunningMoments().std_dev() == 0.0 and RunningMoments().desirability_index() == 0.0
+        print("✓ No edge: N0 infinite, SCORE zero")
+
+        calculator = EVCalculator()
+        for bet, result in [(100, 200), (100, -100), (100, 0)]:
+            calculator.update_session_ev(bet, 1.0, result)
+        stats = calculator.session_stats
+        assert abs(stats.get_variance() - statistics.variance([200, -100, 0])) < 1e-9
+        assert stats.get_ev_difference() == stats.total_actual_result - stats.total_expected_ev
+        summary = stats.get_session_summary()
+        assert abs(summary['win_rate_per_100'] - 100 * 100 / 3) < 1e-9
+        assert {'std_dev', 'n0', 'score', 'desirability_index'} <= set(summary)
+        stats.reset()
+        assert stats.result_moments.count == 0
+        print("✓ SessionStats reports per-hand variance and metrics")
+        return True
+    except Exception as e:
+        print(f"✗ Derived metrics test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Running Moments Test ===\n")
+
+    tests = [
+        test_welford_and_merge,
+        test_numerical_stability,
+        test_derived_metrics
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Running Moments Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test injectable shoe RNGs and bulk shuffling"""
+
+import random
+import sys
+from collections import Counter
+from game_engine import ArrayShoe, CODE_RANK_INDEX, Shoe, np, shuffled_shoes
+
+def _deal(shoe, n=20):
+    return [str(shoe.deal_card()) for _ in range(n)]
+
+def test_seeded_shoes():
+    """Test seeded generators reproduce shoes and stay independent"""
+    print("=== Testing Seeded Shoes ===")
+
+    try:
+        for shoe_class in (Shoe, ArrayShoe):
+            first = shoe_class(num_decks=2, rng=random.Random(42))
+            second = shoe_class(num_decks=2, rng=random.Random(42))
+            other = shoe_class(num_decks=2, rng=random.Random(43))
+            assert _deal(first) == _deal(second)
+            assert _deal(shoe_class(num_decks=2, rng=random.Random(42))) != _deal(other)
+
+            # Reshuffling continues the same stream
+            first.shuffle()
+            second.shuffle()
+            assert _deal(first) == _deal(second)
+            print(f"✓ {shoe_class.__name__} reproducible with random.Random")
+
+        if np is None:
+            print("✓ NumPy not installed - skipping Generator checks")
+            return True
+
+        for shoe_class in (Shoe, ArrayShoe):
+            first = shoe_class(num_decks=2, rng=np.random.default_rng(7))
+            second = shoe_class(num_decks=2, rng=np.random.default_rng(7))
+            assert _deal(first) == _deal(second)
+            counts = Counter(str(card) for card in first.cards)
+            assert sum(counts.values()) == first.cards_remaining()
+            print(f"✓ {shoe_class.__name__} reproducible with a PCG64 Generator")
+        return True
+    except Exception as e:
+        print(f"✗ Seeded shoes test failed: {e}")
+        return False
+
+def test_bulk_shuffle():
+    """Test bulk permutations form valid shoes that ArrayShoe can deal"""
+    print("\n=== Testing Bulk Shuffle ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping bulk shuffle")
+        return True
+
+    try:
+        shoes = shuffled_shoes(500, 6, np.random.default_rng(1))
+        assert shoes.shape == (500, 312) and shoes.dtype == np.uint8
+        expected = np.sort(np.tile(np.arange(52), 6))
+        assert (np.sort(shoes, axis=1) == expected).all()
+        assert len({row.tobytes() for row in shoes}) == 500
+        print("✓ 500 distinct 6-deck permutations in one call")
+
+        again = shuffled_shoes(500, 6, np.random.default_rng(1))
+        assert (shoes == again).all()
+        assert (shuffled_shoes(3, 1, random.Random(9)) == shuffled_shoes(3, 1, random.Random(9))).all()
+        print("✓ Bulk shuffles are reproducible from a seed")
+
+        shoe = ArrayShoe(num_decks=6, rng=random.Random(0))
+        shoe.load_order(shoes[3])
+        dealt = [shoe.deal_card().code for _ in range(10)]
+        start = 1 if shoe.rules.burn_card else 0
+        assert dealt == list(shoes[3][start:start + 10])
+        ranks = Counter(CODE_RANK_INDEX[code] for code in dealt)
+        for rank_index, count in ranks.items():
+            expected_left = (96 if rank_index == 8 else 24) - count
+            assert shoe.rank_counts[rank_index] == expected_left
+        print("✓ ArrayShoe deals a pre-generated order")
+        return True
+    except Exception as e:
+        print(f"✗ Bulk shuffle test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Shoe RNG Test ===\n")
+
+    tests = [
+        test_seeded_shoes,
+        test_bulk_shuffle
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Shoe RNG Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Test the headless batch simulator"""
+
+import sys
+from counting_systems import get_counting_system
+from simulate import Simulator, SimulationResult, format_summary, main, run_parallel
+from ev_calculator import RunningMoments
+from settings import settings
+
+def test_simulation_run():
+    """Test a short simulation produces consistent statistics"""
+    print("=== Testing Simulation Run ===")
+
+    try:
+        original_strategy = settings.betting_limits.betting_strategy
+        settings.betting_limits.betting_strategy = "flat"
+
+        simulator = Simulator(bankroll=10000, path_interval=100)
+        result = simulator.run(1000)
+
+        settings.betting_limits.betting_strategy = original_strategy
+
+        assert result.rounds == 1000
+        assert result.hands >= result.rounds  # Splits add hands
+        assert result.total_wagered >= result.total_initial_bet
+        assert abs(result.final_bankroll - simulator.bankroll) < 1e-9
+        assert result.min_bankroll <= result.starting_bankroll
+        assert result.std_dev_units() > 0.5  # Blackjack SD is ~1.15 units
+        print(f"✓ {result.rounds} rounds, EV {result.ev_percentage():+.2f}%, "
+              f"SD {result.std_dev_units():.3f} units")
+
+        # Bankroll path sampled every 100 rounds plus the starting point
+        assert len(result.bankroll_path) == 11
+        assert result.bankroll_path[0] == (0, 10000)
+        assert result.bankroll_path[-1] == (1000, simulator.bankroll)
+        print("✓ Bankroll path recorded")
+
+        assert result.hands_per_second() > 0
+        assert abs(result.hands_per_second() - result.hands / result.elapsed) < 1e-9
+        print(f"✓ {result.hands_per_second():,.0f} hands/sec")
+        return True
+    except Exception as e:
+        print(f"✗ Simulation run test failed: {e}")
+        return False
+
+def test_counter_follows_shoe():
+    """Test every dealt card is counted and the count resets on shuffle"""
+    print("\n=== Testing Count Tracking ===")
+
+    try:
+        simulator = Simulator(bankroll=10000)
+        shuffles = 0
+        for _ in range(500):
+            if simulator.game_state.shoe.needs_shuffle:
+                shuffles += 1
+            simulator.play_round()
+            if simulator.counter.cards_seen != simulator.game_state.shoe.dealt_count:
+                print(f"✗ Counted {simulator.counter.cards_seen} cards, "
+                      f"shoe dealt {simulator.game_state.shoe.dealt_count}")
+                return False
+
+        assert shuffles > 0
+        print(f"✓ Count consistent with shoe across {shuffles} shuffles")
+        return True
+    except Exception as e:
+        print(f"✗ Count tracking test failed: {e}")
+        return False
+
+def test_summary_output():
+    """Test summary formatting and the command line entry point"""
+    print("\n=== Testing Summary Output ===")
+
+    try:
+        result = SimulationResult(rounds=2, hands=2, total_initial_bet=50,
+                                  net_result=25, moments=RunningMoments(2, 12.5, 312.5),
+                                  starting_bankroll=1000, min_bankroll=1000,
+                                  elapsed=1.0)
+        text = format_summary(result)
+        assert "Hands/sec" in text
+        assert result.ev_percentage() == 50.0
+        assert result.get_summary()['final_bankroll'] == 1025
+        print("✓ Summary formatting works")
+
+        original_strategy = settings.betting_limits.betting_strategy
+        exit_code = main(['--rounds', '50', '--betting', 'flat'])
+        settings.betting_limits.betting_strategy = original_strategy
+        assert exit_code == 0
+        print("✓ Command line entry point works")
+        return True
+    except Exception as e:
+        print(f"✗ Summary output test failed: {e}")
+        return False
+
+def test_parallel_reproducible():
+    """Test seeded chunked runs are identical for any worker count"""
+    print("\n=== Testing Parallel Runs ===")
+
+    try:
+        original_strategy = settings.betting_limits.betting_strategy
+        settings.betting_limits.betting_strategy = "flat"
+        try:
+            serial = run_parallel(2000, workers=1, seed=11, chunk_rounds=500, bankroll=5000)
+            pooled = run_parallel(2000, workers=2, seed=11, chunk_rounds=500, bankroll=5000)
+            other = run_parallel(2000, workers=1, seed=12, chunk_rounds=500, bankroll=5000)
+        finally:
+            settings.betting_limits.betting_strategy = original_strategy
+
+        for name in ('rounds', 'hands', 'total_initial_bet', 'total_wagered', 'net_result',
+                     'moments', 'unit_moments', 'min_bankroll', 'bankroll_path',
+                     'by_true_count'):
+            assert getattr(serial, name) == getattr(pooled, name), name
+        assert (serial.net_result, serial.moments) != (other.net_result, other.moments)
+        print("✓ Same seed reproduces bit for bit with 1 or 2 workers")
+
+        # The counting system travels with each chunk rather than via settings
+        zen = get_counting_system('zen')
+        zen_serial = run_parallel(2000, workers=1, seed=11, chunk_rounds=500, bankroll=5000,
+                                  system=zen)
+        zen_pooled = run_parallel(2000, workers=2, seed=11, chunk_rounds=500, bankroll=5000,
+                                  system=zen)
+        assert zen_serial.by_true_count == zen_pooled.by_true_count
+        assert zen_serial.by_true_count != serial.by_true_count
+        print("✓ Workers count with the system they are given")
+
+        assert serial.rounds == 2000
+        assert sum(bucket[0] for bucket in serial.by_true_count.values()) == 2000
+        assert abs(sum(bucket[2] for bucket in serial.by_true_count.values())
+                   - serial.net_result) < 1e-6
+        assert serial.bankroll_path[-1] == (2000, serial.final_bankroll)
+        print(f"✓ Chunks merged: {len(serial.by_true_count)} true count buckets")
+        return True
+    except Exception as e:
+        print(f"✗ Parallel run test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Simulator Test ===\n")
+
+    tests = [
+        test_simulation_run,
+        test_counter_follows_shoe,
+        test_summary_output,
+        test_parallel_reproducible
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Simulator Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
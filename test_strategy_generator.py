@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Test rule-aware basic strategy chart generation"""
+
+import dataclasses
+import os
+import sys
+import tempfile
+from basic_strategy import BasicStrategy
+from game_engine import Card, Hand
+from settings import settings
+from strategy_generator import StrategyCharts, charts_path
+
+def _hand(*ranks):
+    hand = Hand()
+    for rank in ranks:
+        hand.add_card(Card(rank, 'clubs'))
+    return hand
+
+def _typed_charts():
+    strategy = BasicStrategy()
+    return StrategyCharts('typed', 6, strategy.hard_table, strategy.soft_table,
+                          strategy.pair_table)
+
+def test_default_rules():
+    """Test charts solved for the default rules match the hand-typed ones"""
+    print("=== Testing Default Rule Charts ===")
+
+    try:
+        rules = dataclasses.replace(settings.rule_set(), num_decks=6, dealer_stand_soft_17=True,
+                                    double_after_split=True, double_on_any_two=True)
+        charts = StrategyCharts.generate(rules)
+        differences = _typed_charts().differences(charts)
+        # Only A,A v 6 when it can't be split (a marginal double) may differ
+        assert set(differences) <= {"S12 v 6: H -> D"}, differences
+        print(f"✓ Solved charts agree with the typed charts ({len(differences)} marginal cell)")
+        return True
+    except Exception as e:
+        print(f"✗ Default rule charts test failed: {e}")
+        return False
+
+def test_rule_changes():
+    """Test the charts follow H17, no-DAS and restricted doubling"""
+    print("\n=== Testing Rule Changes ===")
+
+    try:
+        base = dataclasses.replace(settings.rule_set(), num_decks=6, dealer_stand_soft_17=True,
+                                   double_after_split=True, double_on_any_two=True)
+        h17 = StrategyCharts.generate(dataclasses.replace(base, dealer_stand_soft_17=False))
+        assert h17.hard[11][9] == 'D' and h17.soft[19][4] == 'Ds'
+        print("✓ H17 doubles 11 v A and soft 19 v 6")
+
+        no_das = StrategyCharts.generate(dataclasses.replace(base, double_after_split=False))
+        assert no_das.pairs['4'][3] == 'H' and no_das.pairs['2'][0] == 'H'
+        assert no_das.pairs['8'] == ['P'] * 10 and no_das.pairs['A'] == ['P'] * 10
+        print("✓ Without DAS, 4,4 and 2,2 lose their marginal splits")
+
+        restricted = StrategyCharts.generate(dataclasses.replace(base, double_on_any_two=False))
+        assert 'D' not in restricted.soft[17] and 'Ds' not in restricted.soft[18]
+        assert restricted.hard[10][0] == 'D'
+        print("✓ Doubling only on 9-11 removes soft doubles")
+        return True
+    except Exception as e:
+        print(f"✗ Rule changes test failed: {e}")
+        return False
+
+def test_cache_and_strategy():
+    """Test the disk cache and switching BasicStrategy between charts"""
+    print("\n=== Testing Cache and Strategy Switching ===")
+
+    try:
+        rules = dataclasses.replace(settings.rule_set(), num_decks=1, double_after_split=False)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            charts = StrategyCharts.load_or_generate(rules, cache_dir=cache_dir)
+            assert os.path.exists(charts_path(rules, cache_dir))
+            assert StrategyCharts.load_or_generate(rules, cache_dir=cache_dir) == charts
+        assert charts.rules_key == rules.cache_key()
+        print("✓ Charts cached by rule hash and round-trip through JSON")
+
+        strategy = BasicStrategy()
+        ten = Card('K', 'clubs')
+        assert strategy.get_optimal_action(_hand('7', '7'), ten, True, True) == 'H'
+        strategy.use_charts(charts)
+        assert strategy.charts_key == rules.cache_key()
+        # Single deck stands on 7,7 v T (a ten and two sevens are out)
+        assert strategy.get_optimal_action(_hand('7', '7'), ten, True, True) == 'S'
+        strategy.use_charts(None)
+        assert strategy.charts_key is None
+        assert strategy.get_optimal_action(_hand('7', '7'), ten, True, True) == 'H'
+        print("✓ BasicStrategy switches to generated charts and back")
+        return True
+    except Exception as e:
+        print(f"✗ Cache and strategy test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Strategy Generator Test ===\n")
+
+    tests = [
+        test_default_rules,
+        test_rule_changes,
+        test_cache_and_strategy
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Strategy Generator Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
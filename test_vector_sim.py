@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Test the vectorized NumPy simulator against the scalar engine"""
+
+import dataclasses
+import random
+import sys
+from simulate import Simulator
+from settings import settings
+
+try:
+    import numpy as np
+    from vector_sim import VectorSimulator, flat_ramp, spread_ramp
+except ImportError:
+    np = None
+
+def test_matches_scalar_engine():
+    """Test EV, SD and bet mix agree with the scalar simulator"""
+    print("=== Testing Vector vs Scalar ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        vector = VectorSimulator(lanes=5000, rng=np.random.default_rng(11), bet_ramp=flat_ramp(1))
+        fast = vector.run(200000)
+        assert fast.rounds == 200000
+        assert fast.hands > fast.rounds  # some rounds split via the scalar fallback
+        assert sum(bucket[0] for bucket in fast.by_true_count.values()) == fast.rounds
+
+        original_strategy = settings.betting_limits.betting_strategy
+        settings.betting_limits.betting_strategy = "flat"
+        try:
+            scalar = Simulator(bankroll=10 ** 9, rules=vector.rules, rng=random.Random(11))
+            slow = scalar.run(50000)
+        finally:
+            settings.betting_limits.betting_strategy = original_strategy
+
+        # Standard error of the difference is about 0.6% of a unit
+        assert abs(fast.ev_percentage() - slow.ev_percentage()) < 2.5
+        assert abs(fast.std_dev_units() - slow.std_dev_units()) < 0.05
+        fast_mix = fast.total_wagered / fast.total_initial_bet
+        slow_mix = slow.total_wagered / slow.total_initial_bet
+        assert abs(fast_mix - slow_mix) < 0.02
+        print(f"✓ EV {fast.ev_percentage():+.2f}% vs {slow.ev_percentage():+.2f}%, "
+              f"SD {fast.std_dev_units():.3f} vs {slow.std_dev_units():.3f}")
+
+        print(f"✓ {fast.hands_per_second():,.0f} hands/sec vectorized, "
+              f"{slow.hands_per_second():,.0f} scalar")
+        return True
+    except Exception as e:
+        print(f"✗ Vector vs scalar test failed: {e}")
+        return False
+
+def test_reproducible_and_ramp():
+    """Test seeded runs repeat and the count ramp bets more at high counts"""
+    print("\n=== Testing Seeds and Bet Ramp ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        first = VectorSimulator(lanes=500, rng=np.random.default_rng(5)).run(5000)
+        second = VectorSimulator(lanes=500, rng=np.random.default_rng(5)).run(5000)
+        assert first.net_result == second.net_result and first.hands == second.hands
+        print("✓ Same seed, same result")
+
+        limits = settings.betting_limits
+        ramp = spread_ramp(limits)
+        bets = ramp(np.array([-3.0, limits.spread_start_count - 0.5, 3.0, 10.0]))
+        assert bets[0] == bets[1] == limits.min_bet
+        assert limits.min_bet <= bets[2] <= bets[3] <= limits.max_bet
+
+        result = VectorSimulator(lanes=2000, rng=np.random.default_rng(2), bet_ramp=ramp).run(20000)
+        low = [b for tc, b in result.by_true_count.items() if tc < limits.spread_start_count - 1]
+        high = [b for tc, b in result.by_true_count.items() if tc >= 3]
+        assert all(b[1] == b[0] * limits.min_bet for b in low)
+        assert all(b[1] > b[0] * limits.min_bet for b in high if b[0])
+        print("✓ Spread ramp follows the true count")
+        return True
+    except Exception as e:
+        print(f"✗ Seed/ramp test failed: {e}")
+        return False
+
+def test_shoe_runs_dry():
+    """Test a lane that runs out of cards mid-round reshuffles instead of repeating cards"""
+    print("\n=== Testing Shoe Overrun ===")
+
+    if np is None:
+        print("✓ NumPy not installed - skipping")
+        return True
+
+    try:
+        rules = dataclasses.replace(settings.rule_set(), num_decks=1, penetration=0.9,
+                                    burn_card=True)
+        vector = VectorSimulator(lanes=4, rules=rules, rng=np.random.default_rng(8),
+                                 bet_ramp=flat_ramp(1))
+        vector._reset()
+        lanes = np.arange(4)
+        vector._cursor[:2] = vector.shoe_size
+        old_codes = vector._codes[:2].copy()
+        vector._draw(lanes)
+        assert vector.start == 1 and list(vector._cursor) == [2, 2, 2, 2]
+        assert (vector._codes[:2] != old_codes).any()
+        print("✓ Dry lanes get a fresh shoe and skip its burn card")
+
+        # A split round that empties the shoe carries on in the reshuffled lane
+        vector._split_lane = 1
+        vector._scalar_shoe.load_order(vector._codes[1], vector.shoe_size)
+        card = vector._scalar_shoe.deal_card()
+        assert card is not None and vector._scalar_shoe._cursor == vector.start + 1
+        assert vector._scalar_shoe._codes.tobytes() == vector._codes[1].tobytes()
+        print("✓ Split rounds reshuffle their lane too")
+
+        result = vector.run(20000)
+        assert result.rounds == 20000
+        assert sum(bucket[0] for bucket in result.by_true_count.values()) == 20000
+        print(f"✓ Single deck at 90% penetration: EV {result.ev_percentage():+.2f}%")
+        return True
+    except Exception as e:
+        print(f"✗ Shoe overrun test failed: {e}")
+        return False
+
+if __name__ == "__main__":
+    print("=== Vector Simulator Test ===\n")
+
+    tests = [
+        test_matches_scalar_engine,
+        test_reproducible_and_ramp,
+        test_shoe_runs_dry
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        if test():
+            passed += 1
+        else:
+            failed += 1
+
+    print(f"\n=== Vector Simulator Test Summary ===")
+    print(f"✓ Passed: {passed}")
+    print(f"✗ Failed: {failed}")
+
+    sys.exit(0 if failed == 0 else 1)
@@ -660,4 +660,79 @@ class StrategyDisplay:
     
     def clear_feedback(self):
         """Clear feedback display"""
-        self.feedback_label.config(text="")
\ No newline at end of file
+        self.feedback_label.config(text="")
+
+
+class ProbabilityDisplay:
+    """Display the exact EV of each legal action for the active hand"""
+    
+    ACTION_ORDER = ('hit', 'stand', 'double', 'split')
+    
+    def __init__(self, parent: tk.Widget):
+        # Remember our slot in the pack order so re-showing doesn't move the panel
+        siblings = parent.pack_slaves()
+        self._pack_after = siblings[-1] if siblings else None
+        
+        self.frame = tk.Frame(parent, bg=TABLE_COLOR)
+        self.frame.pack(fill=tk.X, padx=20, pady=5)
+        
+        self.title_label = tk.Label(
+            self.frame,
+            text="Action EV:",
+            font=MAIN_FONT,
+            bg=TABLE_COLOR,
+            fg=TEXT_COLOR
+        )
+        self.title_label.grid(row=0, column=0, padx=10)
+        
+        self.action_labels = {}
+        for column, action in enumerate(self.ACTION_ORDER, start=1):
+            label = tk.Label(
+                self.frame,
+                text="",
+                font=MAIN_FONT,
+                bg=TABLE_COLOR,
+                fg=TEXT_COLOR,
+                width=16
+            )
+            label.grid(row=0, column=column, padx=5)
+            self.action_labels[action] = label
+        
+        self.visible = True
+        self.set_visible(settings.display_prefs.show_probabilities)
+    
+    def set_visible(self, visible: bool):
+        """Show or hide the panel"""
+        if visible and not self.visible:
+            if self._pack_after is not None:
+                self.frame.pack(fill=tk.X, padx=20, pady=5, after=self._pack_after)
+            else:
+                self.frame.pack(fill=tk.X, padx=20, pady=5)
+        elif not visible and self.visible:
+            self.frame.pack_forget()
+        self.visible = visible
+    
+    def show_calculating(self):
+        """Indicate a calculation is in progress"""
+        for label in self.action_labels.values():
+            label.config(text="", fg=TEXT_COLOR)
+        self.title_label.config(text="Action EV: calculating...")
+    
+    def show_evs(self, evs: dict):
+        """Show per-action EVs, highlighting the best"""
+        self.title_label.config(text="Action EV:")
+        best = max(evs, key=evs.get) if evs else None
+        for action, label in self.action_labels.items():
+            if action in evs:
+                label.config(
+                    text=f"{action.title()}: {evs[action] * 100:+.1f}%",
+                    fg=SUCCESS_COLOR if action == best else TEXT_COLOR
+                )
+            else:
+                label.config(text="", fg=TEXT_COLOR)
+    
+    def clear(self):
+        """Clear the EV display"""
+        self.title_label.config(text="Action EV:")
+        for label in self.action_labels.values():
+            label.config(text="", fg=TEXT_COLOR)
@@ -0,0 +1,456 @@
+"""Vectorized basic-strategy simulator - plays many independent shoes at once
+
+Each lane is its own shoe, held as a row of card codes from shuffled_shoes().
+Every step plays one round in every lane with NumPy: hand and dealer states
+advance through the hand_state transition table, decisions come from the
+compiled BasicStrategy table, and finished hands are masked out of the hit
+and dealer loops. Rounds that split hand off to the scalar engine
+(GameState + Simulator) for that lane and resume the vector path afterwards.
+
+Bets depend only on the lane's true count in the selected counting system
+(flat or a count ramp); there is no per-lane bankroll, so bankroll-dependent
+sizing such as Kelly isn't supported here - use simulate.Simulator for that.
+
+    python -m vector_sim --rounds 10000000 --lanes 20000 --seed 1
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; vector_sim is unavailable without it
+    np = None
+
+from basic_strategy import BasicStrategy
+from counting_systems import ACE_INDEX, CountingSystem, get_counting_system
+from ev_calculator import RunningMoments
+from game_engine import ArrayShoe, CARD_POOL, CODE_RANK_INDEX, GameState, Hand, shuffled_shoes
+from hand_state import (
+    EMPTY_STATE, NUM_RANKS, NUM_STATES, STATE_BUST, STATE_NATURAL, STATE_PAIR,
+    STATE_VALUE, TRANSITIONS, dealer_hits_table
+)
+from settings import BettingLimits, RuleSet, settings
+from simulate import SimulationResult, Simulator, format_count_table, format_summary
+from strategy_generator import StrategyCharts
+
+# Decision codes for the compiled strategy table
+HIT, STAND, DOUBLE, SPLIT = 0, 1, 2, 3
+ACTION_CODES = {'H': HIT, 'S': STAND, 'D': DOUBLE, 'Ds': DOUBLE, 'P': SPLIT}
+
+BetRamp = Callable[['np.ndarray'], 'np.ndarray']
+
+
+def flat_ramp(bet: Optional[float] = None) -> BetRamp:
+    """Same bet at every count (default: settings default bet)"""
+    if bet is None:
+        bet = settings.betting_limits.default_bet
+    return lambda true_counts: np.full(true_counts.shape, float(bet))
+
+
+def spread_ramp(limits: Optional[BettingLimits] = None) -> BetRamp:
+    """Vectorized form of the 'spread' betting strategy, without the bankroll cap"""
+    if limits is None:
+        limits = settings.betting_limits
+    start = limits.spread_start_count
+    count_range = 5.0 - start
+    multiplier_range = limits.spread_max_multiplier - limits.spread_min_multiplier
+
+    def ramp(true_counts: 'np.ndarray') -> 'np.ndarray':
+        effective = np.minimum(true_counts - start, count_range)
+        multiplier = limits.spread_min_multiplier + effective / count_range * multiplier_range
+        bets = np.clip(limits.min_bet * multiplier, limits.min_bet, limits.max_bet)
+        bets = np.floor(bets)
+        return np.where(true_counts < start, float(limits.min_bet), bets)
+    return ramp
+
+
+def table_ramp(steps: List[List[float]]) -> BetRamp:
+    """Vectorized step ramp from [true count, bet] pairs (the "optimal" strategy)"""
+    counts = np.array([step[0] for step in steps], dtype=float)
+    bets = np.array([step[1] for step in steps], dtype=float)
+
+    def ramp(true_counts: 'np.ndarray') -> 'np.ndarray':
+        index = np.searchsorted(counts, true_counts, side='right') - 1
+        return bets[np.maximum(index, 0)]
+    return ramp
+
+
+def ramp_for_limits(limits: Optional[BettingLimits] = None) -> BetRamp:
+    """Bet ramp for the configured strategy; Kelly sizing depends on bankroll and has none"""
+    if limits is None:
+        limits = settings.betting_limits
+    strategy = limits.betting_strategy
+    if strategy == "flat":
+        return flat_ramp(limits.default_bet)
+    if strategy == "spread":
+        return spread_ramp(limits)
+    if strategy == "optimal" and limits.optimal_ramp:
+        bounded = [[count, min(max(bet, limits.min_bet), limits.max_bet)]
+                   for count, bet in limits.optimal_ramp]
+        return table_ramp(bounded)
+    raise ValueError(f"No fixed bet ramp for the '{strategy}' strategy")
+
+
+class _LaneShoe(ArrayShoe):
+    """Scalar shoe for a lane's split round; asks for a fresh order if it runs dry mid-round"""
+
+    def __init__(self, rules: RuleSet, refill: Callable[[], 'np.ndarray']):
+        super().__init__(rules=rules, rng=random.Random(0))
+        self._refill = refill
+        self.ran_dry = False
+
+    def deal_card(self):
+        if self.cards_remaining() <= 0:
+            self.load_order(self._refill())
+            self.ran_dry = True
+        return super().deal_card()
+
+
+def _batch_moments(values: 'np.ndarray') -> RunningMoments:
+    """Moments of one step's results, ready to merge into the running totals"""
+    mean = float(values.mean())
+    deviations = values - mean
+    return RunningMoments(len(values), mean, float(deviations @ deviations))
+
+
+class VectorSimulator:
+    """Plays rounds of basic strategy across many NumPy lanes"""
+
+    def __init__(self, lanes: int = 10000, rules: Optional[RuleSet] = None,
+                 rng=None, bet_ramp: Optional[BetRamp] = None, record_outcomes: bool = False,
+                 system: Optional[CountingSystem] = None,
+                 charts: Optional[StrategyCharts] = None):
+        if np is None:
+            raise ImportError("VectorSimulator requires numpy (pip install numpy)")
+        self.system = system if system is not None else get_counting_system()
+        self.rules = rules if rules is not None else settings.rule_set()
+        self.lanes = lanes
+        self.rng = rng if rng is not None else np.random.default_rng()
+        if bet_ramp is None:
+            limits = settings.betting_limits
+            bet_ramp = flat_ramp() if limits.betting_strategy == "kelly" else ramp_for_limits(limits)
+        self.bet_ramp = bet_ramp
+        # floor(true count) -> {result in initial-bet units: rounds}, when recording
+        self.record_outcomes = record_outcomes
+        self.outcome_counts: Dict[int, Dict[float, int]] = {}
+
+        rules = self.rules
+        self.shoe_size = rules.num_decks * 52
+        self.start = 1 if rules.burn_card else 0
+        self.penetration_cards = int(self.shoe_size * (1 - rules.penetration))
+
+        # Lookup tables as arrays
+        self._transitions = np.array(TRANSITIONS, dtype=np.int16).reshape(NUM_STATES, NUM_RANKS)
+        self._value = np.array(STATE_VALUE, dtype=np.int16)
+        self._bust = np.array(STATE_BUST, dtype=bool)
+        self._natural = np.array(STATE_NATURAL, dtype=bool)
+        self._pair = np.array(STATE_PAIR, dtype=np.int16) >= 0
+        self._dealer_hits = np.array(dealer_hits_table(rules.dealer_stand_soft_17), dtype=bool)
+        self._code_rank = np.array(CODE_RANK_INDEX, dtype=np.int8)
+        self._code_tag = self.system.tag_array("code")
+
+        # [can_split * 2 + can_double, state, upcard] -> decision code
+        self.strategy = BasicStrategy()
+        if charts is not None:  # Generated for the rules; the typed charts otherwise
+            self.strategy.use_charts(charts)
+        self.charts = charts
+        compiled = self.strategy.compile(rules)
+        self._decisions = np.array([ACTION_CODES[action] for action in compiled.table],
+                                   dtype=np.int8).reshape(4, NUM_STATES, NUM_RANKS)
+        self._double_values = np.zeros(32, dtype=bool)
+        self._double_values[[9, 10, 11]] = True
+
+        # Scalar engine for rounds that split
+        self._scalar = Simulator(bankroll=0, rules=rules, charts=charts)
+        self._split_lane = 0
+        self._scalar_shoe = _LaneShoe(rules, self._refill_split_lane)
+        self._scalar.game_state.shoe = self._scalar_shoe
+
+        self._codes = None
+        self._ranks = None
+        self._running = None
+        self._aces = None
+        self._cursor = None
+
+    def _load_shoes(self, lanes: 'np.ndarray'):
+        """Deal fresh shuffled shoes into the given lanes"""
+        codes = shuffled_shoes(len(lanes), self.rules.num_decks, self.rng)
+        self._codes[lanes] = codes
+        self._ranks[lanes] = self._code_rank[codes]
+        # Running count before each position; the burn card is never seen
+        tags = self._code_tag[codes]
+        tags[:, :self.start] = 0
+        self._running[lanes, 1:] = np.cumsum(tags, axis=1)
+        if self._aces is not None:
+            aces = self._ranks[lanes] == ACE_INDEX
+            aces[:, :self.start] = False
+            self._aces[lanes, 1:] = np.cumsum(aces, axis=1)
+        self._cursor[lanes] = self.start
+
+    def _reset(self):
+        """Allocate lane storage and shuffle every lane"""
+        size = self.shoe_size
+        self._codes = np.zeros((self.lanes, size), dtype=np.uint8)
+        self._ranks = np.zeros((self.lanes, size), dtype=np.int8)
+        self._running = np.zeros((self.lanes, size + 1), dtype=self._code_tag.dtype)
+        if self.system.ace_side_count:
+            self._aces = np.zeros((self.lanes, size + 1), dtype=np.int16)
+        self._cursor = np.zeros(self.lanes, dtype=np.int64)
+        self._load_shoes(np.arange(self.lanes))
+
+    def _draw(self, lanes: 'np.ndarray') -> 'np.ndarray':
+        """Deal the next card's rank in each lane"""
+        # A long round after a deep cut can empty a shoe; like a dealer out of
+        # cards, reshuffle and keep dealing (the count starts over)
+        dry = lanes[self._cursor[lanes] >= self.shoe_size]
+        if len(dry):
+            self._load_shoes(dry)
+        position = self._cursor[lanes]
+        self._cursor[lanes] += 1
+        return self._ranks[lanes, position]
+
+    def _refill_split_lane(self) -> 'np.ndarray':
+        """Reshuffle the lane whose split round ran out of cards and return its new order"""
+        self._load_shoes(np.array([self._split_lane]))
+        return self._codes[self._split_lane]
+
+    def _true_counts(self, lanes: 'np.ndarray') -> 'np.ndarray':
+        """Betting true count per lane, as CardCounter.get_betting_true_count computes it"""
+        system = self.system
+        cursor = self._cursor[lanes]
+        remaining = self.shoe_size - cursor
+        running = self._running[lanes, cursor].astype(np.float64)
+        if not system.balanced:
+            # The initial running count is left out, so only the drift is removed
+            running -= system.deck_sum * (cursor - self.start) / 52
+        decks = np.maximum(remaining / 52, 0.5)
+        true_counts = running / decks
+        if system.ace_side_count:
+            surplus = 4 * self.rules.num_decks - self._aces[lanes, cursor] - remaining / 13
+            true_counts += system.ace_adjustment * surplus / decks
+        return true_counts
+
+    def run(self, rounds: int) -> SimulationResult:
+        """Play the given number of rounds and return aggregated results"""
+        result = SimulationResult()
+        self._reset()
+        start = time.perf_counter()
+
+        remaining = rounds
+        while remaining > 0:
+            active = min(self.lanes, remaining)
+            self._play_step(np.arange(active), result)
+            remaining -= active
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _play_step(self, lanes: 'np.ndarray', result: SimulationResult):
+        """Play one round in each lane"""
+        self._reshuffle_spent(lanes)
+
+        # Bet from each lane's true count
+        true_counts = self._true_counts(lanes)
+        bets = self.bet_ramp(true_counts)
+
+        units, hands, wagered = self._play_round(lanes)
+        self._record(result, bets, units, hands, wagered, true_counts)
+        if self.record_outcomes:
+            self._record_outcomes(true_counts, units)
+
+    def _reshuffle_spent(self, lanes: 'np.ndarray'):
+        """Reshuffle lanes that reached the cut card"""
+        dealt = self._cursor[lanes] - self.start
+        spent = lanes[dealt >= self.penetration_cards]
+        if len(spent):
+            self._load_shoes(spent)
+
+    def _play_round(self, lanes: 'np.ndarray'):
+        """Deal and play one round per lane; returns (units, hands, wagered units) arrays"""
+        transitions = self._transitions
+
+        # Deal player, dealer, player, dealer
+        p1 = self._draw(lanes)
+        upcard = self._draw(lanes)
+        p2 = self._draw(lanes)
+        hole = self._draw(lanes)
+        player = transitions[transitions[EMPTY_STATE, p1], p2]
+        dealer = transitions[transitions[EMPTY_STATE, upcard], hole]
+
+        units = np.zeros(len(lanes))
+        multiplier = np.ones(len(lanes))
+        hands = np.ones(len(lanes), dtype=np.int64)
+        wagered = np.ones(len(lanes))
+
+        # Naturals settle immediately without further cards
+        player_natural = self._natural[player]
+        dealer_natural = self._natural[dealer]
+        units[player_natural & ~dealer_natural] = self.rules.blackjack_payout
+        units[dealer_natural & ~player_natural] = -1.0
+        playing = ~(player_natural | dealer_natural)
+
+        # First decision: split, double, hit or stand
+        rules = self.rules
+        can_split = self._pair[player] & (rules.max_splits > 0)
+        can_double = rules.double_on_any_two | self._double_values[self._value[player]]
+        flags = can_split.astype(np.int8) * 2 + can_double
+        decision = self._decisions[flags, player, upcard]
+
+        split = playing & (decision == SPLIT)
+        doubled = playing & (decision == DOUBLE)
+        hitting = playing & (decision == HIT)
+        rows = np.flatnonzero(playing)
+        self._on_decisions(lanes[rows], player[rows], upcard[rows])
+
+        if doubled.any():
+            rows = np.flatnonzero(doubled)
+            player[rows] = transitions[player[rows], self._draw(lanes[rows])]
+            multiplier[rows] = 2.0
+            wagered[rows] = 2.0
+
+        # Hit until stand, bust or 21
+        rows = np.flatnonzero(hitting)
+        while len(rows):
+            player[rows] = transitions[player[rows], self._draw(lanes[rows])]
+            state = player[rows]
+            rows = rows[~(self._bust[state] | (self._value[state] == 21))]
+            self._on_decisions(lanes[rows], player[rows], upcard[rows])
+            rows = rows[self._decisions[0, player[rows], upcard[rows]] == HIT]
+
+        # Splits finish in the scalar engine, dealer included
+        for row in np.flatnonzero(split):
+            units[row], hands[row], wagered[row] = self._play_split(lanes[row], p1[row], p2[row],
+                                                                    upcard[row], hole[row])
+
+        # Dealer draws for every round still in play (even if the player busted)
+        settling = playing & ~split
+        rows = np.flatnonzero(settling & self._dealer_hits[dealer])
+        while len(rows):
+            dealer[rows] = transitions[dealer[rows], self._draw(lanes[rows])]
+            rows = rows[self._dealer_hits[dealer[rows]]]
+
+        rows = np.flatnonzero(settling)
+        player_value = self._value[player[rows]]
+        dealer_value = self._value[dealer[rows]]
+        outcome = np.sign(player_value - dealer_value).astype(float)
+        outcome[self._bust[dealer[rows]]] = 1.0
+        outcome[self._bust[player[rows]]] = -1.0
+        units[rows] = outcome * multiplier[rows]
+        return units, hands, wagered
+
+    def _on_decisions(self, lanes: 'np.ndarray', states: 'np.ndarray', upcards: 'np.ndarray'):
+        """Called at each player decision on the vector path; subclasses can watch them"""
+
+    def _play_split(self, lane: int, first: int, second: int, upcard: int, hole: int):
+        """Play a splitting round in the scalar engine; returns (units, hands, wagered units)"""
+        codes = self._codes[lane]
+        position = int(self._cursor[lane])
+        self._split_lane = lane
+        self._scalar_shoe.load_order(codes, position)
+        played = self._play_scalar(self._scalar, codes, position)
+        self._cursor[lane] = self._scalar_shoe._cursor
+        return played
+
+    @staticmethod
+    def _play_scalar(simulator: Simulator, codes: 'np.ndarray', position: int):
+        """
+        Play out a round dealt from codes[position - 4:position] in a scalar simulator
+        whose shoe already deals from position; returns (units, hands, wagered units)
+        """
+        start_cards = [CARD_POOL[code] for code in codes[position - 4:position]]
+        game: GameState = simulator.game_state
+        player_hand = Hand()
+        dealer_hand = Hand(is_dealer=True)
+        player_hand.add_card(start_cards[0])
+        dealer_hand.add_card(start_cards[1])
+        player_hand.add_card(start_cards[2])
+        dealer_hand.add_card(start_cards[3])
+
+        game.player_hands = [player_hand]
+        game.hand_bets = [1]
+        game.active_hand_index = 0
+        game.dealer_hand = dealer_hand
+        game.phase = "playing"
+        wagered_before = game.total_wagered
+
+        profit = simulator.play_hands()
+        return profit, len(game.player_hands), game.total_wagered - wagered_before
+
+    def _record_outcomes(self, true_counts, units):
+        """Tally each round's unit result under its true count bucket"""
+        pairs = np.stack([np.floor(true_counts), np.round(units, 6)])
+        unique, counts = np.unique(pairs, axis=1, return_counts=True)
+        for (key, value), count in zip(unique.T.tolist(), counts.tolist()):
+            histogram = self.outcome_counts.setdefault(int(key), {})
+            histogram[value] = histogram.get(value, 0) + count
+
+    @staticmethod
+    def _record(result: SimulationResult, bets, units, hands, wagered, true_counts):
+        """Fold one step's rounds into the running totals"""
+        profit = units * bets
+        result.rounds += len(units)
+        result.hands += int(hands.sum())
+        result.total_initial_bet += float(bets.sum())
+        result.total_wagered += float((wagered * bets).sum())
+        result.net_result += float(profit.sum())
+        result.moments.merge(_batch_moments(profit))
+        result.unit_moments.merge(_batch_moments(units))
+
+        by_count = result.by_true_count
+        scaled = true_counts / by_count.bucket_width
+        keys = (np.floor(scaled) if by_count.rounding == "floor" else np.trunc(scaled)).astype(np.int64)
+        counts, inverse = np.unique(keys, return_inverse=True)
+        rounds = np.bincount(inverse)
+        initial = np.bincount(inverse, weights=bets)
+        net = np.bincount(inverse, weights=profit)
+        squares = np.bincount(inverse, weights=profit * profit)
+        for i, key in enumerate(counts.tolist()):
+            by_count.add_bucket(key, int(rounds[i]), float(initial[i]), float(net[i]),
+                                float(squares[i]))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Vectorized basic strategy simulator")
+    parser.add_argument('--rounds', type=int, default=1000000,
+                        help="Number of rounds to simulate")
+    parser.add_argument('--lanes', type=int, default=10000,
+                        help="Shoes played side by side")
+    parser.add_argument('--betting', choices=['flat', 'spread', 'optimal'], default=None,
+                        help="Override the betting strategy from settings")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed for a reproducible run")
+    parser.add_argument('--by-count', action='store_true',
+                        help="Print EV and SD for each true count")
+    parser.add_argument('--typed-charts', action='store_true',
+                        help="Play the typed charts instead of ones generated for the rules")
+    args = parser.parse_args(argv)
+
+    if np is None:
+        print("vector_sim requires numpy (pip install numpy)")
+        return 1
+
+    if args.betting:
+        settings.betting_limits.betting_strategy = args.betting
+    try:
+        bet_ramp = None if settings.betting_limits.betting_strategy == "kelly" else ramp_for_limits()
+    except ValueError as e:
+        print(e)
+        return 1
+
+    charts = None if args.typed_charts else StrategyCharts.load_or_generate()
+    simulator = VectorSimulator(lanes=args.lanes, rng=np.random.default_rng(args.seed),
+                                bet_ramp=bet_ramp, charts=charts)
+    result = simulator.run(args.rounds)
+    print(format_summary(result))
+    if args.by_count:
+        print()
+        print(format_count_table(result.by_true_count))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,8 @@
 
 from game_engine import Shoe, Card
 from collections import Counter
-from config import DECKS_IN_SHOE, HI_LO_VALUES
+from config import DECKS_IN_SHOE
+from counting_systems import get_counting_system
 
 def verify_shoe_creation():
     """Verify that shoe is created correctly with all cards"""
@@ -34,12 +35,14 @@ def verify_shoe_creation():
         expected = 13 * DECKS_IN_SHOE  # 13 ranks * number of decks
         print(f"  {suit}: {count} cards (expected: {expected}) - {'✓' if count == expected else '✗'}")
     
-    # Verify Hi-Lo count values
-    print("\nHi-Lo count verification:")
+    # Verify count values for the selected counting system
+    system = get_counting_system()
+    print(f"\n{system.name} count verification:")
     total_count = 0
     for card in shoe.cards:
-        total_count += card.count_value
-    print(f"Total Hi-Lo count of full shoe: {total_count} (should be 0 for balanced system)")
+        total_count += system.get_count_value(card)
+    print(f"Total {system.name} count of full shoe: {total_count:+g} "
+          f"(should be 0 for balanced system)")
     
     # Test dealing and penetration
     print(f"\nPenetration test:")
@@ -62,20 +65,21 @@ def verify_card_dealing():
     initial_count = len(shoe.cards)
     
     print("\nDealing test:")
+    system = get_counting_system()
     # Deal 10 cards
     dealt_cards = []
     for i in range(10):
         card = shoe.deal_card()
         dealt_cards.append(card)
-        print(f"  Card {i+1}: {card} (count value: {card.count_value:+d})")
+        print(f"  Card {i+1}: {card} (count value: {system.get_count_value(card):+g})")
     
     print(f"\nCards remaining: {shoe.cards_remaining()} (started with {initial_count})")
     print(f"Cards dealt: {len(dealt_cards)}")
     print(f"Match: {initial_count - len(dealt_cards) == shoe.cards_remaining()}")
     
     # Calculate running count
-    running_count = sum(card.count_value for card in dealt_cards)
-    print(f"\nRunning count after 10 cards: {running_count:+d}")
+    running_count = sum(system.get_count_value(card) for card in dealt_cards)
+    print(f"\nRunning count after 10 cards: {running_count:+g}")
 
 if __name__ == "__main__":
     print("=== BLACKJACK SHOE VERIFICATION ===\n")